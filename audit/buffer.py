@@ -0,0 +1,65 @@
+"""
+Buffered writes of score audit logs.
+
+record_score() queues a row in a per-thread buffer; rows are written with
+one bulk_create when AUDIT_BUFFER_SIZE rows are queued, when the request
+ends (AuditFlushMiddleware) or when flush() is called, e.g. at the end of
+a task or management command.
+"""
+import logging
+import threading
+
+from django.conf import settings
+
+from .models import ScoreAuditLog
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def _pending():
+    if not hasattr(_local, 'rows'):
+        _local.rows = []
+    return _local.rows
+
+
+def record_score(business_id, score, risk_level, version, requested_by='system', statement_id=None):
+    """Queue an audit row for a score calculation."""
+    rows = _pending()
+    rows.append(ScoreAuditLog(
+        business_id=business_id,
+        statement_id=statement_id,
+        score=score,
+        risk_level=risk_level,
+        version=version,
+        requested_by=requested_by,
+    ))
+    if len(rows) >= getattr(settings, 'AUDIT_BUFFER_SIZE', 500):
+        flush()
+
+
+def flush():
+    """Write the queued rows of this thread. Returns the number written."""
+    rows = _pending()
+    if not rows:
+        return 0
+    _local.rows = []
+    ScoreAuditLog.objects.bulk_create(rows, batch_size=getattr(settings, 'AUDIT_BUFFER_SIZE', 500))
+    return len(rows)
+
+
+class AuditFlushMiddleware:
+    """Write the audit rows queued while handling a request, once per request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            try:
+                flush()
+            except Exception:
+                logger.exception("Could not write score audit logs")
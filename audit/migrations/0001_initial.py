@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:34
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreAuditLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField()),
+                ('risk_level', models.CharField(max_length=20)),
+                ('version', models.CharField(max_length=30)),
+                ('requested_by', models.CharField(default='system', max_length=50)),
+                ('calculated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
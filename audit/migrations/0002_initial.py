@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('audit', '0001_initial'),
+        ('business', '0001_initial'),
+        ('ingestion', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scoreauditlog',
+            name='business',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_audit_logs', to='business.business'),
+        ),
+        migrations.AddField(
+            model_name='scoreauditlog',
+            name='statement',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='ingestion.bankstatement'),
+        ),
+        migrations.AddIndex(
+            model_name='scoreauditlog',
+            index=models.Index(fields=['business', 'calculated_at', 'id'], name='audit_business_time_idx'),
+        ),
+    ]
@@ -1,14 +1,50 @@
 from django.db import models
+from django.utils import timezone
+
 from business.models import Business
 from ingestion.models import BankStatement
 
+
+class AppendOnlyError(Exception):
+    """Raised on attempts to change or delete audit rows."""
+
+
+class ScoreAuditLogQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        raise AppendOnlyError("Score audit logs are append-only.")
+
+    def delete(self):
+        raise AppendOnlyError("Score audit logs are append-only.")
+
+
 class ScoreAuditLog(models.Model):
-    business = models.ForeignKey(Business, on_delete=models.CASCADE)
-    statement = models.ForeignKey(BankStatement, on_delete=models.CASCADE)
-    score = models.DecimalField(max_digits=5, decimal_places=2)
+    """
+    One row per score calculation. Rows are only ever inserted
+    (usually in batches, see audit.buffer) and read newest first.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='score_audit_logs')
+    statement = models.ForeignKey(BankStatement, on_delete=models.SET_NULL, null=True, blank=True)
+    score = models.PositiveIntegerField()
     risk_level = models.CharField(max_length=20)
-    version = models.CharField(max_length=50)
-    calculated_at = models.DateTimeField(auto_now_add=True)
+    version = models.CharField(max_length=30)
+    requested_by = models.CharField(max_length=50, default='system')
+    calculated_at = models.DateTimeField(default=timezone.now)
+
+    objects = ScoreAuditLogQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # History of a business, newest first, paged by (calculated_at, id)
+            models.Index(fields=['business', 'calculated_at', 'id'], name='audit_business_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.business.name} - {self.score} ({self.risk_level})"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise AppendOnlyError("Score audit logs are append-only.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise AppendOnlyError("Score audit logs are append-only.")
@@ -0,0 +1,22 @@
+from rest_framework import serializers
+
+from .models import ScoreAuditLog
+
+
+class ScoreAuditLogSerializer(serializers.ModelSerializer):
+    business_id = serializers.IntegerField(read_only=True)
+    statement_id = serializers.UUIDField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = ScoreAuditLog
+        fields = [
+            'id',
+            'business_id',
+            'statement_id',
+            'score',
+            'risk_level',
+            'version',
+            'requested_by',
+            'calculated_at',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import ScoreHistoryView
+
+urlpatterns = [
+    path('audit/<int:business_id>/history/', ScoreHistoryView.as_view(), name='score-history'),
+]
@@ -0,0 +1,95 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from business.models import Business
+from .models import ScoreAuditLog
+from .serializers import ScoreAuditLogSerializer
+
+
+def encode_cursor(log):
+    return base64.urlsafe_b64encode(f"{log.calculated_at.isoformat()}|{log.id}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+    - tuple: (calculated_at, id) of the last row of the previous page.
+
+    Raises:
+    - ValueError: If the cursor is malformed.
+    """
+    try:
+        calculated_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        calculated_at = parse_datetime(calculated_at)
+        log_id = int(log_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if calculated_at is None:
+        raise ValueError("Invalid cursor")
+    return calculated_at, log_id
+
+
+def _parse_time(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Invalid datetime: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class ScoreHistoryView(APIView):
+    """
+    GET /api/audit/<business_id>/history/
+    Score calculations of a business, newest first.
+    - ?limit= page size (default 50, at most AUDIT_HISTORY_MAX_LIMIT)
+    - ?cursor= the next_cursor of the previous page
+    - ?since= / ?until= ISO 8601 datetimes bounding calculated_at
+
+    Pages are read by keyset on (calculated_at, id) through the
+    (business, calculated_at, id) index, so a deep page costs the same as
+    the first one however long the history is.
+    """
+
+    def get(self, request, business_id):
+        if not Business.objects.filter(id=business_id).exists():
+            return Response({'error': 'Business not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        max_limit = getattr(settings, 'AUDIT_HISTORY_MAX_LIMIT', 500)
+        try:
+            limit = min(int(request.query_params.get('limit', 50)), max_limit)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        logs = ScoreAuditLog.objects.filter(business_id=business_id)
+        try:
+            if request.query_params.get('since'):
+                logs = logs.filter(calculated_at__gte=_parse_time(request.query_params['since']))
+            if request.query_params.get('until'):
+                logs = logs.filter(calculated_at__lt=_parse_time(request.query_params['until']))
+            if request.query_params.get('cursor'):
+                calculated_at, log_id = decode_cursor(request.query_params['cursor'])
+                logs = logs.filter(
+                    Q(calculated_at__lt=calculated_at) | Q(calculated_at=calculated_at, id__lt=log_id)
+                )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        page = list(logs.order_by('-calculated_at', '-id')[:limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+
+        return Response({
+            'results': ScoreAuditLogSerializer(page, many=True).data,
+            'next_cursor': encode_cursor(page[-1]) if has_more else None,
+        }, status=status.HTTP_200_OK)
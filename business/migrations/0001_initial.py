@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:34
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Business',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('registration_number', models.CharField(max_length=100, unique=True)),
+                ('tax_id', models.CharField(blank=True, max_length=100, null=True, unique=True)),
+                ('industry', models.CharField(max_length=100)),
+                ('date_founded', models.DateField(blank=True, null=True)),
+                ('website', models.URLField(blank=True, null=True)),
+                ('email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('phone_number', models.CharField(blank=True, max_length=20, null=True)),
+                ('address', models.TextField(blank=True, null=True)),
+                ('country', models.CharField(max_length=100)),
+                ('city', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Business',
+                'verbose_name_plural': 'Businesses',
+                'db_table': 'businesses',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
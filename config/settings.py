@@ -2,14 +2,54 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
-from decouple import config
+from decouple import Csv, config
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(dotenv_path=BASE_DIR / '.env')
 
 SECRET_KEY = 'django-insecure-)xq4+p0@l$^*6@rqulz7!u54i6rcl^sjf$==&a91doa%3u%#k7'
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "tngtech/deepseek-r1t2-chimera:free")
+# Statements whose tables parse with at least this confidence (0-1) skip the AI
+TABLE_PARSER_MIN_CONFIDENCE = config('TABLE_PARSER_MIN_CONFIDENCE', default=0.9, cast=float)
+# Pages searched for a known table header before a statement is left to the AI
+TABLE_PARSER_PROBE_PAGES = config('TABLE_PARSER_PROBE_PAGES', default=3, cast=int)
+# Repair sign flips, misread balances and dropped rows found by balance reconciliation
+RECONCILIATION_REPAIR = config('RECONCILIATION_REPAIR', default=True, cast=bool)
+# Page text is extracted by a process pool of PDF_EXTRACT_WORKERS (0: CPU count). Celery's
+# prefork workers cannot start processes, so extraction there is serial whatever the value;
+# raise it for workers run with --pool=threads or --pool=solo.
+PDF_EXTRACT_WORKERS = config('PDF_EXTRACT_WORKERS', default=1, cast=int)
+PDF_EXTRACT_PAGES_PER_TASK = config('PDF_EXTRACT_PAGES_PER_TASK', default=10, cast=int)
+# Long statements are structured in page-aligned chunks sent concurrently
+AI_CHUNK_PAGES = config('AI_CHUNK_PAGES', default=5, cast=int)
+AI_MAX_CONCURRENCY = config('AI_MAX_CONCURRENCY', default=4, cast=int)
+AI_MAX_RETRIES = config('AI_MAX_RETRIES', default=3, cast=int)
+AI_RETRY_BACKOFF = config('AI_RETRY_BACKOFF', default=1.0, cast=float)
+AI_REQUEST_TIMEOUT = config('AI_REQUEST_TIMEOUT', default=300, cast=int)
+# 'python' iterates transactions row by row, 'aggregate' scores from one grouped SQL query,
+# 'incremental' scores from the running aggregates kept by core.score_state
+SCORING_ENGINE_MODE = config('SCORING_ENGINE_MODE', default='python')
+# Version of the scoring model used when a request does not ask for one (?data_version=)
+SCORING_MODEL = config('SCORING_MODEL', default='v1-basic-rules')
+# JSON artifacts of extra (logistic) scoring models, comma-separated; see core/scoring_models.py
+SCORING_MODEL_ARTIFACTS = config('SCORING_MODEL_ARTIFACTS', default='', cast=Csv())
+# Businesses fetched per query by BatchCreditScoringEngine.score_many
+BATCH_SCORING_CHUNK_SIZE = config('BATCH_SCORING_CHUNK_SIZE', default=500, cast=int)
+# Largest list of business ids accepted by /api/risk/bulk/ and /api/scores/bulk/
+BULK_SCORING_MAX_IDS = config('BULK_SCORING_MAX_IDS', default=500, cast=int)
+# Score audit rows are queued and written in bulk per request or every AUDIT_BUFFER_SIZE rows
+AUDIT_BUFFER_SIZE = config('AUDIT_BUFFER_SIZE', default=500, cast=int)
+AUDIT_HISTORY_MAX_LIMIT = config('AUDIT_HISTORY_MAX_LIMIT', default=500, cast=int)
+# Largest page of GET /api/businesses/<id>/transactions/
+TRANSACTION_PAGE_MAX_LIMIT = config('TRANSACTION_PAGE_MAX_LIMIT', default=1000, cast=int)
+# Rows per INSERT when saving extracted transactions
+TRANSACTION_BULK_BATCH_SIZE = config('TRANSACTION_BULK_BATCH_SIZE', default=1000, cast=int)
+# Rows of a CSV/JSON import validated and written together; bounds its memory use
+IMPORT_BATCH_SIZE = config('IMPORT_BATCH_SIZE', default=10000, cast=int)
+# Invalid rows listed in an import response (all of them are still counted)
+IMPORT_MAX_REPORTED_ERRORS = config('IMPORT_MAX_REPORTED_ERRORS', default=1000, cast=int)
 DEBUG = True
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
@@ -39,6 +79,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'audit.buffer.AuditFlushMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -84,6 +125,56 @@ TIME_ZONE = 'UTC'
 USE_I18N = True
 USE_TZ = True
 STATIC_URL = 'static/'
+
+# AI structuring results are cached in the AI_CACHE_ALIAS cache. Point AI_CACHE_BACKEND at
+# django.core.cache.backends.redis.RedisCache (with a redis:// AI_CACHE_LOCATION) to share it
+# between workers; TIMEOUT is the TTL and MAX_ENTRIES bounds the local backends.
+AI_CACHE_ALIAS = 'ai_structuring'
+AI_CACHE = {
+    'BACKEND': config('AI_CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+    'LOCATION': config('AI_CACHE_LOCATION', default=str(BASE_DIR / 'cache' / 'ai')),
+    'TIMEOUT': config('AI_CACHE_TTL', default=60 * 60 * 24 * 30, cast=int),
+}
+if 'redis' not in AI_CACHE['BACKEND']:
+    # Redis evicts by its own maxmemory policy
+    AI_CACHE['OPTIONS'] = {'MAX_ENTRIES': config('AI_CACHE_MAX_ENTRIES', default=10000, cast=int)}
+
+# Score responses are cached in SCORE_CACHE_ALIAS until the business's data changes.
+# Invalidation runs in whichever process saved the data (often the Celery worker), so the
+# cache must be shared by every web and worker process: a per-process cache such as
+# LocMemCache would keep serving old scores and makes the single-flight lock useless.
+SCORE_CACHE_ALIAS = 'scores'
+SCORE_CACHE = {
+    'BACKEND': config('SCORE_CACHE_BACKEND', default='django.core.cache.backends.redis.RedisCache'),
+    'LOCATION': config('SCORE_CACHE_LOCATION', default='redis://localhost:6379/1'),
+    'TIMEOUT': config('SCORE_CACHE_TTL', default=60 * 60, cast=int),
+}
+# Seconds a request computing a missing score holds the lock others wait on
+SCORE_CACHE_LOCK_TIMEOUT = config('SCORE_CACHE_LOCK_TIMEOUT', default=30, cast=int)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    AI_CACHE_ALIAS: AI_CACHE,
+    SCORE_CACHE_ALIAS: SCORE_CACHE,
+}
+
+# Statement PDFs are stored content-addressed (by SHA-256) in the 'statements' storage.
+# Swap the backend here to keep them somewhere other than the local disk.
+STATEMENT_BLOB_ROOT = config('STATEMENT_BLOB_ROOT', default=str(BASE_DIR / 'blobs'))
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    'statements': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': STATEMENT_BLOB_ROOT},
+    },
+}
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
@@ -101,3 +192,15 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
 }
+
+# Statement processing runs as a Celery task chain. Set CELERY_TASK_ALWAYS_EAGER=True
+# (with CELERY_BROKER_URL=memory://) to run it inline without Redis, e.g. in tests.
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default=None)
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Uploaded PDFs wait here until the worker has processed them;
+# must be shared between the web and worker containers
+INGESTION_SPOOL_DIR = config('INGESTION_SPOOL_DIR', default=str(BASE_DIR / 'spool'))
@@ -28,5 +28,6 @@ urlpatterns = [
     path('api/', include('ingestion.urls')),
     path('api/', include('users.urls')),
     path('api/', include('core.urls')),
+    path('api/', include('audit.urls')),
     path('', home_view, name="Home")
 ]
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+Materialized per-business features.
+
+- MonthlyAggregate: one row per business and month with inflows, outflows,
+  counts and balance statistics;
+- DailyTransactionCount: transactions per day, for the recent activity window;
+- ScoreState: running totals over the whole history;
+- FeatureSnapshot: the latest ScoreFeatures of the business.
+
+core.score_state keeps the tables current as transactions are saved and
+rebuilds them for backfills. This module is the read side: scoring takes
+one FeatureSnapshot row per business instead of scanning its transactions.
+Reads never write; snapshots are stored by the upload pipeline, the
+backfill and `rescore` (refresh_features / refresh_stale_features).
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import DailyTransactionCount, FeatureSnapshot, MonthlyAggregate, ScoreState
+from .money import to_kobo
+from .scoring_models import ScoreFeatures
+
+RECENT_WINDOW_DAYS = 90
+
+MonthlyFeatures = namedtuple('MonthlyFeatures', [
+    'month',
+    'inflow',  # kobo
+    'outflow',  # kobo, positive
+    'credit_count',
+    'debit_count',
+    'transaction_count',
+    'revenue_growth',  # vs. the previous month with credits; None for the first
+    'balance_count',
+    'balance_mean',
+    'balance_stdev',
+])
+
+
+def recent_start(as_of=None):
+    """First day of the recent activity window ending on `as_of` (today by default)."""
+    return (as_of or timezone.now().date()) - timedelta(days=RECENT_WINDOW_DAYS)
+
+
+def average_growth(monthly_totals):
+    """
+    Average month-over-month growth of a list of monthly credit totals
+    (integer kobo), ordered by month. Months whose previous total is not
+    positive are skipped.
+    """
+    growth_rates = []
+    for i in range(1, len(monthly_totals)):
+        prev = monthly_totals[i - 1]
+        curr = monthly_totals[i]
+        if prev > 0:
+            growth_rates.append((curr - prev) / prev)
+    return sum(growth_rates) / len(growth_rates) if growth_rates else 0
+
+
+def features_from_state(state: ScoreState, recent_start) -> ScoreFeatures:
+    """Compute ScoreFeatures from the materialized tables, touching O(months) rows."""
+    monthly_credits = list(
+        MonthlyAggregate.objects
+        .filter(business_id=state.business_id, credit_count__gt=0)
+        .order_by('month')
+        .values_list('credit_total', flat=True)
+    )
+    monthly_credits = [to_kobo(total) for total in monthly_credits]
+    recent_count = DailyTransactionCount.objects.filter(
+        business_id=state.business_id, day__gte=recent_start
+    ).aggregate(total=Coalesce(Sum('count'), 0))['total']
+
+    balance_mean = balance_stdev = None
+    if state.balance_count >= 2:
+        balance_mean = state.balance_mean
+        balance_stdev = (max(state.balance_m2, 0.0) / (state.balance_count - 1)) ** 0.5
+
+    return ScoreFeatures(
+        transaction_count=state.transaction_count,
+        credit_months=len(monthly_credits),
+        avg_revenue_growth=average_growth(monthly_credits),
+        recent_count=recent_count,
+        balance_count=state.balance_count,
+        balance_mean=balance_mean,
+        balance_stdev=balance_stdev,
+    )
+
+
+def store_features(business_id, features: ScoreFeatures, as_of):
+    FeatureSnapshot.objects.update_or_create(
+        business_id=business_id,
+        defaults={'as_of': as_of, **features._asdict()},
+    )
+
+
+def refresh_features(state: ScoreState, as_of=None):
+    """Recompute and store the FeatureSnapshot of the business of `state`."""
+    as_of = as_of or timezone.now().date()
+    features = features_from_state(state, recent_start(as_of))
+    store_features(state.business_id, features, as_of)
+    return features
+
+
+def latest_features(business_id, as_of=None):
+    """
+    ScoreFeatures of a business as of `as_of` (today by default).
+
+    One indexed read when the snapshot is from that day; an older snapshot
+    is brought forward from the monthly and daily rows, without storing it.
+
+    Returns:
+    - ScoreFeatures or None: None when the business is not in the feature
+      store yet (never ingested since the store existed, nor backfilled),
+      or for a past `as_of` without a snapshot from that day: the monthly
+      and daily rows also hold statements uploaded after it.
+    """
+    today = timezone.now().date()
+    as_of = as_of or today
+    snapshot = FeatureSnapshot.objects.filter(business_id=business_id).first()
+    if snapshot is not None and snapshot.as_of == as_of:
+        return ScoreFeatures(*(getattr(snapshot, field) for field in ScoreFeatures._fields))
+    if as_of < today:
+        return None
+
+    state = ScoreState.objects.filter(business_id=business_id).first()
+    if state is None:
+        return None
+    return features_from_state(state, recent_start(as_of))
+
+
+def refresh_stale_features(business_ids, as_of=None):
+    """
+    Store the features of the businesses whose FeatureSnapshot is older
+    than `as_of` (today by default), so stored_features() covers them.
+
+    Returns:
+    - int: number of snapshots refreshed.
+    """
+    as_of = as_of or timezone.now().date()
+    fresh = FeatureSnapshot.objects.filter(business_id__in=business_ids, as_of=as_of).values('business_id')
+    states = ScoreState.objects.filter(business_id__in=business_ids).exclude(business_id__in=fresh)
+    refreshed = 0
+    for state in states:
+        refresh_features(state, as_of)
+        refreshed += 1
+    return refreshed
+
+
+def stored_features(business_ids, as_of=None):
+    """
+    ScoreFeatures of the businesses whose snapshot is from `as_of`
+    (today by default), read with one query.
+
+    Returns:
+    - dict: business_id -> ScoreFeatures; other businesses are left out.
+    """
+    as_of = as_of or timezone.now().date()
+    rows = FeatureSnapshot.objects.filter(business_id__in=business_ids, as_of=as_of).values_list(
+        'business_id', *ScoreFeatures._fields
+    )
+    return {row[0]: ScoreFeatures(*row[1:]) for row in rows}
+
+
+def monthly_features(business_id, start=None, end=None):
+    """
+    Monthly rows of a business, oldest first, optionally limited to the
+    months from `start` to `end` (dates, inclusive).
+
+    Returns:
+    - list[MonthlyFeatures]
+    """
+    rows = MonthlyAggregate.objects.filter(business_id=business_id).order_by('month')
+    months = []
+    previous_inflow = None
+    for row in rows:
+        inflow = to_kobo(row.credit_total)
+        growth = None
+        if row.credit_count:
+            if previous_inflow is not None and previous_inflow > 0:
+                growth = (inflow - previous_inflow) / previous_inflow
+            previous_inflow = inflow
+        if (start and row.month < start.replace(day=1)) or (end and row.month > end):
+            continue
+        months.append(MonthlyFeatures(
+            month=row.month,
+            inflow=inflow,
+            outflow=to_kobo(row.debit_total),
+            credit_count=row.credit_count,
+            debit_count=row.debit_count,
+            transaction_count=row.transaction_count,
+            revenue_growth=growth,
+            balance_count=row.balance_count,
+            balance_mean=row.balance_mean if row.balance_count else None,
+            balance_stdev=(max(row.balance_m2, 0.0) / (row.balance_count - 1)) ** 0.5 if row.balance_count > 1 else None,
+        ))
+    return months
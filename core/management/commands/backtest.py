@@ -0,0 +1,297 @@
+import json
+import os
+import resource
+import time
+from collections import Counter, deque
+from multiprocessing import Pool
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.dateparse import parse_date
+
+from business.models import Business
+from core.batch_engine import features_from_arrays
+from core.feature_store import recent_start
+from core.money import MISSING, db_kobo
+from core.scoring_models import NO_DATA_VERSION, UnknownScoringModel, default_version, get_model, load_artifact
+from ingestion.models import BankTransaction
+
+BANDS = ['No data', 'High', 'Medium', 'Low']
+
+_models = []
+
+
+def _init_worker(models):
+    global _models
+    # Workers only compute; they never use the parent's database connections.
+    connections.close_all()
+    _models = models
+
+
+def score_backtest_batch(batch):
+    """
+    Score one batch of streamed businesses with every model.
+
+    Parameters:
+    - batch (tuple): (as_of, business_ids, business_index, dates, amounts,
+      balances, is_credit), as built by Command.iter_batches().
+
+    Returns:
+    - tuple: (business_ids, {version: [risk band per business]}, seconds spent).
+    """
+    started = time.perf_counter()
+    as_of, business_ids, business_index, dates, amounts, balances, is_credit = batch
+    features = features_from_arrays(
+        business_index=business_index,
+        n_businesses=len(business_ids),
+        dates=dates,
+        amounts=amounts,
+        balances=balances,
+        is_credit=is_credit,
+        recent_start=recent_start(as_of),
+    )
+    bands = {}
+    for model in _models:
+        bands[model.version] = [_band(model.predict(f)) for f in features]
+    return business_ids, bands, time.perf_counter() - started
+
+
+def _band(result):
+    score, risk_level, version = result
+    return BANDS[0] if version == NO_DATA_VERSION else risk_level
+
+
+def migration_matrix(before, after, business_ids):
+    """Count businesses by (band in `before`, band in `after`), as {from: {to: count}}."""
+    counts = Counter((before.get(i, BANDS[0]), after.get(i, BANDS[0])) for i in business_ids)
+    return {row: {column: counts[row, column] for column in BANDS} for row in BANDS}
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay scoring as of historical dates with candidate models or rule sets, and report "
+        "risk band migrations against a baseline model and between dates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'business_ids', nargs='*', type=int,
+            help='Businesses to include. Defaults to every business.'
+        )
+        parser.add_argument(
+            '--as-of', action='append', required=True,
+            help='Score as of the end of this day (YYYY-MM-DD). Repeat for several dates.'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Registered model version the candidates are compared with (default: SCORING_MODEL).'
+        )
+        parser.add_argument(
+            '--model', action='append', default=[],
+            help='Registered model version to use as a candidate. Repeatable.'
+        )
+        parser.add_argument(
+            '--candidate', action='append', default=[],
+            help='JSON artifact of a candidate model or rule set (see core/scoring_models.py). Repeatable.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Worker processes (default: CPU count). 1 scores in this process.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=getattr(settings, 'BATCH_SCORING_CHUNK_SIZE', 500),
+            help='Businesses per batch sent to a worker.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Also write the full report to this JSON file.'
+        )
+
+    def handle(self, *args, **options):
+        as_of_dates = []
+        for value in options['as_of']:
+            as_of = parse_date(value)
+            if as_of is None:
+                raise CommandError(f'--as-of must be a date (YYYY-MM-DD), got {value!r}.')
+            as_of_dates.append(as_of)
+        as_of_dates = sorted(set(as_of_dates))
+
+        try:
+            baseline = get_model(options['baseline'] or default_version())
+            models = [baseline] + [get_model(version) for version in options['model']]
+        except UnknownScoringModel as e:
+            raise CommandError(str(e))
+        try:
+            models += [load_artifact(path) for path in options['candidate']]
+        except (OSError, ValueError, TypeError) as e:
+            raise CommandError(f'Invalid candidate: {e}')
+        versions = [model.version for model in models]
+        if len(set(versions)) != len(versions):
+            raise CommandError(f'Model versions must be unique, got {", ".join(versions)}.')
+
+        businesses = Business.objects.order_by('id')
+        if options['business_ids']:
+            businesses = businesses.filter(id__in=options['business_ids'])
+        business_ids = list(businesses.values_list('id', flat=True))
+        self.stdout.write(
+            f"Backtesting {len(business_ids)} business(es) as of {len(as_of_dates)} date(s) "
+            f"with {', '.join(versions)} ({options['workers']} worker(s))."
+        )
+
+        report = {'baseline': baseline.version, 'models': versions, 'runs': [], 'over_time': []}
+        previous = None
+        started = time.monotonic()
+        pool = None
+        if options['workers'] > 1:
+            # Forked workers must not inherit open connections of this process.
+            connections.close_all()
+            pool = Pool(processes=options['workers'], initializer=_init_worker, initargs=(models,))
+        else:
+            _init_worker(models)
+        try:
+            for as_of in as_of_dates:
+                bands, stats = self.replay(as_of, set(business_ids), versions, options['batch_size'], pool, options['workers'])
+                run = {
+                    'as_of': as_of.isoformat(),
+                    'stats': stats,
+                    'distribution': {
+                        version: dict(Counter(bands[version].get(i, BANDS[0]) for i in business_ids))
+                        for version in versions
+                    },
+                    'vs_baseline': {
+                        version: migration_matrix(bands[baseline.version], bands[version], business_ids)
+                        for version in versions[1:]
+                    },
+                }
+                report['runs'].append(run)
+                self.write_run(run)
+
+                if previous is not None:
+                    step = {
+                        'from': previous[0].isoformat(),
+                        'to': as_of.isoformat(),
+                        'matrices': {
+                            version: migration_matrix(previous[1][version], bands[version], business_ids)
+                            for version in versions
+                        },
+                    }
+                    report['over_time'].append(step)
+                    for version, matrix in step['matrices'].items():
+                        self.write_matrix(f"{version}: {step['from']} -> {step['to']}", matrix)
+                previous = (as_of, bands)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Backtest finished in {time.monotonic() - started:.1f}s, "
+            f"peak memory {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB."
+        ))
+
+    def replay(self, as_of, business_ids, versions, batch_size, pool, workers):
+        """
+        Stream every transaction known on `as_of` (dated on or before it,
+        from a statement uploaded by then) once, ordered by business, and
+        score it batch by batch in the pool. At most two batches per worker
+        are in flight, so memory does not grow with history.
+
+        Returns:
+        - tuple: ({version: {business_id: band}}, runtime statistics).
+        """
+        started = time.monotonic()
+        stats = {'transactions': 0, 'businesses': 0, 'batches': 0, 'scoring_seconds': 0.0}
+        bands = {version: {} for version in versions}
+
+        def collect(result):
+            ids, batch_bands, seconds = result
+            stats['businesses'] += len(ids)
+            stats['scoring_seconds'] += seconds
+            for version, values in batch_bands.items():
+                bands[version].update(zip(ids, values))
+
+        pending = deque()
+        for batch in self.iter_batches(as_of, business_ids, batch_size, stats):
+            stats['batches'] += 1
+            if pool is None:
+                collect(score_backtest_batch(batch))
+                continue
+            pending.append(pool.apply_async(score_backtest_batch, (batch,)))
+            if len(pending) >= 2 * workers:
+                collect(pending.popleft().get())
+        while pending:
+            collect(pending.popleft().get())
+
+        elapsed = time.monotonic() - started
+        stats['seconds'] = round(elapsed, 3)
+        stats['scoring_seconds'] = round(stats['scoring_seconds'], 3)
+        stats['transactions_per_second'] = round(stats['transactions'] / elapsed) if elapsed else 0
+        return bands, stats
+
+    def iter_batches(self, as_of, business_ids, batch_size, stats):
+        rows = (
+            BankTransaction.objects.scored()
+            .known_on(as_of)
+            .filter(business__isnull=False)
+            .order_by('business_id')
+            .annotate(amount_kobo=db_kobo('amount'), balance_kobo=db_kobo('balance'))
+            .values_list('business_id', 'date', 'amount_kobo', 'balance_kobo', 'transaction_type')
+            .iterator(chunk_size=10000)
+        )
+        batch_ids, columns = [], ([], [], [], [], [])
+        for business_id, day, amount, balance, transaction_type in rows:
+            if business_id not in business_ids:
+                continue
+            if not batch_ids or batch_ids[-1] != business_id:
+                if len(batch_ids) == batch_size:
+                    yield self.make_batch(as_of, batch_ids, columns)
+                    batch_ids, columns = [], ([], [], [], [], [])
+                batch_ids.append(business_id)
+            stats['transactions'] += 1
+            columns[0].append(len(batch_ids) - 1)
+            columns[1].append(day)
+            columns[2].append(amount)
+            columns[3].append(MISSING if balance is None else balance)
+            columns[4].append(transaction_type == 'credit')
+        if batch_ids:
+            yield self.make_batch(as_of, batch_ids, columns)
+
+    def make_batch(self, as_of, batch_ids, columns):
+        business_index, dates, amounts, balances, is_credit = columns
+        return (
+            as_of,
+            batch_ids,
+            np.array(business_index, dtype=np.int64),
+            np.array(dates, dtype='datetime64[D]'),
+            np.array(amounts, dtype=np.int64),
+            np.array(balances, dtype=np.int64),
+            np.array(is_credit, dtype=bool),
+        )
+
+    def write_run(self, run):
+        stats = run['stats']
+        self.stdout.write(
+            f"\nAs of {run['as_of']}: {stats['transactions']} transactions of {stats['businesses']} business(es) "
+            f"in {stats['batches']} batch(es), {stats['seconds']:.1f}s "
+            f"({stats['transactions_per_second']} transactions/s, {stats['scoring_seconds']:.1f}s scoring in workers)"
+        )
+        for version, distribution in run['distribution'].items():
+            counts = ', '.join(f"{band} {distribution.get(band, 0)}" for band in BANDS)
+            self.stdout.write(f"  {version}: {counts}")
+        for version, matrix in run['vs_baseline'].items():
+            self.write_matrix(f"{version} vs baseline (rows: baseline, columns: {version})", matrix)
+
+    def write_matrix(self, title, matrix):
+        total = sum(sum(row.values()) for row in matrix.values())
+        changed = total - sum(matrix[band][band] for band in BANDS)
+        self.stdout.write(f"\n  {title}")
+        self.stdout.write("  " + " " * 9 + "".join(f"{band:>9}" for band in BANDS))
+        for band in BANDS:
+            self.stdout.write(f"  {band:>9}" + "".join(f"{matrix[band][column]:>9}" for column in BANDS))
+        share = f" ({changed / total:.1%})" if total else ""
+        self.stdout.write(f"  changed band: {changed}{share}")
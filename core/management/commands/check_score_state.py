@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from business.models import Business
+from core.score_state import check_score_state
+
+
+class Command(BaseCommand):
+    help = "Compare the incremental score state with a full recomputation from transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'business_ids', nargs='*', type=int,
+            help='Businesses to check. Defaults to every business.'
+        )
+
+    def handle(self, *args, **options):
+        businesses = Business.objects.order_by('id')
+        if options['business_ids']:
+            businesses = businesses.filter(id__in=options['business_ids'])
+
+        checked = inconsistent = 0
+        for business in businesses.iterator():
+            checked += 1
+            mismatches = check_score_state(business)
+            if mismatches:
+                inconsistent += 1
+                self.stdout.write(self.style.WARNING(f"Business {business.id}:"))
+                for mismatch in mismatches:
+                    self.stdout.write(f"  {mismatch}")
+
+        if inconsistent:
+            raise CommandError(f"{inconsistent} of {checked} business(es) have inconsistent score state.")
+        self.stdout.write(self.style.SUCCESS(f"Score state is consistent for {checked} business(es)."))
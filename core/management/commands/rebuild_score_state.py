@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from business.models import Business
+from core.score_state import rebuild_score_state
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the incremental score state and feature store "
+        "(monthly rows and latest feature snapshot) from all stored transactions (backfill)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'business_ids', nargs='*', type=int,
+            help='Businesses to rebuild. Defaults to every business.'
+        )
+        parser.add_argument(
+            '--missing', action='store_true',
+            help='Only businesses that have transactions but no feature snapshot yet.'
+        )
+
+    def handle(self, *args, **options):
+        businesses = Business.objects.order_by('id')
+        if options['business_ids']:
+            businesses = businesses.filter(id__in=options['business_ids'])
+        if options['missing']:
+            businesses = businesses.filter(feature_snapshot__isnull=True, transactions__isnull=False).distinct()
+
+        rebuilt = 0
+        for business in businesses.iterator():
+            rebuild_score_state(business)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt score state for {rebuilt} business(es)."))
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+from functools import partial
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils.dateparse import parse_date
+
+from audit.models import ScoreAuditLog
+from business.models import Business
+from core.batch_engine import BatchCreditScoringEngine, SnapshotCreditScoringEngine, store_scores
+from core.feature_store import refresh_stale_features
+from ingestion.models import BankStatement
+
+
+def _init_worker():
+    # Never share the parent's database connection; each worker opens its own.
+    connections.close_all()
+
+
+def rescore_batch(business_ids, from_snapshots=False):
+    """
+    Score one batch of businesses and store the results.
+
+    Returns:
+    - tuple: (scored, first_id, last_id) of the batch.
+    """
+    engine_class = SnapshotCreditScoringEngine if from_snapshots else BatchCreditScoringEngine
+    # A rescore recomputes from the stored data, not from materialized features
+    engine = engine_class(chunk_size=len(business_ids), use_feature_store=False)
+    results = engine.score_many(business_ids)
+
+    latest_statement = dict(
+        BankStatement.objects
+        .filter(business_id__in=business_ids)
+        .order_by('business_id', 'created_at')
+        .values_list('business_id', 'id')
+    )
+
+    with transaction.atomic():
+        store_scores(results)
+        # Scoring reads never store features; bring this batch's snapshots forward here
+        refresh_stale_features(business_ids)
+        ScoreAuditLog.objects.bulk_create([
+            ScoreAuditLog(
+                business_id=business_id,
+                statement_id=latest_statement.get(business_id),
+                score=score,
+                risk_level=risk_level,
+                version=version,
+                requested_by='rescore',
+            )
+            for business_id, (score, risk_level, version) in results.items()
+        ])
+    return len(results), business_ids[0], business_ids[-1]
+
+
+class Command(BaseCommand):
+    help = "Rescore businesses in batches across a process pool, e.g. after the scoring rules change."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'business_ids', nargs='*', type=int,
+            help='Businesses to rescore. Defaults to every business.'
+        )
+        parser.add_argument(
+            '--since',
+            help='Only businesses with a statement uploaded on or after this date (YYYY-MM-DD).'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Worker processes (default: CPU count). 1 scores in this process.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=getattr(settings, 'BATCH_SCORING_CHUNK_SIZE', 500),
+            help='Businesses scored and written per batch.'
+        )
+        parser.add_argument(
+            '--from-snapshots', action='store_true',
+            help='Read the columnar statement snapshots instead of transaction rows.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='File recording finished batches, so an interrupted run can be resumed.'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Skip the batches already recorded in --checkpoint.'
+        )
+
+    def handle(self, *args, **options):
+        if options['resume'] and not options['checkpoint']:
+            raise CommandError('--resume needs --checkpoint.')
+
+        businesses = Business.objects.order_by('id')
+        if options['business_ids']:
+            businesses = businesses.filter(id__in=options['business_ids'])
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError('--since must be a date (YYYY-MM-DD).')
+            businesses = businesses.filter(bank_statements__created_at__date__gte=since).distinct()
+        business_ids = list(businesses.values_list('id', flat=True))
+
+        done = self.load_checkpoint(options['checkpoint']) if options['resume'] else []
+        business_ids = [i for i in business_ids if not any(first <= i <= last for first, last in done)]
+
+        batch_size = options['batch_size']
+        batches = [business_ids[i:i + batch_size] for i in range(0, len(business_ids), batch_size)]
+        total = len(business_ids)
+        self.stdout.write(f"Rescoring {total} business(es) in {len(batches)} batch(es) with {options['workers']} worker(s).")
+        if not batches:
+            return
+
+        started = time.monotonic()
+        scored = 0
+        for count, first, last in self.run_batches(batches, options['workers'], options['from_snapshots']):
+            scored += count
+            done.append([first, last])
+            if options['checkpoint']:
+                self.save_checkpoint(options['checkpoint'], done)
+
+            elapsed = time.monotonic() - started
+            rate = scored / elapsed if elapsed else 0
+            eta = (total - scored) / rate if rate else 0
+            self.stdout.write(f"{scored}/{total} scored, {rate:.0f} businesses/s, ETA {eta:.0f}s")
+
+        if options['checkpoint']:
+            os.remove(options['checkpoint'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {scored} business(es) in {time.monotonic() - started:.1f}s."
+        ))
+
+    def run_batches(self, batches, workers, from_snapshots=False):
+        score = partial(rescore_batch, from_snapshots=from_snapshots)
+        if workers <= 1:
+            for batch in batches:
+                yield score(batch)
+            return
+
+        # Forked workers must not inherit open connections of this process.
+        connections.close_all()
+        with Pool(processes=workers, initializer=_init_worker) as pool:
+            yield from pool.imap_unordered(score, batches)
+
+    def load_checkpoint(self, path):
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return json.load(f)['done']
+
+    def save_checkpoint(self, path, done):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'done': done}, f)
+        os.replace(tmp_path, path)
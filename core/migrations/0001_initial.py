@@ -0,0 +1,90 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('business', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeatureSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField()),
+                ('transaction_count', models.PositiveBigIntegerField(default=0)),
+                ('credit_months', models.PositiveIntegerField(default=0)),
+                ('avg_revenue_growth', models.FloatField(default=0)),
+                ('recent_count', models.PositiveIntegerField(default=0)),
+                ('balance_count', models.PositiveBigIntegerField(default=0)),
+                ('balance_mean', models.FloatField(blank=True, null=True)),
+                ('balance_stdev', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='feature_snapshot', to='business.business')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScoreState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_count', models.PositiveBigIntegerField(default=0)),
+                ('balance_count', models.PositiveBigIntegerField(default=0)),
+                ('balance_mean', models.FloatField(default=0)),
+                ('balance_m2', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='score_state', to='business.business')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CreditScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField()),
+                ('risk_level', models.CharField(max_length=20)),
+                ('data_version', models.CharField(max_length=30)),
+                ('calculated_at', models.DateTimeField(auto_now=True)),
+                ('sme', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='credit_score', to='business.business')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['risk_level'], name='core_credit_risk_le_df5d71_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyTransactionCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_transaction_counts', to='business.business')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('business', 'day'), name='unique_daily_count_per_business')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('credit_total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('credit_count', models.PositiveIntegerField(default=0)),
+                ('debit_total', models.DecimalField(decimal_places=2, default=0, help_text='Outflows, as a positive amount', max_digits=16)),
+                ('debit_count', models.PositiveIntegerField(default=0)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('balance_count', models.PositiveIntegerField(default=0)),
+                ('balance_mean', models.FloatField(default=0)),
+                ('balance_m2', models.FloatField(default=0)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_aggregates', to='business.business')),
+            ],
+            options={
+                'ordering': ['month'],
+                'constraints': [models.UniqueConstraint(fields=('business', 'month'), name='unique_monthly_aggregate_per_business')],
+            },
+        ),
+    ]
@@ -18,4 +18,74 @@ class CreditScore(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=['risk_level']),
-        ]
\ No newline at end of file
+        ]
+
+class ScoreState(models.Model):
+    """
+    Running aggregates of a business's transactions, updated on every upload
+    so the engine can score in O(months) instead of rescanning history.
+    Balance statistics are kept with Welford's algorithm (count, mean, M2).
+    """
+    business = models.OneToOneField(Business, on_delete=models.CASCADE, related_name='score_state')
+    transaction_count = models.PositiveBigIntegerField(default=0)
+    balance_count = models.PositiveBigIntegerField(default=0)
+    balance_mean = models.FloatField(default=0)
+    balance_m2 = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.business.name} - {self.transaction_count} transactions"
+
+
+class MonthlyAggregate(models.Model):
+    """
+    One row per business and month of the feature store (see core.feature_store):
+    inflows, outflows and the month's balance statistics (Welford count, mean, M2).
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='monthly_aggregates')
+    month = models.DateField(help_text='First day of the month')
+    credit_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    credit_count = models.PositiveIntegerField(default=0)
+    debit_total = models.DecimalField(max_digits=16, decimal_places=2, default=0, help_text='Outflows, as a positive amount')
+    debit_count = models.PositiveIntegerField(default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+    balance_count = models.PositiveIntegerField(default=0)
+    balance_mean = models.FloatField(default=0)
+    balance_m2 = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ['month']
+        constraints = [
+            models.UniqueConstraint(fields=['business', 'month'], name='unique_monthly_aggregate_per_business')
+        ]
+
+
+class FeatureSnapshot(models.Model):
+    """
+    Latest ScoreFeatures of a business, as of `as_of` (the recent activity
+    window moves daily). Scoring reads this one row instead of the transactions.
+    """
+    business = models.OneToOneField(Business, on_delete=models.CASCADE, related_name='feature_snapshot')
+    as_of = models.DateField()
+    transaction_count = models.PositiveBigIntegerField(default=0)
+    credit_months = models.PositiveIntegerField(default=0)
+    avg_revenue_growth = models.FloatField(default=0)
+    recent_count = models.PositiveIntegerField(default=0)
+    balance_count = models.PositiveBigIntegerField(default=0)
+    balance_mean = models.FloatField(null=True, blank=True)
+    balance_stdev = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.business.name} - features as of {self.as_of}"
+
+
+class DailyTransactionCount(models.Model):
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='daily_transaction_counts')
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['business', 'day'], name='unique_daily_count_per_business')
+        ]
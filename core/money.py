@@ -0,0 +1,68 @@
+"""
+Money as integer kobo (1/100 naira).
+
+Amounts are stored as DECIMAL(…, 2) naira, but scoring and statement
+totals work on whole kobo: Python ints or NumPy int64 arrays, so sums are
+exact and cheap. Floats appear only for ratios and statistics (growth,
+mean, standard deviation), and Decimals only at the storage boundary.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+from django.db.models import BigIntegerField, F
+from django.db.models.functions import Cast, Round
+
+KOBO_PER_NAIRA = 100
+# Stands in for an unknown value (e.g. a missing balance) in int64 arrays
+MISSING = np.iinfo(np.int64).min
+
+CENT = Decimal('0.01')
+
+
+def to_kobo(value):
+    """
+    Convert naira (Decimal, str, float or int) to whole kobo,
+    rounding half away from zero. Returns None for None.
+
+    Raises:
+    - decimal.InvalidOperation: If `value` is not a number.
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value * KOBO_PER_NAIRA
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int((value * KOBO_PER_NAIRA).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_naira(kobo):
+    """Convert whole kobo to a 2-place Decimal for storage or display."""
+    return (Decimal(int(kobo)) / KOBO_PER_NAIRA).quantize(CENT)
+
+
+def to_kobo_array(values):
+    """
+    Convert naira values (a sequence, Series or float array) to an int64
+    kobo array, rounding like to_kobo(). None and NaN become MISSING.
+    """
+    naira = np.asarray(
+        [np.nan if v is None else v for v in values] if isinstance(values, (list, tuple)) else values,
+        dtype=np.float64,
+    )
+    kobo = np.full(naira.shape, MISSING, dtype=np.int64)
+    known = ~np.isnan(naira)
+    # Half away from zero, like to_kobo(). Scaling up by a few ulps absorbs
+    # the binary error of the product, so 1.005 naira (1.00499999... as a
+    # float) is still half a kobo over 100.
+    scaled = np.abs(naira[known] * KOBO_PER_NAIRA) * (1 + 4 * np.finfo(np.float64).eps)
+    kobo[known] = np.sign(naira[known]) * np.floor(scaled + 0.5)
+    return kobo
+
+
+def db_kobo(field):
+    """
+    Expression reading a DECIMAL naira column as BIGINT kobo, so querysets
+    hand back ints instead of Decimals (NULL stays NULL).
+    """
+    return Cast(Round(F(field) * KOBO_PER_NAIRA), output_field=BigIntegerField())
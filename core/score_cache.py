@@ -0,0 +1,144 @@
+"""
+Read-through cache of score responses and of the features they are
+computed from.
+
+Entries are keyed by business and by a per-business data version token.
+Invalidating a business replaces its token (see core.signals), so every
+cached entry of the old data is ignored at once, on any cache backend,
+without deleting keys by pattern.
+"""
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'score'
+
+
+class ScoreCache:
+    """
+    Cache of serialized score payloads in the SCORE_CACHE_ALIAS cache.
+
+    get_or_compute() is single-flight: when several requests miss at once,
+    the one that wins cache.add() on the lock key computes the score and
+    the others wait for its result instead of running the engine too.
+    The backend (Redis by default) must be shared by all web and worker
+    processes, or invalidations and the lock only reach the process that
+    made them.
+    """
+
+    def __init__(self, alias=None, lock_timeout=None, poll_interval=0.05):
+        self.alias = alias or getattr(settings, 'SCORE_CACHE_ALIAS', 'scores')
+        self.lock_timeout = lock_timeout or getattr(settings, 'SCORE_CACHE_LOCK_TIMEOUT', 30)
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def data_version(self, business_id):
+        key = f"{KEY_PREFIX}:version:{business_id}"
+        version = self.backend.get(key)
+        if version is None:
+            self.backend.add(key, uuid.uuid4().hex, timeout=None)
+            version = self.backend.get(key)
+        return version
+
+    def make_key(self, business_id, variant=None):
+        key = f"{KEY_PREFIX}:{business_id}:{self.data_version(business_id)}"
+        return f"{key}:{variant}" if variant else key
+
+    def invalidate(self, business_id):
+        self.backend.set(f"{KEY_PREFIX}:version:{business_id}", uuid.uuid4().hex, timeout=None)
+
+    def is_computing(self, business_id):
+        """True while this thread computes a payload of `business_id` in get_or_compute()."""
+        return business_id in getattr(self._local, 'computing', ())
+
+    @contextmanager
+    def _computing(self, business_id):
+        computing = getattr(self._local, 'computing', set())
+        self._local.computing = computing | {business_id}
+        try:
+            yield
+        finally:
+            self._local.computing = computing
+
+    def _compute(self, business_id, key, compute):
+        # The CreditScore that compute() may save is the payload being cached,
+        # so core.signals leaves the version token alone for it; any other
+        # change still replaces the token and hides this entry.
+        with self._computing(business_id):
+            payload = compute()
+        self.backend.set(key, payload)
+        return payload
+
+    def get(self, business_id, variant=None):
+        return self.backend.get(self.make_key(business_id, variant))
+
+    def set(self, business_id, payload, variant=None):
+        self.backend.set(self.make_key(business_id, variant), payload)
+
+    def get_or_compute_features(self, business_id, recent_start, compute):
+        """
+        Return the cached ScoreFeatures of `business_id`, or compute and cache them.
+        They depend on the day the recent activity window starts, so
+        `recent_start` is part of the key.
+        """
+        key = self.make_key(business_id, f"features:{recent_start.isoformat()}")
+        features = self.backend.get(key)
+        if features is None:
+            features = compute()
+            self.backend.set(key, features)
+        return features
+
+    def get_or_compute(self, business_id, compute, variant=None):
+        """
+        Return the cached payload of `business_id`, or compute and cache it.
+
+        Parameters:
+        - business_id (int): Business the payload belongs to.
+        - compute (callable): Returns the payload (a picklable dict).
+        - variant (str): Kept apart from the default payload, e.g. the
+          payload of a non-default scoring model.
+        """
+        key = self.make_key(business_id, variant)
+        payload = self.backend.get(key)
+        if payload is not None:
+            return payload
+
+        lock = f"{key}:lock"
+        if self.backend.add(lock, 1, timeout=self.lock_timeout):
+            try:
+                return self._compute(business_id, key, compute)
+            finally:
+                self.backend.delete(lock)
+
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            payload = self.backend.get(key)
+            if payload is not None:
+                return payload
+            if self.backend.get(lock) is None:
+                break  # the holder failed; compute it here
+
+        logger.warning("Score cache lock for business %s not released, computing anyway", business_id)
+        return self._compute(business_id, key, compute)
+
+
+_cache = None
+
+
+def get_score_cache():
+    global _cache
+    if _cache is None:
+        _cache = ScoreCache()
+    return _cache
@@ -1,92 +1,229 @@
-from datetime import timedelta
 from collections import defaultdict
-from django.utils import timezone
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
 from ingestion.models import BankTransaction as FinancialRecord
 from business.models import Business
-import statistics
+from .models import ScoreState
+from .feature_store import (  # noqa: F401 (re-exported)
+    RECENT_WINDOW_DAYS, average_growth, features_from_state, latest_features, recent_start,
+)
+from .money import KOBO_PER_NAIRA, db_kobo
+from .score_cache import get_score_cache
+from .scoring_models import (  # noqa: F401 (re-exported)
+    NO_DATA_VERSION, RULES_VERSION, ScoreFeatures, available_models, classify_risk, frequency_points,
+    get_model, revenue_trend_points, score_features, stability_points,
+)
+import numpy as np
 from decimal import Decimal
 
 
-class CreditScoringEngine:
-    def __init__(self, business: Business):
-        self.business = business
-        # Fixed: follow the ForeignKey from BankTransaction → statement → business
-        self.records = FinancialRecord.objects.filter(statement__business=business).order_by('date')
-
-    def calculate_score(self):
-        if not self.records.exists():
-            return 0, 'High', 'v1-no-data'
-
-        revenue_score = self._score_revenue_trend()
-        frequency_score = self._score_transaction_frequency()
-        stability_score = self._score_cash_flow_stability()
 
-        final_score = int((revenue_score + frequency_score + stability_score) / 3)
-        risk_level = self._classify_risk(final_score)
-        version = "v1-basic-rules"
+def balance_statistics(balances):
+    """
+    Count, mean and sample standard deviation of balances given in kobo.
+    The sum is exact; mean and deviation are float naira.
 
-        return final_score, risk_level, version
+    Returns:
+    - tuple: (count, mean, stdev); mean and stdev are None below two balances.
+    """
+    count = len(balances)
+    if count < 2:
+        return count, None, None
+    mean = int(balances.sum()) / count
+    deviation = balances - mean
+    stdev = (float(deviation @ deviation) / (count - 1)) ** 0.5
+    return count, mean / KOBO_PER_NAIRA, stdev / KOBO_PER_NAIRA
 
-    def _score_revenue_trend(self):
-        monthly_credits = defaultdict(Decimal)
-        for record in self.records:
-            if record.transaction_type == 'credit':
-                key = record.date.strftime('%Y-%m')
-                monthly_credits[key] += record.amount
 
+class CreditScoringEngine:
+    """
+    Scores a business from its ScoreFeatures, read from the feature store
+    (core.feature_store) and cached per business and day (see features()),
+    so scoring with several models costs a single read.
+
+    compute_features() is the fallback for businesses the store does not
+    cover yet: this class reads the transactions in Python, the subclasses
+    compute the same features from aggregates.
+
+    With `as_of` the business is scored as it stood at the end of that day:
+    transactions dated later, or from statements uploaded later, are
+    ignored and the recent activity window ends there. Such historical
+    scores bypass the store and the cache.
+    """
+
+    def __init__(self, business: Business, as_of=None):
+        self.business = business
+        self.as_of = as_of
+        # Denormalized business FK: served by the (business, date) index, no join
+        self.records = FinancialRecord.objects.scored().filter(business=business).order_by('date')
+        if as_of is not None:
+            self.records = self.records.known_on(as_of)
+
+    def calculate_score(self, version=None):
+        """
+        Score with the model registered under `version` (the SCORING_MODEL
+        default when None).
+
+        Returns:
+        - tuple: (score, risk_level, version)
+        """
+        return get_model(version).predict(self.features())
+
+    def calculate_scores(self, versions=None):
+        """
+        Score with several models (all registered ones by default) from one
+        feature computation.
+
+        Returns:
+        - dict: model version -> (score, risk_level, version)
+        """
+        features = self.features()
+        return {version: get_model(version).predict(features) for version in versions or available_models()}
+
+    def features(self) -> ScoreFeatures:
+        """load_features() through the score cache, until the business's data changes."""
+        if self.as_of is not None:
+            return self.compute_features()
+        return get_score_cache().get_or_compute_features(
+            self.business.id, self._recent_start(), self.load_features
+        )
+
+    def load_features(self) -> ScoreFeatures:
+        """Features from the feature store, or compute_features() when it has none."""
+        features = latest_features(self.business.id)
+        return features if features is not None else self.compute_features()
+
+    def compute_features(self) -> ScoreFeatures:
+        monthly_credits = defaultdict(int)
+        credits = (
+            self.records.filter(transaction_type='credit')
+            .annotate(kobo=db_kobo('amount'))
+            .values_list('date', 'kobo')
+        )
+        for day, amount in credits:
+            monthly_credits[day.year, day.month] += amount
         months = sorted(monthly_credits.keys())
-        if len(months) < 2:
-            return 500  # insufficient data
-
-        growth_rates = []
-        for i in range(1, len(months)):
-            prev = monthly_credits[months[i - 1]]
-            curr = monthly_credits[months[i]]
-            if prev > 0:
-                growth_rates.append(float((curr - prev) / prev))
-
-        avg_growth = sum(growth_rates) / len(growth_rates) if growth_rates else 0
-        if avg_growth >= 0.2:
-            return 850
-        elif avg_growth >= 0:
-            return 650
-        else:
-            return 400
-
-    def _score_transaction_frequency(self):
-        recent_start = timezone.now().date() - timedelta(days=90)
-        count = self.records.filter(date__gte=recent_start).count()
-
-        if count >= 90:
-            return 850
-        elif count >= 30:
-            return 650
-        elif count > 0:
-            return 400
-        return 250
-
-    def _score_cash_flow_stability(self):
+
         # NOTE: Assuming 'balance_after' was meant to be 'balance'
-        balances = [float(r.balance) for r in self.records if r.balance is not None]
-        if len(balances) < 5:
-            return 500
-
-        avg = statistics.mean(balances)
-        stddev = statistics.stdev(balances)
-        if avg == 0:
-            return 300
-
-        volatility = stddev / avg
-        if volatility < 0.2:
-            return 900
-        elif volatility < 0.5:
-            return 700
-        else:
-            return 450
+        balances = np.fromiter(
+            self.records.filter(balance__isnull=False)
+            .annotate(kobo=db_kobo('balance'))
+            .values_list('kobo', flat=True),
+            dtype=np.int64,
+        )
+        balance_count, balance_mean, balance_stdev = balance_statistics(balances)
+
+        return ScoreFeatures(
+            transaction_count=self.records.count(),
+            credit_months=len(months),
+            avg_revenue_growth=average_growth([monthly_credits[m] for m in months]),
+            recent_count=self.records.filter(date__gte=self._recent_start()).count(),
+            balance_count=balance_count,
+            balance_mean=balance_mean,
+            balance_stdev=balance_stdev,
+        )
+
+    def _recent_start(self):
+        return recent_start(self.as_of)
 
     def _classify_risk(self, score: int):
-        if score <= 400:
-            return 'High'
-        elif score <= 700:
-            return 'Medium'
-        return 'Low'
+        return classify_risk(score)
+
+
+class AggregatedCreditScoringEngine(CreditScoringEngine):
+    """
+    Same rules as CreditScoringEngine, but the inputs come from a single
+    GROUP BY month query instead of iterating every transaction in Python.
+    Credit totals are summed as BIGINT kobo. Balance mean/stddev are rebuilt
+    from per-month count, sum and sum of squares, which the database
+    computes exactly in NUMERIC (squared kobo can overflow BIGINT).
+    """
+
+    def compute_features(self) -> ScoreFeatures:
+        credit = Q(transaction_type='credit')
+        months = (
+            self.records
+            .order_by()
+            .annotate(month=TruncMonth('date'))
+            .values('month')
+            .annotate(
+                transactions=Count('id'),
+                credit_rows=Count('id', filter=credit),
+                credit_total=Sum(db_kobo('amount'), filter=credit),
+                recent=Count('id', filter=Q(date__gte=self._recent_start())),
+                balance_count=Count('balance'),
+                balance_sum=Sum('balance'),
+                balance_squares=Sum(F('balance') * F('balance')),
+            )
+            .order_by('month')
+        )
+
+        transaction_count = recent_count = balance_count = 0
+        balance_sum = balance_squares = Decimal(0)
+        monthly_credits = []
+        for month in months:
+            transaction_count += month['transactions']
+            recent_count += month['recent']
+            if month['credit_rows']:
+                monthly_credits.append(int(month['credit_total']))  # SUM(bigint) is NUMERIC on Postgres
+            if month['balance_count']:
+                balance_count += month['balance_count']
+                balance_sum += month['balance_sum']
+                balance_squares += month['balance_squares']
+
+        balance_mean = balance_stdev = None
+        if balance_count >= 2:
+            mean = balance_sum / balance_count
+            variance = (balance_squares - balance_sum * mean) / (balance_count - 1)
+            balance_mean = float(mean)
+            balance_stdev = float(max(variance, Decimal(0)).sqrt())
+
+        return ScoreFeatures(
+            transaction_count=transaction_count,
+            credit_months=len(monthly_credits),
+            avg_revenue_growth=average_growth(monthly_credits),
+            recent_count=recent_count,
+            balance_count=balance_count,
+            balance_mean=balance_mean,
+            balance_stdev=balance_stdev,
+        )
+
+
+class IncrementalCreditScoringEngine(AggregatedCreditScoringEngine):
+    """
+    Scores from the ScoreState / MonthlyAggregate / DailyTransactionCount
+    tables kept up to date by core.score_state, touching O(months) rows.
+    Businesses that were never backfilled, and historical (as_of) scores,
+    fall back to the aggregated query.
+    """
+
+    def compute_features(self) -> ScoreFeatures:
+        if self.as_of is not None:
+            return super().compute_features()
+        try:
+            state = ScoreState.objects.get(business=self.business)
+        except ScoreState.DoesNotExist:
+            return super().compute_features()
+        return features_from_state(state, self._recent_start())
+
+
+SCORING_ENGINES = {
+    'python': CreditScoringEngine,
+    'aggregate': AggregatedCreditScoringEngine,
+    'incremental': IncrementalCreditScoringEngine,
+}
+
+
+def get_scoring_engine(business: Business, mode=None, as_of=None):
+    """
+    Build the scoring engine selected by `mode`, or by the
+    SCORING_ENGINE_MODE setting when no mode is given, scoring as of
+    today or as of the historical date `as_of`.
+    """
+    mode = mode or getattr(settings, 'SCORING_ENGINE_MODE', 'python')
+    try:
+        engine_class = SCORING_ENGINES[mode]
+    except KeyError:
+        raise ValueError(f"Unknown scoring engine mode: {mode}")
+    return engine_class(business, as_of=as_of)
@@ -0,0 +1,217 @@
+"""
+Incremental maintenance of the per-business score state and feature store
+(ScoreState, MonthlyAggregate, DailyTransactionCount, FeatureSnapshot;
+see core.feature_store).
+
+New transactions are folded into the running aggregates as they are
+inserted; rebuild_score_state() recomputes everything from scratch for
+backfills, and check_score_state() compares the two.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime
+
+from django.db import transaction
+
+from ingestion.models import BankTransaction
+from .feature_store import features_from_state, refresh_features
+from .models import DailyTransactionCount, FeatureSnapshot, MonthlyAggregate, ScoreState
+from .money import KOBO_PER_NAIRA, to_kobo, to_naira
+from .score_engine import AggregatedCreditScoringEngine
+
+
+def _as_date(value):
+    # Rows coming straight from a DataFrame carry pandas Timestamps.
+    return value.date() if isinstance(value, datetime) else value
+
+
+def merge_welford(count, mean, m2, batch_count, batch_mean, batch_m2):
+    """
+    Combine two sets of (count, mean, M2) running statistics
+    using Chan et al.'s parallel form of Welford's algorithm.
+    """
+    if not batch_count:
+        return count, mean, m2
+    total = count + batch_count
+    delta = batch_mean - mean
+    mean = mean + delta * batch_count / total
+    m2 = m2 + batch_m2 + delta * delta * count * batch_count / total
+    return total, mean, m2
+
+
+def apply_transactions(business, transactions):
+    """
+    Fold newly inserted transactions into the business's score state and
+    feature store rows, then refresh its FeatureSnapshot.
+
+    The first time a business is seen its state is built from all of its
+    stored transactions instead, so transactions saved before the state
+    existed are not left out. Rows inferred by reconciliation are skipped.
+
+    Parameters:
+    - business (Business): Owner of the transactions.
+    - transactions (iterable): Objects with date, amount, balance and
+      transaction_type attributes (usually BankTransaction instances).
+    """
+    count = 0
+    batch_count, batch_mean, batch_m2 = 0, 0.0, 0.0
+    months = defaultdict(_MonthTotals)
+    daily = defaultdict(int)
+
+    for record in transactions:
+        if getattr(record, 'is_inferred', False):
+            continue
+        count += 1
+        day = _as_date(record.date)
+        daily[day] += 1
+        month = months[day.replace(day=1)]
+        month.add(record)
+        if record.balance is not None:
+            balance = to_kobo(record.balance) / KOBO_PER_NAIRA
+            batch_count += 1
+            delta = balance - batch_mean
+            batch_mean += delta / batch_count
+            batch_m2 += delta * (balance - batch_mean)
+
+    if not count:
+        return
+
+    with transaction.atomic():
+        state, created = ScoreState.objects.select_for_update().get_or_create(business=business)
+        if created and BankTransaction.objects.scored().filter(business=business).count() > count:
+            rebuild_score_state(business)
+            return
+        state.transaction_count += count
+        state.balance_count, state.balance_mean, state.balance_m2 = merge_welford(
+            state.balance_count, state.balance_mean, state.balance_m2,
+            batch_count, batch_mean, batch_m2,
+        )
+        state.save()
+
+        existing = {
+            row.month: row
+            for row in MonthlyAggregate.objects.filter(business=business, month__in=list(months))
+        }
+        new_rows = []
+        for month, totals in months.items():
+            row = existing.get(month)
+            if row is None:
+                row = MonthlyAggregate(business=business, month=month, credit_total=0, debit_total=0)
+                new_rows.append(row)
+            totals.apply_to(row)
+        MonthlyAggregate.objects.bulk_update(existing.values(), _MonthTotals.FIELDS)
+        MonthlyAggregate.objects.bulk_create(new_rows)
+
+        existing = {
+            row.day: row
+            for row in DailyTransactionCount.objects.filter(business=business, day__in=list(daily))
+        }
+        new_rows = []
+        for day, rows in daily.items():
+            row = existing.get(day)
+            if row is None:
+                new_rows.append(DailyTransactionCount(business=business, day=day, count=rows))
+            else:
+                row.count += rows
+        DailyTransactionCount.objects.bulk_update(existing.values(), ['count'])
+        DailyTransactionCount.objects.bulk_create(new_rows)
+
+        refresh_features(state)
+
+
+class _MonthTotals:
+    """Totals of one month of a batch, added onto its MonthlyAggregate row."""
+    FIELDS = [
+        'credit_total', 'credit_count', 'debit_total', 'debit_count', 'transaction_count',
+        'balance_count', 'balance_mean', 'balance_m2',
+    ]
+
+    def __init__(self):
+        self.credit_kobo = self.credit_count = 0
+        self.debit_kobo = self.debit_count = 0
+        self.rows = 0
+        self.balance_count, self.balance_mean, self.balance_m2 = 0, 0.0, 0.0
+
+    def add(self, record):
+        self.rows += 1
+        if record.transaction_type == 'credit':
+            self.credit_kobo += to_kobo(record.amount)
+            self.credit_count += 1
+        elif record.transaction_type == 'debit':
+            self.debit_kobo += abs(to_kobo(record.amount))
+            self.debit_count += 1
+        if record.balance is not None:
+            balance = to_kobo(record.balance) / KOBO_PER_NAIRA
+            self.balance_count += 1
+            delta = balance - self.balance_mean
+            self.balance_mean += delta / self.balance_count
+            self.balance_m2 += delta * (balance - self.balance_mean)
+
+    def apply_to(self, row):
+        row.credit_total = to_naira(to_kobo(row.credit_total) + self.credit_kobo)
+        row.credit_count += self.credit_count
+        row.debit_total = to_naira(to_kobo(row.debit_total) + self.debit_kobo)
+        row.debit_count += self.debit_count
+        row.transaction_count += self.rows
+        row.balance_count, row.balance_mean, row.balance_m2 = merge_welford(
+            row.balance_count, row.balance_mean, row.balance_m2,
+            self.balance_count, self.balance_mean, self.balance_m2,
+        )
+
+
+def drop_score_state(business_id):
+    """
+    Remove the score state and feature store rows of a business, e.g. after
+    some of its transactions were changed or deleted. Until it is rebuilt
+    (by its next upload or rebuild_score_state) it is scored from the
+    transactions.
+    """
+    with transaction.atomic():
+        FeatureSnapshot.objects.filter(business_id=business_id).delete()
+        ScoreState.objects.filter(business_id=business_id).delete()
+        MonthlyAggregate.objects.filter(business_id=business_id).delete()
+        DailyTransactionCount.objects.filter(business_id=business_id).delete()
+
+
+def rebuild_score_state(business):
+    """Recompute the score state and feature store rows of a business from all of its transactions."""
+    with transaction.atomic():
+        drop_score_state(business.id)
+        records = (
+            BankTransaction.objects.scored()
+            .filter(business=business)
+            .only('date', 'amount', 'balance', 'transaction_type', 'is_inferred')
+            .iterator(chunk_size=2000)
+        )
+        apply_transactions(business, records)
+
+
+def check_score_state(business, rel_tol=1e-9):
+    """
+    Compare the incremental features of a business with a full recomputation.
+
+    Returns:
+    - list[str]: One message per mismatching feature; empty when consistent.
+    """
+    engine = AggregatedCreditScoringEngine(business)
+    recent_start = engine._recent_start()
+    expected = engine.compute_features()
+
+    try:
+        state = ScoreState.objects.get(business=business)
+    except ScoreState.DoesNotExist:
+        if expected.transaction_count:
+            return ['score state is missing']
+        return []
+
+    actual = features_from_state(state, recent_start)
+    mismatches = []
+    for field in expected._fields:
+        want, got = getattr(expected, field), getattr(actual, field)
+        if want is None or got is None:
+            equal = want == got
+        else:
+            equal = math.isclose(want, got, rel_tol=rel_tol, abs_tol=1e-6)
+        if not equal:
+            mismatches.append(f"{field}: incremental={got} full={want}")
+    return mismatches
@@ -0,0 +1,255 @@
+"""
+Versioned scoring models.
+
+Every engine in core.score_engine / core.batch_engine reduces a business
+to one ScoreFeatures tuple; a scoring model turns that tuple into
+(score, risk_level, version). Models are registered under their version,
+so several of them (a champion and its challengers) can score the same
+features from a single pass over the data, and a request can pick one
+with ?data_version=.
+
+Besides the v1 rules, models are loaded from the JSON artifacts listed
+in SCORING_MODEL_ARTIFACTS (see load_artifact). A logistic model:
+
+    {
+        "version": "v2-logistic",
+        "intercept": -1.2,
+        "coefficients": {"balance_volatility": 0.8, "recent_count": -0.01},
+        "means": {"recent_count": 40},
+        "scales": {"recent_count": 25},
+        "score_range": [300, 850]
+    }
+
+predicts the probability of default from the standardised features (see
+feature_vector) and maps 1 - probability onto score_range. A rule set:
+
+    {"type": "rules", "version": "v1-rules-growth15", "thresholds": {"high_growth": 0.15}}
+
+is the v1 rules with some of RULE_THRESHOLDS changed, e.g. a candidate
+to compare with `manage.py backtest`.
+"""
+import json
+import math
+from collections import namedtuple
+
+from django.conf import settings
+
+NO_DATA_VERSION = 'v1-no-data'
+RULES_VERSION = 'v1-basic-rules'
+
+# Everything the rules need to know about a business, whichever way it was computed.
+ScoreFeatures = namedtuple('ScoreFeatures', [
+    'transaction_count',
+    'credit_months',
+    'avg_revenue_growth',
+    'recent_count',
+    'balance_count',
+    'balance_mean',
+    'balance_stdev',
+])
+# Inputs of learned models, see feature_vector()
+FEATURE_NAMES = ScoreFeatures._fields + ('balance_volatility',)
+
+
+# Thresholds of the v1 rules; rule set artifacts override some of them.
+RULE_THRESHOLDS = {
+    'min_credit_months': 2,
+    'high_growth': 0.2,
+    'low_growth': 0.0,
+    'high_frequency': 90,
+    'mid_frequency': 30,
+    'min_balances': 5,
+    'low_volatility': 0.2,
+    'mid_volatility': 0.5,
+}
+
+
+class UnknownScoringModel(ValueError):
+    """Raised when no scoring model is registered under a version."""
+
+
+def revenue_trend_points(credit_months, avg_growth, thresholds=RULE_THRESHOLDS):
+    if credit_months < thresholds['min_credit_months']:
+        return 500  # insufficient data
+    if avg_growth >= thresholds['high_growth']:
+        return 850
+    elif avg_growth >= thresholds['low_growth']:
+        return 650
+    else:
+        return 400
+
+
+def frequency_points(recent_count, thresholds=RULE_THRESHOLDS):
+    if recent_count >= thresholds['high_frequency']:
+        return 850
+    elif recent_count >= thresholds['mid_frequency']:
+        return 650
+    elif recent_count > 0:
+        return 400
+    return 250
+
+
+def stability_points(balance_count, balance_mean, balance_stdev, thresholds=RULE_THRESHOLDS):
+    if balance_count < thresholds['min_balances']:
+        return 500
+    if balance_mean == 0:
+        return 300
+
+    volatility = balance_stdev / balance_mean
+    if volatility < thresholds['low_volatility']:
+        return 900
+    elif volatility < thresholds['mid_volatility']:
+        return 700
+    else:
+        return 450
+
+
+def classify_risk(score: int):
+    if score <= 400:
+        return 'High'
+    elif score <= 700:
+        return 'Medium'
+    return 'Low'
+
+
+def score_features(features: ScoreFeatures, thresholds=RULE_THRESHOLDS, version=RULES_VERSION):
+    """
+    Apply the v1 rules to a feature tuple.
+    Returns the same (score, risk_level, version) tuple as CreditScoringEngine.
+    """
+    if not features.transaction_count:
+        return 0, 'High', NO_DATA_VERSION
+
+    revenue_score = revenue_trend_points(features.credit_months, features.avg_revenue_growth, thresholds)
+    frequency_score = frequency_points(features.recent_count, thresholds)
+    stability_score = stability_points(
+        features.balance_count, features.balance_mean, features.balance_stdev, thresholds
+    )
+
+    final_score = int((revenue_score + frequency_score + stability_score) / 3)
+    return final_score, classify_risk(final_score), version
+
+
+def feature_vector(features: ScoreFeatures):
+    """
+    Numeric inputs of learned models: every ScoreFeatures field (None as 0)
+    plus balance_volatility, the stdev / |mean| ratio used by the rules.
+    """
+    vector = {name: float(value or 0) for name, value in features._asdict().items()}
+    mean = vector['balance_mean']
+    vector['balance_volatility'] = vector['balance_stdev'] / abs(mean) if mean else 0.0
+    return vector
+
+
+class RuleBasedModel:
+    """
+    The v1 rules: average of the revenue, frequency and stability points,
+    optionally with some RULE_THRESHOLDS changed (a candidate rule set).
+    """
+
+    def __init__(self, version=RULES_VERSION, thresholds=None):
+        unknown = set(thresholds or ()) - set(RULE_THRESHOLDS)
+        if unknown:
+            raise ValueError(f"Unknown thresholds in model {version}: {', '.join(sorted(unknown))}")
+        self.version = version
+        self.thresholds = {**RULE_THRESHOLDS, **(thresholds or {})}
+
+    def predict(self, features: ScoreFeatures):
+        return score_features(features, self.thresholds, self.version)
+
+
+class LogisticModel:
+    """
+    Logistic regression on feature_vector(), loaded from a JSON artifact
+    (see the module docstring). Features missing from `coefficients` are
+    ignored; businesses without transactions get the no-data score.
+    """
+
+    def __init__(self, version, intercept, coefficients, means=None, scales=None, score_range=(300, 850)):
+        unknown = set(coefficients) - set(FEATURE_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown features in model {version}: {', '.join(sorted(unknown))}")
+        self.version = version
+        self.intercept = float(intercept)
+        self.coefficients = {name: float(weight) for name, weight in coefficients.items()}
+        self.means = means or {}
+        self.scales = scales or {}
+        self.score_range = tuple(score_range)
+
+    def default_probability(self, features: ScoreFeatures):
+        vector = feature_vector(features)
+        z = self.intercept + sum(
+            weight * (vector[name] - self.means.get(name, 0.0)) / (self.scales.get(name) or 1.0)
+            for name, weight in self.coefficients.items()
+        )
+        return 1 / (1 + math.exp(-max(min(z, 500.0), -500.0)))
+
+    def predict(self, features: ScoreFeatures):
+        if not features.transaction_count:
+            return 0, 'High', NO_DATA_VERSION
+        low, high = self.score_range
+        score = int(round(low + (high - low) * (1 - self.default_probability(features))))
+        return score, classify_risk(score), self.version
+
+
+_registry = {}
+_artifacts_loaded = False
+
+
+def register_model(model):
+    """Make `model` (anything with .version and .predict(features)) selectable by its version."""
+    _registry[model.version] = model
+    return model
+
+
+def load_artifact(path):
+    """
+    Build the model described by a JSON artifact: a RuleBasedModel when its
+    "type" is "rules", otherwise a LogisticModel. It is not registered.
+    """
+    with open(path, encoding='utf-8') as f:
+        spec = json.load(f)
+    model_type = spec.pop('type', 'logistic')
+    if model_type == 'rules':
+        return RuleBasedModel(**spec)
+    if model_type == 'logistic':
+        return LogisticModel(**spec)
+    raise ValueError(f"Unknown scoring model type in {path}: {model_type}")
+
+
+def _load_artifacts():
+    global _artifacts_loaded
+    if _artifacts_loaded:
+        return
+    for path in getattr(settings, 'SCORING_MODEL_ARTIFACTS', []):
+        register_model(load_artifact(path))
+    _artifacts_loaded = True
+
+
+def available_models():
+    """Registered versions, the default (SCORING_MODEL) first."""
+    _load_artifacts()
+    default = default_version()
+    return sorted(_registry, key=lambda version: (version != default, version))
+
+
+def default_version():
+    return getattr(settings, 'SCORING_MODEL', RULES_VERSION)
+
+
+def get_model(version=None):
+    """
+    The model registered under `version`, or the SCORING_MODEL default.
+
+    Raises:
+    - UnknownScoringModel: If no model has that version.
+    """
+    _load_artifacts()
+    version = version or default_version()
+    try:
+        return _registry[version]
+    except KeyError:
+        raise UnknownScoringModel(f"Unknown scoring model: {version}")
+
+
+register_model(RuleBasedModel())
@@ -1,7 +1,6 @@
 # core/serializers.py
 from rest_framework import serializers
 from .models import CreditScore
-#from audit.models import ScoreAuditLog  # Ensure this path is correct
 
 
 class CreditScoreSerializer(serializers.ModelSerializer):
@@ -50,20 +49,3 @@ class RiskLevelSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(f"Risk level must be one of {valid_levels}.")
         return value
 
-
-class ScoreAuditLogSerializer(serializers.ModelSerializer):
-    business_id = serializers.UUIDField(source='sme.id', read_only=True)
-    business_name = serializers.CharField(source='sme.business_name', read_only=True)
-
-    class Meta:
-        model = ScoreAuditLog
-        fields = [
-            'business_id',
-            'business_name',
-            'score',
-            'risk_level',
-            'data_version',
-            'timestamp',
-            'requested_by'
-        ]
-        read_only_fields = fields
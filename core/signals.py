@@ -0,0 +1,57 @@
+"""
+Invalidate cached scores when the data behind them changes.
+
+Invalidation runs after the surrounding transaction commits, so a request
+racing the upload cannot cache the old score under the new data version.
+Deleting a statement or editing a stored transaction also drops the
+business's feature store rows (core.score_state), which only ever add
+new transactions.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ingestion.models import BankStatement, BankTransaction
+from ingestion.signals import transactions_saved
+from .models import CreditScore
+from .score_cache import get_score_cache
+from .score_state import drop_score_state
+
+
+def invalidate_score(business_id):
+    transaction.on_commit(lambda: get_score_cache().invalidate(business_id))
+
+
+def invalidate_features(business_id):
+    # Registered before the cache invalidation, so it runs first on commit
+    transaction.on_commit(lambda: drop_score_state(business_id))
+    invalidate_score(business_id)
+
+
+@receiver(transactions_saved)
+def transactions_saved_handler(sender, business_id, **kwargs):
+    invalidate_score(business_id)
+
+
+@receiver(post_save, sender=BankStatement)
+def statement_saved(sender, instance, **kwargs):
+    invalidate_score(instance.business_id)
+
+
+@receiver(post_delete, sender=BankStatement)
+def statement_deleted(sender, instance, **kwargs):
+    invalidate_features(instance.business_id)
+
+
+@receiver(post_save, sender=BankTransaction)
+def transaction_saved(sender, instance, **kwargs):
+    business_id = BankStatement.objects.filter(id=instance.statement_id).values_list('business_id', flat=True).first()
+    if business_id is not None:
+        invalidate_features(business_id)
+
+
+@receiver([post_save, post_delete], sender=CreditScore)
+def credit_score_changed(sender, instance, **kwargs):
+    # A score saved while the score cache computes it is the payload being cached
+    if not get_score_cache().is_computing(instance.sme_id):
+        invalidate_score(instance.sme_id)
@@ -0,0 +1,259 @@
+import shutil
+import statistics
+import tempfile
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from hypothesis import given, strategies as st
+from rest_framework.test import APIClient
+
+from business.models import Business
+from ingestion.models import BankTransaction
+from ingestion.pipeline import clean_transactions, save_statement
+from users.models import User
+from .batch_engine import BatchCreditScoringEngine, SnapshotCreditScoringEngine
+from . import views
+from .feature_store import latest_features
+from .models import CreditScore
+from .money import MISSING, to_kobo, to_kobo_array, to_naira
+from .score_engine import SCORING_ENGINES, average_growth, balance_statistics, get_scoring_engine
+from .scoring_models import ScoreFeatures, available_models, get_model
+
+LOCMEM_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'test-{alias}'}
+    for alias in settings.CACHES
+}
+
+
+def statement_frame(first_row, last_row):
+    """
+    Rows first_row..last_row of one account, a day apart and ending
+    yesterday, with a running balance that reconciles. Frames of
+    overlapping row ranges share the overlapping rows exactly.
+    """
+    start = timezone.now().date() - timedelta(days=300)
+    rows = []
+    balance = 5_000_000  # kobo
+    for i in range(last_row + 1):
+        amount = (i * 7919) % 250_000 - 100_000 + i % 97
+        balance += amount
+        if i >= first_row:
+            rows.append({
+                'date': (start + timedelta(days=i)).isoformat(),
+                'amount': amount / 100,
+                'balance': balance / 100,
+                'description': f'TRANSFER {i}',
+                'transaction_type': 'credit' if amount > 0 else 'debit',
+                'channel': 'TRANSFER',
+                'counterparty': None,
+            })
+    return pd.DataFrame(rows)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class EngineParityTests(TestCase):
+    """Every scoring engine computes the same features from the same statements."""
+
+    def setUp(self):
+        self.blob_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.blob_root, ignore_errors=True)
+        storages = {**settings.STORAGES, 'statements': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+            'OPTIONS': {'location': self.blob_root},
+        }}
+        storage_override = override_settings(STORAGES=storages)
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+
+        self.owner = User.objects.create_user('owner@example.com', 'password', first_name='Ada', last_name='Obi')
+        # Two statements overlapping by 50 days
+        self.business = self.make_business('Mama Put Ltd', [(0, 199), (150, 299)])
+
+    def make_business(self, name, statements):
+        business = Business.objects.create(
+            name=name, registration_number=f'RC{Business.objects.count() + 1}', industry='Food', country='NG',
+            city='Lagos', owner=self.owner,
+        )
+        for index, (first_row, last_row) in enumerate(statements):
+            file_path = f'{self.blob_root}/statement-{business.id}-{index}.pdf'
+            with open(file_path, 'wb') as pdf:
+                pdf.write(f'%PDF-{business.id}-{index}'.encode())
+            df, summary = clean_transactions(statement_frame(first_row, last_row))
+            save_statement(business, df, summary, file_path)
+        return business
+
+    def assertSameFeatures(self, features, expected):
+        for field, value, expected_value in zip(expected._fields, features, expected):
+            if isinstance(expected_value, float):
+                self.assertAlmostEqual(value, expected_value, delta=abs(expected_value) * 1e-9, msg=field)
+            else:
+                self.assertEqual(value, expected_value, msg=field)
+
+    def test_overlapping_statements_are_stored_once(self):
+        self.assertEqual(BankTransaction.objects.filter(business=self.business).count(), 300)
+
+    def assertEnginesAgree(self, business, transaction_count):
+        expected = get_scoring_engine(business, 'python').compute_features()
+        self.assertEqual(expected.transaction_count, transaction_count)
+
+        computed = {
+            mode: get_scoring_engine(business, mode).compute_features() for mode in SCORING_ENGINES
+        }
+        computed['batch'] = BatchCreditScoringEngine(use_feature_store=False).compute_features([business.id])[0]
+        computed['snapshot'] = SnapshotCreditScoringEngine(use_feature_store=False).compute_features([business.id])[0]
+        if transaction_count:
+            # The store has no row for a business without statements
+            computed['feature store'] = latest_features(business.id)
+
+        for engine, features in computed.items():
+            with self.subTest(engine=engine, business=business.name):
+                self.assertSameFeatures(features, expected)
+                for version in available_models():
+                    self.assertEqual(get_model(version).predict(features), get_model(version).predict(expected))
+
+    def test_engines_compute_the_same_features(self):
+        self.assertEnginesAgree(self.business, 300)
+
+    def test_engines_agree_below_two_balances(self):
+        # Mean and deviation need two balances: every engine leaves them None
+        self.assertEnginesAgree(self.make_business('One Row Ltd', [(0, 0)]), 1)
+        self.assertEnginesAgree(self.make_business('No Rows Ltd', []), 0)
+
+    def test_batch_scores_match_single_scores(self):
+        batch = BatchCreditScoringEngine(use_feature_store=False).score_many([self.business.id])
+        single = get_scoring_engine(self.business, 'aggregate').calculate_score()
+        self.assertEqual(batch[self.business.id], single)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ScoreCacheTests(TestCase):
+    def setUp(self):
+        caches[settings.SCORE_CACHE_ALIAS].clear()
+        owner = User.objects.create_user('owner@example.com', 'password', first_name='Ada', last_name='Obi')
+        self.business = Business.objects.create(
+            name='Mama Put Ltd', registration_number='RC1', industry='Food', country='NG', city='Lagos', owner=owner
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+        patcher = mock.patch('core.views._score_payload', wraps=views._score_payload)
+        self.score_payload = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_risk_level(self):
+        # Run the on-commit cache invalidations as they would run outside a test transaction
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(reverse('risk-level', args=[self.business.id]))
+        self.assertEqual(response.status_code, 200)
+        return response.data['risk_level']
+
+    def test_first_miss_is_cached(self):
+        first = self.get_risk_level()
+        second = self.get_risk_level()
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.score_payload.call_count, 1)
+        self.assertEqual(CreditScore.objects.filter(sme=self.business).count(), 1)
+
+    def test_score_saved_elsewhere_invalidates(self):
+        self.get_risk_level()
+        with self.captureOnCommitCallbacks(execute=True):
+            CreditScore.objects.filter(sme=self.business).first().save()
+        self.get_risk_level()
+
+        self.assertEqual(self.score_payload.call_count, 2)
+
+
+class MoneyTests(SimpleTestCase):
+    def test_to_kobo_rounds_half_away_from_zero(self):
+        cases = [
+            (Decimal('0.005'), 1), (Decimal('-0.005'), -1), (Decimal('0.004'), 0), (Decimal('1.235'), 124),
+            (Decimal('-1.235'), -124), ('12.345', 1235), (2.675, 268), (0.1 + 0.2, 30), (7, 700), (-3, -300),
+        ]
+        for value, kobo in cases:
+            with self.subTest(value=value):
+                self.assertEqual(to_kobo(value), kobo)
+
+    def test_to_kobo_passes_none_and_rejects_text(self):
+        self.assertIsNone(to_kobo(None))
+        with self.assertRaises(InvalidOperation):
+            to_kobo('N/A')
+
+    def test_to_kobo_array_rounds_half_away_from_zero(self):
+        values = [0.005, -0.005, 0.004, 1.005, -1.235, 2.675, 0.125, 0.1 + 0.2]
+        self.assertEqual(to_kobo_array(values).tolist(), [1, -1, 0, 101, -124, 268, 13, 30])
+
+    def test_to_kobo_array_marks_missing_values(self):
+        kobo = to_kobo_array([1.5, None, float('nan'), -0.01])
+        self.assertEqual(kobo.dtype, np.int64)
+        self.assertEqual(kobo.tolist(), [150, MISSING, MISSING, -1])
+
+
+# Naira amounts up to 10 billion with a third decimal place, so sub-kobo halves are covered
+naira = st.decimals(min_value=-10 ** 10, max_value=10 ** 10, places=3)
+naira_2dp = st.decimals(min_value=-10 ** 9, max_value=10 ** 9, places=2)
+
+
+def decimal_features(monthly_credits, balances):
+    """Features as computed before integer kobo: Decimal sums, statistics on float balances."""
+    growth_rates = [
+        float((curr - prev) / prev) for prev, curr in zip(monthly_credits, monthly_credits[1:]) if prev > 0
+    ]
+    floats = [float(balance) for balance in balances]
+    return ScoreFeatures(
+        transaction_count=len(balances) + 1,
+        credit_months=len(monthly_credits),
+        avg_revenue_growth=sum(growth_rates) / len(growth_rates) if growth_rates else 0,
+        recent_count=len(balances),
+        balance_count=len(floats),
+        balance_mean=statistics.mean(floats) if len(floats) >= 2 else None,
+        balance_stdev=statistics.stdev(floats) if len(floats) >= 2 else None,
+    )
+
+
+def kobo_features(monthly_credits, balances):
+    balance_count, balance_mean, balance_stdev = balance_statistics(to_kobo_array(balances))
+    return ScoreFeatures(
+        transaction_count=len(balances) + 1,
+        credit_months=len(monthly_credits),
+        avg_revenue_growth=average_growth([to_kobo(total) for total in monthly_credits]),
+        recent_count=len(balances),
+        balance_count=balance_count,
+        balance_mean=balance_mean,
+        balance_stdev=balance_stdev,
+    )
+
+
+class MoneyPropertyTests(SimpleTestCase):
+    @given(st.integers(min_value=-10 ** 15, max_value=10 ** 15))
+    def test_naira_round_trip(self, kobo):
+        naira = to_naira(kobo)
+        self.assertEqual(naira.as_tuple().exponent, -2)
+        self.assertEqual(to_kobo(naira), kobo)
+        self.assertEqual(to_kobo(str(naira)), kobo)
+
+    @given(st.lists(naira))
+    def test_to_kobo_array_rounds_like_to_kobo(self, values):
+        expected = [to_kobo(value) for value in values]
+        self.assertEqual(to_kobo_array([float(value) for value in values]).tolist(), expected)
+        self.assertEqual([to_kobo(float(value)) for value in values], expected)
+
+    @given(st.lists(naira_2dp, max_size=24), st.lists(naira_2dp, max_size=200))
+    def test_kobo_features_score_like_decimal_features(self, monthly_credits, balances):
+        expected = decimal_features(monthly_credits, balances)
+        features = kobo_features(monthly_credits, balances)
+
+        for field, value, expected_value in zip(expected._fields, features, expected):
+            if isinstance(expected_value, float):
+                self.assertAlmostEqual(value, expected_value, delta=abs(expected_value) * 1e-9 + 1e-9, msg=field)
+            else:
+                self.assertEqual(value, expected_value, msg=field)
+        for version in available_models():
+            self.assertEqual(get_model(version).predict(features), get_model(version).predict(expected))
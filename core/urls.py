@@ -1,7 +1,10 @@
 from django.urls import path
-from .views import RiskLevelView, ScoreFromStatementView
+from .views import RiskLevelView, ScoreFromStatementView, BulkRiskLevelView, BulkScoreView, ScoringModelsView
 
 urlpatterns = [
+    path('risk/bulk/', BulkRiskLevelView.as_view(), name='risk-level-bulk'),
+    path('scores/bulk/', BulkScoreView.as_view(), name='scores-bulk'),
+    path('scoring-models/', ScoringModelsView.as_view(), name='scoring-models'),
     path('risk/<int:business_id>/', RiskLevelView.as_view(), name='risk-level'),
     path('score-from-statement/<uuid:statement_id>/', ScoreFromStatementView.as_view(), name='score-from-statement'),
 ]
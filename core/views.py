@@ -1,50 +1,130 @@
 # core/views.py
 from ingestion.models import BankStatement  # ensure this model exists
 from .models import CreditScore, Business
-from audit.models import ScoreAuditLog
+from audit.buffer import flush as flush_audit_logs, record_score
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .score_engine import CreditScoringEngine  # Import the scoring engine
+from django.utils import timezone
+from .batch_engine import BatchCreditScoringEngine, store_scores
+from .score_cache import get_score_cache
+from .score_engine import get_scoring_engine  # Import the scoring engine
+from .scoring_models import UnknownScoringModel, available_models, default_version, get_model
 from django.shortcuts import render
 
+
+def _requested_version(version):
+    """
+    The scoring model version asked for by a request, or None for the
+    default model (whose scores are stored in CreditScore).
+
+    Raises:
+    - UnknownScoringModel: If no model is registered under `version`.
+    """
+    if not version or version == default_version():
+        return None
+    return get_model(version).version
+
+
+def _unknown_version_response(error):
+    return Response(
+        {"error": str(error), "available": available_models()},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+def _score_payload(business, refresh=False, statement=None, version=None):
+    """
+    Stored score of `business` as a cacheable dict,
+    running the engine when there is none yet (or on refresh).
+    With a non-default model `version` the score is computed from the
+    cached features and not stored.
+    New calculations are recorded in the score audit log.
+    """
+    if version:
+        score, risk_level, data_version = get_scoring_engine(business).calculate_score(version)
+        record_score(
+            business.id, score, risk_level, data_version,
+            requested_by="api",
+            statement_id=statement.id if statement else None
+        )
+        return {
+            "score": score,
+            "risk_level": risk_level,
+            "data_version": data_version,
+            "calculated_at": timezone.now()
+        }
+
+    credit_score = CreditScore.objects.filter(sme=business).first()
+
+    if not credit_score or refresh:
+        engine = get_scoring_engine(business)
+        score, risk_level, version = engine.calculate_score()
+        credit_score, _ = CreditScore.objects.update_or_create(
+            sme=business,
+            defaults={
+                'score': score,
+                'risk_level': risk_level,
+                'data_version': version
+            }
+        )
+        record_score(
+            business.id,
+            credit_score.score,
+            credit_score.risk_level,
+            credit_score.data_version,
+            requested_by="api",
+            statement_id=statement.id if statement else None
+        )
+
+    return {
+        "score": credit_score.score,
+        "risk_level": credit_score.risk_level,
+        "data_version": credit_score.data_version,
+        "calculated_at": credit_score.calculated_at
+    }
+
+
 class ScoreFromStatementView(APIView):
+    """
+    GET /api/score-from-statement/<statement_id>/
+    Returns the score of the statement's business, from the score cache
+    when the business's data has not changed. ?refresh=true recalculates;
+    ?data_version= scores with another registered model.
+    """
+
     def get(self, request, statement_id):
-        statement = get_object_or_404(BankStatement, id=statement_id)
+        statement = get_object_or_404(BankStatement.objects.select_related('business'), id=statement_id)
         business = statement.business  # assuming FK from statement to business
 
         refresh = request.query_params.get("refresh", "false").lower() == "true"
         try:
-            credit_score = getattr(business, 'credit_score', None)
-
-            if not credit_score or refresh:
-                engine = CreditScoringEngine(business)
-                score, risk_level, version = engine.calculate_score()
-                credit_score, _ = CreditScore.objects.update_or_create(
-                    sme=business,
-                    defaults={
-                        'score': score,
-                        'risk_level': risk_level,
-                        'data_version': version
-                    }
-                )
-                ScoreAuditLog.objects.create(
-                    sme=business,
-                    score=credit_score.score,
-                    risk_level=credit_score.risk_level,
-                    data_version=credit_score.data_version,
-                    requested_by="api"
+            version = _requested_version(request.query_params.get("data_version"))
+        except UnknownScoringModel as e:
+            return _unknown_version_response(e)
+        try:
+            cache = get_score_cache()
+            if refresh:
+                payload = _score_payload(business, refresh=True, statement=statement, version=version)
+                cache.set(business.id, payload, variant=version)
+            else:
+                payload = cache.get_or_compute(
+                    business.id,
+                    lambda: _score_payload(business, statement=statement, version=version),
+                    variant=version
                 )
 
             return Response({
                 "statement_id": str(statement.id),
                 "business_id": str(business.id),
                 "business_name": business.name,
-                "score": credit_score.score,
-                "risk_level": credit_score.risk_level,
-                "data_version": credit_score.data_version,
-                "calculated_at": credit_score.calculated_at
+                **payload
             }, status=200)
 
         except Exception as e:
@@ -59,46 +139,153 @@ class RiskLevelView(APIView):
     """
     GET /api/risk/<business_id>/
     Returns risk level only for a given business.
+    Served from the score cache without touching the database on a hit.
+    ?data_version= picks another registered scoring model.
     """
 
     def get(self, request, business_id):
-        business = get_object_or_404(Business, id=business_id)
-
         try:
-            credit_score = getattr(business, 'credit_score', None)
-
-            if not credit_score:
-                engine = CreditScoringEngine(business)
-                score, risk_level, version = engine.calculate_score()
-
-                credit_score, _ = CreditScore.objects.update_or_create(
-                    sme=business,
-                    defaults={
-                        'score': score,
-                        'risk_level': risk_level,
-                        'data_version': version
-                    }
-                )
-
-                ScoreAuditLog.objects.create(
-                    sme=business,
-                    score=credit_score.score,
-                    risk_level=credit_score.risk_level,
-                    data_version=credit_score.data_version,
-                    requested_by="api"
-                )
+            version = _requested_version(request.query_params.get("data_version"))
+        except UnknownScoringModel as e:
+            return _unknown_version_response(e)
+        try:
+            payload = get_score_cache().get_or_compute(
+                business_id,
+                lambda: _score_payload(get_object_or_404(Business, id=business_id), version=version),
+                variant=version
+            )
 
             return Response({
-                "business_id": str(business.id),
-                "risk_level": credit_score.risk_level
+                "business_id": str(business_id),
+                "risk_level": payload["risk_level"]
             }, status=status.HTTP_200_OK)
 
+        except Http404:
+            raise
         except Exception as e:
             return Response({
                 "error": "Failed to retrieve risk level.",
                 "details": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class BulkScoreView(APIView):
+    """
+    POST /api/scores/bulk/ with {"business_ids": [...]}
+    Streams one JSON line per business: existing scores are read with one
+    query, missing ones are computed together by BatchCreditScoringEngine.
+    With a non-default "data_version" every business is scored with that
+    model and nothing is stored.
+    At most BULK_SCORING_MAX_IDS ids per request.
+    """
+    fields = ["score", "risk_level", "data_version", "calculated_at"]
+
+    def post(self, request):
+        business_ids = request.data.get("business_ids")
+        max_ids = getattr(settings, "BULK_SCORING_MAX_IDS", 500)
+
+        if (
+            not isinstance(business_ids, list) or not business_ids
+            or not all(isinstance(business_id, int) and not isinstance(business_id, bool) for business_id in business_ids)
+        ):
+            return Response(
+                {"error": "business_ids must be a non-empty list of integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(business_ids) > max_ids:
+            return Response(
+                {"error": f"At most {max_ids} business_ids are allowed per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            version = _requested_version(request.data.get("data_version"))
+        except UnknownScoringModel as e:
+            return _unknown_version_response(e)
+
+        business_ids = list(dict.fromkeys(business_ids))
+        return StreamingHttpResponse(
+            self.iter_model_lines(business_ids, version) if version else self.iter_lines(business_ids),
+            content_type="application/x-ndjson"
+        )
+
+    def iter_model_lines(self, business_ids, version):
+        existing = list(Business.objects.filter(id__in=business_ids).values_list("id", flat=True))
+        if existing:
+            try:
+                results = BatchCreditScoringEngine().score_many(existing, version)
+            except Exception as e:
+                for business_id in existing:
+                    yield self.line(business_id, error=f"Failed to calculate score: {str(e)}")
+            else:
+                calculated_at = timezone.now()
+                for business_id, (score, risk_level, data_version) in results.items():
+                    record_score(business_id, score, risk_level, data_version, requested_by="bulk-api")
+                    yield self.line(business_id, CreditScore(
+                        sme_id=business_id, score=score, risk_level=risk_level,
+                        data_version=data_version, calculated_at=calculated_at
+                    ))
+                flush_audit_logs()
+
+        for business_id in set(business_ids) - set(existing):
+            yield self.line(business_id, error="Business not found")
+
+    def iter_lines(self, business_ids):
+        scored = set()
+        for credit_score in CreditScore.objects.filter(sme_id__in=business_ids):
+            scored.add(credit_score.sme_id)
+            yield self.line(credit_score.sme_id, credit_score)
+
+        missing = list(
+            Business.objects.filter(id__in=[i for i in business_ids if i not in scored]).values_list("id", flat=True)
+        )
+        if missing:
+            try:
+                stored = store_scores(BatchCreditScoringEngine().score_many(missing))
+            except Exception as e:
+                for business_id in missing:
+                    yield self.line(business_id, error=f"Failed to calculate score: {str(e)}")
+            else:
+                for credit_score in stored:
+                    record_score(
+                        credit_score.sme_id,
+                        credit_score.score,
+                        credit_score.risk_level,
+                        credit_score.data_version,
+                        requested_by="bulk-api"
+                    )
+                    yield self.line(credit_score.sme_id, credit_score)
+                # The body is streamed after the middleware has flushed
+                flush_audit_logs()
+
+        for business_id in set(business_ids) - scored - set(missing):
+            yield self.line(business_id, error="Business not found")
+
+    def line(self, business_id, credit_score=None, error=None):
+        data = {"business_id": str(business_id)}
+        if error:
+            data["error"] = error
+        else:
+            data.update({field: getattr(credit_score, field) for field in self.fields})
+        return json.dumps(data, cls=DjangoJSONEncoder) + "\n"
+
+
+class BulkRiskLevelView(BulkScoreView):
+    """
+    POST /api/risk/bulk/ with {"business_ids": [...]}
+    Risk levels only; see BulkScoreView.
+    """
+    fields = ["risk_level"]
+
+
+class ScoringModelsView(APIView):
+    """
+    GET /api/scoring-models/
+    Versions accepted as ?data_version= (or "data_version" in bulk requests).
+    """
+
+    def get(self, request):
+        return Response({"default": default_version(), "models": available_models()})
+
+
 def home_view(request):
     """
     This view will serve the 'index.html' template located in the
@@ -0,0 +1,70 @@
+import hashlib
+
+from django.core.files import File
+from django.core.files.storage import storages
+
+CHUNK_SIZE = 64 * 1024
+
+
+def hash_file(fileobj):
+    """
+    SHA-256 hex digest of a file-like object, read in chunks.
+    The file is rewound before and after hashing.
+    """
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """
+    Content-addressed blob store on top of any Django storage backend.
+    Blobs are keyed by the SHA-256 of their content, so storing the
+    same file twice keeps a single copy.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    @staticmethod
+    def _name(key):
+        return f"{key[:2]}/{key[2:4]}/{key}"
+
+    def put(self, fileobj, key=None):
+        """
+        Store a file-like object and return its key.
+
+        Parameters:
+        - fileobj: Binary file-like object.
+        - key (str): SHA-256 of the content when already known.
+        """
+        key = key or hash_file(fileobj)
+        name = self._name(key)
+        if not self.storage.exists(name):
+            fileobj.seek(0)
+            self.storage.save(name, File(fileobj))
+        return key
+
+    def open(self, key):
+        return self.storage.open(self._name(key), 'rb')
+
+    def path(self, key):
+        """Local filesystem path of a blob, or None when the storage is not on local disk."""
+        try:
+            return self.storage.path(self._name(key))
+        except NotImplementedError:
+            return None
+
+    def exists(self, key):
+        return self.storage.exists(self._name(key))
+
+    def delete(self, key):
+        self.storage.delete(self._name(key))
+
+
+def get_blob_store():
+    """Blob store for statement files, backed by the 'statements' storage alias."""
+    return BlobStore(storages['statements'])
@@ -0,0 +1,134 @@
+"""
+Import of structured (CSV / JSON / JSON-lines) transaction exports.
+
+Rows are read one at a time, then validated and written in batches, so
+memory use does not grow with the size of the file. Invalid rows are
+reported and skipped instead of failing the whole import.
+"""
+from datetime import date
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now
+
+from core.money import to_kobo_array, to_naira
+from core.score_state import apply_transactions
+from .models import BankStatement
+from .pipeline import EXPECTED_COLUMNS
+from .snapshot import SnapshotBuilder
+from .utils.bulk_insert import bulk_insert_transactions
+from .utils.files_parser import InvalidRow
+from .utils.validators import validate_transaction_frame
+
+
+class TransactionImport:
+    """
+    Streams validated rows into a new BankStatement of `business`.
+    Debits are stored with a negative amount, like AI-structured statements.
+    """
+
+    def __init__(self, business, batch_size=None, max_errors=None):
+        self.business = business
+        self.batch_size = batch_size or getattr(settings, 'IMPORT_BATCH_SIZE', 10000)
+        self.max_errors = max_errors or getattr(settings, 'IMPORT_MAX_REPORTED_ERRORS', 1000)
+        self.statement = None
+        self.snapshot = SnapshotBuilder()
+        self.received = 0
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+        self.start_date = None
+        self.end_date = None
+        self.income_kobo = 0
+        self.expenditure_kobo = 0
+
+    def run(self, rows):
+        """
+        Import `rows` (an iterable of dicts) in one database transaction.
+
+        Returns:
+        - BankStatement or None: The new statement, or None when no row was valid.
+        """
+        with transaction.atomic():
+            self.statement = BankStatement.objects.create(
+                business=self.business,
+                reference=f"import-{self.business.id}_{now().strftime('%Y%m%d%H%M%S%f')}",
+                encoded_data='',
+                start_date=date.today(),
+                end_date=date.today(),
+                total_income=0,
+                total_expenditure=0,
+            )
+
+            batch, indices = [], []
+            for index, row in enumerate(rows, start=1):
+                self.received += 1
+                if isinstance(row, InvalidRow):
+                    self._reject(index, row.error)
+                    continue
+                if not isinstance(row, dict):
+                    self._reject(index, 'row must be an object')
+                    continue
+                batch.append(row)
+                indices.append(index)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, indices)
+                    batch, indices = [], []
+            self._flush(batch, indices)
+
+            if not self.imported:
+                transaction.set_rollback(True)
+                self.statement = None
+                return None
+
+            BankStatement.objects.filter(id=self.statement.id).update(
+                start_date=self.start_date or date.today(),
+                end_date=self.end_date or date.today(),
+                total_income=to_naira(self.income_kobo),
+                total_expenditure=to_naira(self.expenditure_kobo),
+                snapshot_hash=self.snapshot.save(),
+            )
+        return self.statement
+
+    def summary(self):
+        return {
+            'statement_id': str(self.statement.id) if self.statement else None,
+            'rows_received': self.received,
+            'rows_imported': self.imported,
+            'rows_duplicate': self.received - self.rejected - self.imported,
+            'rows_rejected': self.rejected,
+            'errors': self.errors,
+            'errors_truncated': self.rejected > len(self.errors),
+        }
+
+    def _reject(self, index, error):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': index, 'error': error})
+
+    def _flush(self, batch, indices):
+        if not batch:
+            return
+        df, errors = validate_transaction_frame(pd.DataFrame(batch, index=indices), require_balance=True)
+        for error in errors:
+            self._reject(error['row'], error['error'])
+        if df.empty:
+            return
+
+        df = df.reindex(columns=EXPECTED_COLUMNS)
+        df['amount'] = df['amount'].abs().where(df['transaction_type'] == 'credit', -df['amount'].abs())
+        for column in ('channel', 'counterparty'):
+            df[column] = df[column].where(df[column].notna() & (df[column] != ''), None)
+
+        created = bulk_insert_transactions(self.statement, df)
+        apply_transactions(self.business, created)
+        self.snapshot.add(created)
+        self.imported += len(created)
+
+        dates = df['date'].dt.date
+        self.start_date = min(filter(None, [self.start_date, dates.min()]))
+        self.end_date = max(filter(None, [self.end_date, dates.max()]))
+        kobo = to_kobo_array(df['amount'])
+        self.income_kobo += int(kobo[kobo > 0].sum())
+        self.expenditure_kobo -= int(kobo[kobo < 0].sum())
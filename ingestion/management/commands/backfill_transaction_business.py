@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from ingestion.models import BankStatement, BankTransaction
+
+
+class Command(BaseCommand):
+    help = "Copy statement.business onto transactions stored before BankTransaction.business existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Transactions updated per batch.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        business = Subquery(BankStatement.objects.filter(id=OuterRef('statement_id')).values('business_id')[:1])
+
+        updated = 0
+        while True:
+            # Short batches keep each UPDATE's locks brief on large tables.
+            ids = list(
+                BankTransaction.objects
+                .filter(business__isnull=True)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            updated += BankTransaction.objects.filter(id__in=ids).update(business=business)
+            self.stdout.write(f"{updated} transaction(s) updated...")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled the business of {updated} transaction(s)."))
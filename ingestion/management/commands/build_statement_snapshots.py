@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from ingestion.models import BankStatement, BankTransaction
+from ingestion.snapshot import SnapshotBuilder
+
+
+class Command(BaseCommand):
+    help = "Write the columnar transaction snapshot of statements stored before snapshots existed."
+
+    def handle(self, *args, **options):
+        statement_ids = list(BankStatement.objects.filter(snapshot_hash='').values_list('id', flat=True))
+
+        for statement_id in statement_ids:
+            builder = SnapshotBuilder()
+            transactions = (
+                BankTransaction.objects
+                .filter(statement_id=statement_id)
+                .only('date', 'amount', 'balance', 'transaction_type', 'channel', 'counterparty', 'is_inferred')
+                .iterator(chunk_size=2000)
+            )
+            builder.add(transactions)
+            BankStatement.objects.filter(id=statement_id).update(snapshot_hash=builder.save())
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote snapshots for {len(statement_ids)} statement(s)."))
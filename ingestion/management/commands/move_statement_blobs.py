@@ -0,0 +1,45 @@
+import base64
+import io
+
+from django.core.management.base import BaseCommand
+
+from ingestion.blob_store import get_blob_store
+from ingestion.models import BankStatement
+
+
+class Command(BaseCommand):
+    help = "Move legacy base64 statement PDFs out of the database into the statement blob store."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-column', action='store_true',
+            help='Copy the PDFs but leave the base64 column populated.'
+        )
+
+    def handle(self, *args, **options):
+        store = get_blob_store()
+        legacy_ids = list(
+            BankStatement.objects
+            .filter(file_hash='')
+            .exclude(statement_file='')
+            .values_list('id', flat=True)
+        )
+
+        moved = failed = 0
+        for statement_id in legacy_ids:
+            # One row at a time so only a single PDF is ever held in memory.
+            encoded = BankStatement.objects.filter(id=statement_id).values_list('statement_file', flat=True).first()
+            try:
+                pdf = io.BytesIO(base64.b64decode(encoded))
+            except (TypeError, ValueError):
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"Statement {statement_id}: invalid base64, skipped."))
+                continue
+
+            updates = {'file_hash': store.put(pdf)}
+            if not options['keep_column']:
+                updates['statement_file'] = ''
+            BankStatement.objects.filter(id=statement_id).update(**updates)
+            moved += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} statement file(s) to the blob store, {failed} skipped."))
@@ -0,0 +1,80 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from ingestion.models import BankTransaction
+
+TABLE = BankTransaction._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+def month_start(day, offset=0):
+    month = day.month - 1 + offset
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_{month:%Y_%m}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly PostgreSQL partitions of bank transactions for the coming months. "
+        "The table is partitioned by migration ingestion.0002; schedule this monthly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=3,
+            help='Months after the current one to create partitions for.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Transaction partitioning needs PostgreSQL.')
+        if not self.is_partitioned():
+            raise CommandError(f'{TABLE} is not partitioned; run `manage.py migrate ingestion` first.')
+
+        today = date.today()
+        created = self.create_partitions(month_start(today), month_start(today, options['months_ahead']))
+        self.stdout.write(self.style.SUCCESS(f'Created {created} partition(s).'))
+
+    def is_partitioned(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+                [TABLE]
+            )
+            return cursor.fetchone() is not None
+
+    def create_partitions(self, first_month, last_month):
+        """Create one partition per month from first_month to last_month inclusive."""
+        created = 0
+        month = first_month
+        with connection.cursor() as cursor:
+            while month <= last_month:
+                name = partition_name(month)
+                cursor.execute("SELECT to_regclass(%s)", [name])
+                if cursor.fetchone()[0] is None:
+                    with transaction.atomic():
+                        self.create_partition(cursor, name, month, month_start(month, 1))
+                    created += 1
+                month = month_start(month, 1)
+        return created
+
+    def create_partition(self, cursor, name, start, end):
+        # Rows for the month that already landed in the default partition would
+        # make CREATE ... PARTITION OF fail; park them and move them across.
+        cursor.execute(f'CREATE TEMPORARY TABLE "{name}_pending" (LIKE "{TABLE}") ON COMMIT DROP')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE date >= %s AND date < %s RETURNING *) '
+            f'INSERT INTO "{name}_pending" SELECT * FROM moved',
+            [start, end]
+        )
+        cursor.execute(
+            f'CREATE TABLE "{name}" PARTITION OF "{TABLE}" FOR VALUES FROM (%s) TO (%s)',
+            [start, end]
+        )
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{name}_pending"')
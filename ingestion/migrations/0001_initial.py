@@ -0,0 +1,100 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:34
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('business', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStatement',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('reference', models.CharField(max_length=100, unique=True)),
+                ('statement_file', models.TextField(blank=True)),
+                ('file_hash', models.CharField(blank=True, help_text='SHA-256 of the statement PDF; key in the statement blob store', max_length=64)),
+                ('encoded_data', models.TextField(blank=True, help_text='Base64 or JSON encoded transaction data')),
+                ('snapshot_hash', models.CharField(blank=True, help_text='SHA-256 of the columnar transaction snapshot (.npz) in the statement blob store', max_length=64)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('total_income', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('total_expenditure', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('reconciliation_score', models.DecimalField(blank=True, decimal_places=4, help_text='Share of rows whose balance follows from the previous row, before repair', max_digits=5, null=True)),
+                ('reconciliation_breaks', models.PositiveIntegerField(default=0)),
+                ('reconciliation_repairs', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bank_statements', to='business.business')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BankTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('description', models.TextField()),
+                ('transaction_type', models.CharField(max_length=10)),
+                ('channel', models.CharField(blank=True, max_length=20, null=True)),
+                ('counterparty', models.CharField(blank=True, max_length=100, null=True)),
+                ('fingerprint', models.CharField(blank=True, default='', max_length=40)),
+                ('is_inferred', models.BooleanField(default=False)),
+                ('business', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='business.business')),
+                ('statement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='ingestion.bankstatement')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StatementJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_path', models.CharField(max_length=500)),
+                ('file_hash', models.CharField(blank=True, max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('stage', models.CharField(choices=[('queued', 'Queued'), ('extracting', 'Extracting text'), ('structuring', 'Structuring transactions'), ('saving', 'Saving transactions'), ('scoring', 'Scoring'), ('done', 'Done')], default='queued', max_length=20)),
+                ('progress', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statement_jobs', to='business.business')),
+                ('statement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='ingestion.bankstatement')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='bankstatement',
+            index=models.Index(fields=['business', 'file_hash'], name='bank_statement_file_hash_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='bankstatement',
+            constraint=models.UniqueConstraint(fields=('business', 'reference'), name='unique_bank_statement_ref_per_business'),
+        ),
+        migrations.AddIndex(
+            model_name='banktransaction',
+            index=models.Index(fields=['business', 'date'], name='bank_tx_business_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='banktransaction',
+            index=models.Index(fields=['business', 'transaction_type', 'date'], name='bank_tx_business_type_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='banktransaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('fingerprint', ''), _negated=True), fields=('fingerprint',), name='unique_bank_transaction_fingerprint'),
+        ),
+        migrations.AddIndex(
+            model_name='statementjob',
+            index=models.Index(fields=['business', 'file_hash'], name='statement_job_file_hash_idx'),
+        ),
+    ]
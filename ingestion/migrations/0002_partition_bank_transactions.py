@@ -0,0 +1,146 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:34
+"""
+Range-partition ingestion_banktransaction by month on PostgreSQL.
+
+The partition key has to be part of every unique index, so the
+fingerprint constraint becomes (fingerprint, date) on every database
+(the state and schema operations below) and, on PostgreSQL only, the
+table is rebuilt as a partitioned table with primary key (id, date).
+Django keeps treating `id` as the primary key: ids still come from one
+sequence, so they stay unique.
+
+The rebuild copies every row inside the migration's transaction while
+holding an ACCESS EXCLUSIVE lock, so stop writes (50 million rows took
+about 10 minutes on one core); any error rolls the whole migration back.
+Indexes and foreign keys are recreated under their Django names. The
+reverse migration copies the rows back into a plain table.
+
+Partitions are created for every month from the oldest transaction
+(at most PARTITION_HISTORY_YEARS back) to three months ahead, plus a
+default partition; `manage.py partition_transactions` adds the coming
+months afterwards.
+"""
+from django.db import migrations, models
+
+TABLE = 'ingestion_banktransaction'
+PARTITION_HISTORY_YEARS = 10
+
+# Indexes and constraints are captured while their definitions still name
+# the table being replaced, then replayed on the new table once the old one
+# (and with it the index names) is gone.
+CAPTURE_SQL = f"""
+    SELECT coalesce(array_agg(pg_get_indexdef(indexrelid)), '{{}}') INTO index_defs
+    FROM pg_index WHERE indrelid = '{TABLE}'::regclass AND NOT indisprimary;
+    SELECT coalesce(array_agg(format('ALTER TABLE {TABLE} ADD CONSTRAINT %I %s', conname, pg_get_constraintdef(oid))), '{{}}')
+    INTO constraint_defs
+    FROM pg_constraint WHERE conrelid = '{TABLE}'::regclass AND contype IN ('f', 'c');
+"""
+
+REPLAY_SQL = """
+    FOREACH ddl IN ARRAY index_defs || constraint_defs LOOP
+        EXECUTE ddl;
+    END LOOP;
+"""
+
+FORWARD_SQL = f"""
+DO $$
+DECLARE
+    index_defs text[];
+    constraint_defs text[];
+    ddl text;
+    first_month date;
+    last_month date;
+    part_month date;
+    next_id bigint;
+BEGIN
+    LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE;
+    {CAPTURE_SQL}
+    SELECT date_trunc('month', least(min(date), current_date)),
+           date_trunc('month', greatest(max(date), current_date)) + interval '3 months',
+           coalesce(max(id), 0) + 1
+    INTO first_month, last_month, next_id
+    FROM {TABLE};
+    first_month := greatest(first_month, date_trunc('month', current_date - interval '{PARTITION_HISTORY_YEARS} years'));
+
+    ALTER TABLE {TABLE} RENAME TO {TABLE}_unpartitioned;
+    CREATE TABLE {TABLE} (LIKE {TABLE}_unpartitioned) PARTITION BY RANGE (date);
+    -- Identity columns need PostgreSQL 17 on partitioned tables; use a plain sequence.
+    CREATE SEQUENCE {TABLE}_id_seq_partitioned OWNED BY {TABLE}.id;
+    ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq_partitioned'::regclass);
+    PERFORM setval('{TABLE}_id_seq_partitioned', next_id, false);
+
+    part_month := first_month;
+    WHILE part_month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF {TABLE} FOR VALUES FROM (%L) TO (%L)',
+            '{TABLE}_' || to_char(part_month, 'YYYY_MM'), part_month, part_month + interval '1 month'
+        );
+        part_month := part_month + interval '1 month';
+    END LOOP;
+    CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT;
+
+    INSERT INTO {TABLE} SELECT * FROM {TABLE}_unpartitioned;
+    DROP TABLE {TABLE}_unpartitioned;
+    ALTER SEQUENCE {TABLE}_id_seq_partitioned RENAME TO {TABLE}_id_seq;
+
+    ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, date);
+    {REPLAY_SQL}
+END $$;
+"""
+
+REVERSE_SQL = f"""
+DO $$
+DECLARE
+    index_defs text[];
+    constraint_defs text[];
+    ddl text;
+BEGIN
+    LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE;
+    {CAPTURE_SQL}
+
+    ALTER TABLE {TABLE} RENAME TO {TABLE}_partitioned;
+    CREATE TABLE {TABLE} (LIKE {TABLE}_partitioned);
+    INSERT INTO {TABLE} SELECT * FROM {TABLE}_partitioned;
+    -- Drops the partitions and the sequence owned by the partitioned table
+    DROP TABLE {TABLE}_partitioned;
+
+    ALTER TABLE {TABLE} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+    PERFORM setval(pg_get_serial_sequence('{TABLE}', 'id'), coalesce(max(id), 0) + 1, false) FROM {TABLE};
+    ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id);
+    {REPLAY_SQL}
+END $$;
+"""
+
+
+class RunPostgreSQL(migrations.RunSQL):
+    """RunSQL that leaves databases other than PostgreSQL untouched."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0002_initial'),
+        ('ingestion', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='banktransaction',
+            name='unique_bank_transaction_fingerprint',
+        ),
+        migrations.AddConstraint(
+            model_name='banktransaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('fingerprint', ''), _negated=True), fields=('fingerprint', 'date'), name='unique_bank_transaction_fingerprint'),
+        ),
+        # The partitioning has no model state of its own: the fingerprint
+        # constraint above already matches what the partitioned table needs.
+        RunPostgreSQL(FORWARD_SQL, reverse_sql=REVERSE_SQL, state_operations=[]),
+    ]
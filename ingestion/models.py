@@ -4,6 +4,12 @@ from django.db import models
 from business.models import Business
 
 
+class BankStatementManager(models.Manager):
+    def get_queryset(self):
+        # The legacy base64 column can hold whole PDFs; only load it on access.
+        return super().get_queryset().defer('statement_file')
+
+
 class BankStatement(models.Model):
     id = models.UUIDField(
         primary_key=True,
@@ -22,12 +28,27 @@ class BankStatement(models.Model):
         unique=True
     )
 
-    statement_file = models.TextField()
+    # Legacy base64 copy of the PDF; new statements keep it in the blob store
+    statement_file = models.TextField(blank=True)
+
+    file_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text='SHA-256 of the statement PDF; key in the statement blob store'
+    )
 
+    # Legacy JSON copy of the transactions; new statements keep a snapshot instead
     encoded_data = models.TextField(
+        blank=True,
         help_text='Base64 or JSON encoded transaction data'
     )
 
+    snapshot_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text='SHA-256 of the columnar transaction snapshot (.npz) in the statement blob store'
+    )
+
     start_date = models.DateField()
     end_date = models.DateField()
 
@@ -41,8 +62,21 @@ class BankStatement(models.Model):
         decimal_places=2
     )
 
+    # Running-balance check of the extracted rows; empty for imports and older statements
+    reconciliation_score = models.DecimalField(
+        max_digits=5,
+        decimal_places=4,
+        null=True,
+        blank=True,
+        help_text='Share of rows whose balance follows from the previous row, before repair'
+    )
+    reconciliation_breaks = models.PositiveIntegerField(default=0)
+    reconciliation_repairs = models.PositiveIntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = BankStatementManager()
+
     class Meta:
         ordering = ['-created_at']
         constraints = [
@@ -51,14 +85,39 @@ class BankStatement(models.Model):
                 name='unique_bank_statement_ref_per_business'
             )
         ]
+        indexes = [
+            models.Index(fields=['business', 'file_hash'], name='bank_statement_file_hash_idx'),
+        ]
 
     def __str__(self):
         return f"{self.reference} ({self.business.name})"
 
 
+class BankTransactionQuerySet(models.QuerySet):
+    def scored(self):
+        """Transactions that count towards scores: all but the rows inferred by reconciliation."""
+        return self.filter(is_inferred=False)
+
+    def known_on(self, day):
+        """
+        Transactions as they were known at the end of `day`: dated on or
+        before it, from statements uploaded by then.
+        """
+        return self.filter(date__lte=day, statement__created_at__date__lte=day)
+
+
 # ingestion/models.py
 class BankTransaction(models.Model):
+    """
+    On PostgreSQL the table is range-partitioned by month of `date`
+    (migration 0002_partition_bank_transactions); the database primary
+    key is then (id, date) and every unique index includes `date`.
+    """
     statement = models.ForeignKey('BankStatement', related_name='transactions', on_delete=models.CASCADE)
+    # Copy of statement.business so scoring reads one business's rows by index
+    # instead of joining statements. Empty only on rows older than the column;
+    # fill those with `manage.py backfill_transaction_business`.
+    business = models.ForeignKey(Business, related_name='transactions', on_delete=models.CASCADE, null=True)
     date = models.DateField()
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     balance = models.DecimalField(max_digits=12, decimal_places=2)
@@ -66,3 +125,102 @@ class BankTransaction(models.Model):
     transaction_type = models.CharField(max_length=10)  # credit or debit
     channel = models.CharField(max_length=20, null=True, blank=True)
     counterparty = models.CharField(max_length=100, null=True, blank=True)
+    # SHA-1 of (business, date, amount, balance, description); stops overlapping
+    # statements of the same account from storing a transaction twice
+    fingerprint = models.CharField(max_length=40, blank=True, default='')
+    # Filled in by reconciliation for a balance gap (see ingestion.utils.reconciliation);
+    # kept for the running balance but not counted as revenue or activity
+    is_inferred = models.BooleanField(default=False)
+
+    objects = BankTransactionQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # The fingerprint hashes the date, so adding the partition key to the
+            # index does not allow any duplicate the fingerprint alone would reject.
+            models.UniqueConstraint(
+                fields=['fingerprint', 'date'],
+                condition=~models.Q(fingerprint=''),
+                name='unique_bank_transaction_fingerprint'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['business', 'date'], name='bank_tx_business_date_idx'),
+            models.Index(fields=['business', 'transaction_type', 'date'], name='bank_tx_business_type_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.business_id is None and self.statement_id is not None:
+            self.business_id = self.statement.business_id
+        super().save(*args, **kwargs)
+
+
+class StatementJob(models.Model):
+    """
+    Tracks the asynchronous processing of an uploaded bank statement
+    through the extraction → structuring → saving → scoring task chain.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    STAGE_QUEUED = 'queued'
+    STAGE_EXTRACTING = 'extracting'
+    STAGE_STRUCTURING = 'structuring'
+    STAGE_SAVING = 'saving'
+    STAGE_SCORING = 'scoring'
+    STAGE_DONE = 'done'
+    STAGE_CHOICES = [
+        (STAGE_QUEUED, 'Queued'),
+        (STAGE_EXTRACTING, 'Extracting text'),
+        (STAGE_STRUCTURING, 'Structuring transactions'),
+        (STAGE_SAVING, 'Saving transactions'),
+        (STAGE_SCORING, 'Scoring'),
+        (STAGE_DONE, 'Done'),
+    ]
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+
+    business = models.ForeignKey(
+        Business,
+        on_delete=models.CASCADE,
+        related_name='statement_jobs'
+    )
+
+    statement = models.ForeignKey(
+        'BankStatement',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+
+    file_path = models.CharField(max_length=500)
+    file_hash = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default=STAGE_QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['business', 'file_hash'], name='statement_job_file_hash_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.id} ({self.business.name}) - {self.status}"
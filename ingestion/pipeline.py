@@ -0,0 +1,138 @@
+"""
+Steps of bank statement processing, shared by the Celery task chain.
+
+parse tables (or stream page text into the AI structuring step) →
+clean and reconcile the DataFrame → save the statement and its transactions.
+"""
+import logging
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now
+
+from core.money import to_kobo_array, to_naira
+from core.score_state import apply_transactions
+from .blob_store import get_blob_store
+from .serializers import BankStatementSerializer
+from .snapshot import save_snapshot
+from .utils.ai_utility import ask_ai_to_structure_pages
+from .utils.bulk_insert import bulk_insert_transactions
+from .utils.data_extract import iter_pdf_pages
+from .utils.reconciliation import reconcile_transactions
+from .utils.table_parser import parse_statement_tables
+
+logger = logging.getLogger(__name__)
+
+EXPECTED_COLUMNS = ['date', 'amount', 'balance', 'description', 'transaction_type', 'channel', 'counterparty']
+
+
+class StatementProcessingError(Exception):
+    """Raised when an uploaded statement cannot be turned into transactions."""
+
+
+def iter_statement_pages(file_path):
+    return iter_pdf_pages(file_path)
+
+
+def parse_statement(file_path):
+    """
+    Try the rule-based table parser first.
+
+    Returns:
+    - pd.DataFrame or None: The transactions when the parser's confidence
+      reaches TABLE_PARSER_MIN_CONFIDENCE, otherwise None (use the AI).
+    """
+    try:
+        df, confidence, profile = parse_statement_tables(file_path)
+    except Exception:
+        logger.exception("Table parser failed on %s", file_path)
+        return None
+
+    logger.info("Table parser: %s rows, profile=%s, confidence=%.2f", len(df), profile, confidence)
+    if confidence < getattr(settings, 'TABLE_PARSER_MIN_CONFIDENCE', 0.9):
+        return None
+    return df
+
+
+def structure_statement_pages(pages):
+    """
+    Turn the raw text of each page into a DataFrame with all EXPECTED_COLUMNS.
+    Long statements are sent to the AI in concurrent page-aligned chunks,
+    starting as soon as the first pages of `pages` are available.
+    """
+    df = ask_ai_to_structure_pages(pages)
+
+    # Ensure expected columns
+    for col in EXPECTED_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    return df
+
+
+def clean_transactions(df):
+    """
+    Coerce dates and numbers, drop unusable rows, reconcile the running
+    balance (see reconcile_transactions) and summarise the statement.
+
+    Returns:
+    - tuple: (df, summary) where summary holds start_date, end_date,
+      total_income, total_expenditure (both without inferred rows) and
+      the reconciliation results.
+    """
+    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
+    df['balance'] = pd.to_numeric(df['balance'], errors='coerce')
+    df.dropna(subset=['date', 'amount', 'balance'], inplace=True)
+
+    if df.empty:
+        raise StatementProcessingError('No transactions could be extracted from the statement.')
+
+    df, report = reconcile_transactions(df, repair=getattr(settings, 'RECONCILIATION_REPAIR', True))
+    logger.info("Reconciliation: %s", report)
+    kobo = to_kobo_array(df.loc[~df['is_inferred'], 'amount'])
+
+    summary = {
+        'start_date': pd.to_datetime(df['date'].min(), errors='coerce').date(),
+        'end_date': pd.to_datetime(df['date'].max(), errors='coerce').date(),
+        'total_income': to_naira(kobo[kobo > 0].sum()),
+        'total_expenditure': to_naira(-kobo[kobo < 0].sum()),
+        'reconciliation_score': round(report['score'], 4),
+        'reconciliation_breaks': report['breaks'],
+        'reconciliation_repairs': report['sign_flips'] + report['balance_fixes'] + report['inferred_rows'],
+    }
+    return df, summary
+
+
+def save_statement(business, df, summary, file_path, file_hash=None):
+    """
+    Store the statement and all of its transactions in one transaction.
+    Transactions already stored from an overlapping statement are skipped.
+    The stored transactions are also kept as a columnar snapshot
+    (see ingestion.snapshot) in the blob store.
+
+    Returns:
+    - BankStatement: The saved statement.
+    """
+    today_str = now().strftime('%Y%m%d%H%M%S%f')
+    reference = f"ref-{business.id}_{today_str}"
+
+    with open(file_path, 'rb') as pdf:
+        file_hash = get_blob_store().put(pdf, key=file_hash)
+
+    serializer = BankStatementSerializer(data={
+        'business': business.id,
+        'reference': reference,
+        'file_hash': file_hash,
+        **summary,
+    })
+    if not serializer.is_valid():
+        raise StatementProcessingError(f'Invalid statement: {serializer.errors}')
+
+    with transaction.atomic():
+        statement = serializer.save()
+        transactions = bulk_insert_transactions(statement, df)
+        apply_transactions(business, transactions)
+        statement.snapshot_hash = save_snapshot(transactions)
+        statement.save(update_fields=['snapshot_hash'])
+    return statement
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import BankStatement
+from .models import BankStatement, StatementJob
 
 
 class BankStatementSerializer(serializers.ModelSerializer):
@@ -7,9 +7,10 @@ class BankStatementSerializer(serializers.ModelSerializer):
     Serializer for the BankStatement model.
     Handles validation, serialization, and
     custom representation of statement data,
-    including base64-encoded PDF content and
+    including the stored PDF reference and
     structured transaction data.
     """
+    statement_file = serializers.SerializerMethodField()
 
     class Meta:
         model = BankStatement
@@ -18,11 +19,16 @@ class BankStatementSerializer(serializers.ModelSerializer):
             'business',
             'reference',
             'statement_file',
+            'file_hash',
             'encoded_data',
+            'snapshot_hash',
             'start_date',
             'end_date',
             'total_income',
             'total_expenditure',
+            'reconciliation_score',
+            'reconciliation_breaks',
+            'reconciliation_repairs',
             'created_at',
         ]
         read_only_fields = ['id', 'created_at']
@@ -38,13 +44,31 @@ class BankStatementSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Reference must be unique.")
         return value
 
-    def to_representation(self, instance):
+    def get_statement_file(self, instance):
         """
-        Override the default representation to avoid exposing
-        full base64-encoded PDF content in API response.
-        This keeps the response payload smaller and more readable.
+        Describe the PDF instead of exposing its content in the API response.
+        This keeps the response payload small and never loads the
+        deferred legacy base64 column.
         """
-        data = super().to_representation(instance)
-        file_string = f"[BASE64 ENCODED PDF of {instance.reference}]"
-        data['statement_file'] = file_string
-        return data
+        return f"[PDF of {instance.reference}]"
+
+
+class StatementJobSerializer(serializers.ModelSerializer):
+    """
+    Read-only view of a statement processing job.
+    """
+
+    class Meta:
+        model = StatementJob
+        fields = [
+            'id',
+            'business',
+            'statement',
+            'status',
+            'stage',
+            'progress',
+            'error',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
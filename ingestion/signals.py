@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by bulk_insert_transactions(), since bulk_create() does not send post_save.
+# Arguments: business_id, statement, transactions (the created BankTransactions).
+transactions_saved = Signal()
@@ -0,0 +1,145 @@
+"""
+Columnar snapshots of the transactions stored for a statement.
+
+A snapshot is an uncompressed .npz archive with one typed array per column:
+- day: int32 days since 1970-01-01 (view as datetime64[D])
+- amount, balance: int64 kobo; balance is MISSING when unknown
+- is_credit: bool
+- channel, counterparty: int32 codes into channel_values and
+  counterparty_values (-1 when empty)
+
+Rows inferred by reconciliation are left out, as scoring ignores them.
+
+Snapshots live in the statement blob store under the SHA-256 of their
+content. On local storage load_snapshot() memory-maps the arrays straight
+out of the archive, so nothing is parsed and pages are read on demand.
+"""
+import io
+import struct
+import zipfile
+from typing import NamedTuple
+
+import numpy as np
+
+from core.money import MISSING, to_kobo
+from .blob_store import get_blob_store
+
+EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+
+
+class Snapshot(NamedTuple):
+    day: np.ndarray
+    amount: np.ndarray
+    balance: np.ndarray
+    is_credit: np.ndarray
+    channel: np.ndarray
+    channel_values: np.ndarray
+    counterparty: np.ndarray
+    counterparty_values: np.ndarray
+
+    @property
+    def dates(self):
+        return self.day.astype('datetime64[D]')
+
+
+class SnapshotBuilder:
+    """
+    Collects saved BankTransactions batch by batch and writes them as one
+    snapshot, so an import never holds more than the compact columns.
+    """
+
+    def __init__(self):
+        self.day = []
+        self.amount = []
+        self.balance = []
+        self.is_credit = []
+        self.channel = []
+        self.counterparty = []
+        self.channel_codes = {}
+        self.counterparty_codes = {}
+
+    def add(self, transactions):
+        for tx in transactions:
+            if tx.is_inferred:
+                continue
+            self.day.append(tx.date.toordinal() - EPOCH_ORDINAL)
+            self.amount.append(to_kobo(tx.amount))
+            self.balance.append(MISSING if tx.balance is None else to_kobo(tx.balance))
+            self.is_credit.append(tx.transaction_type == 'credit')
+            self.channel.append(self._code(self.channel_codes, tx.channel))
+            self.counterparty.append(self._code(self.counterparty_codes, tx.counterparty))
+        return self
+
+    @staticmethod
+    def _code(codes, value):
+        if not value:
+            return -1
+        return codes.setdefault(value, len(codes))
+
+    def arrays(self):
+        return {
+            'day': np.array(self.day, dtype=np.int32),
+            'amount': np.array(self.amount, dtype=np.int64),
+            'balance': np.array(self.balance, dtype=np.int64),
+            'is_credit': np.array(self.is_credit, dtype=bool),
+            'channel': np.array(self.channel, dtype=np.int32),
+            'channel_values': np.array(list(self.channel_codes), dtype=str),
+            'counterparty': np.array(self.counterparty, dtype=np.int32),
+            'counterparty_values': np.array(list(self.counterparty_codes), dtype=str),
+        }
+
+    def save(self, store=None):
+        """Write the snapshot to the blob store and return its key."""
+        buffer = io.BytesIO()
+        np.savez(buffer, **self.arrays())
+        return (store or get_blob_store()).put(buffer)
+
+
+def save_snapshot(transactions, store=None):
+    """Snapshot a list of saved BankTransactions; returns the blob key."""
+    return SnapshotBuilder().add(transactions).save(store)
+
+
+def load_snapshot(key, store=None):
+    """
+    Load a snapshot, memory-mapped when the blob is on local disk.
+
+    Returns:
+    - Snapshot: Read-only arrays.
+    """
+    store = store or get_blob_store()
+    path = store.path(key)
+    if path:
+        return Snapshot(**_memmap_npz(path))
+    with store.open(key) as f:
+        data = np.load(io.BytesIO(f.read()))
+        return Snapshot(**{name: data[name] for name in data.files})
+
+
+def _memmap_npz(path):
+    """Map every array of an uncompressed .npz (as written by np.savez) without reading it."""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: {info.filename} is compressed and cannot be memory-mapped")
+            # Local file header: 30 fixed bytes, then the name and extra field
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            name = info.filename[:-len('.npy')]
+            if 0 in shape:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(
+                    path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                    order='F' if fortran_order else 'C'
+                )
+    return arrays
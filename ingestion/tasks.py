@@ -0,0 +1,113 @@
+import json
+import os
+from contextlib import contextmanager
+
+import pandas as pd
+from celery import chain, shared_task
+from django.utils import timezone
+
+from audit.buffer import flush as flush_audit_logs, record_score
+from core.models import CreditScore
+from core.score_engine import get_scoring_engine
+from . import pipeline
+from .models import StatementJob
+
+
+def start_statement_job(job):
+    """
+    Queue the processing chain of an uploaded statement:
+    parse tables → structure transactions (streaming page text to the AI
+    when the tables were not enough) → save → score.
+    """
+    job_id = str(job.id)
+    chain(
+        extract_text.si(job_id),
+        structure_transactions.s(job_id),
+        save_transactions.s(job_id),
+        score_business.s(job_id),
+    ).apply_async()
+
+
+def _update_job(job_id, **fields):
+    StatementJob.objects.filter(id=job_id).update(updated_at=timezone.now(), **fields)
+
+
+def _discard_upload(job):
+    if job.file_path and os.path.exists(job.file_path):
+        os.unlink(job.file_path)
+
+
+@contextmanager
+def _job_stage(job_id, stage, progress):
+    """Mark the job as running `stage`; record the error and clean up if it fails."""
+    _update_job(job_id, status=StatementJob.STATUS_RUNNING, stage=stage, progress=progress)
+    job = StatementJob.objects.select_related('business').get(id=job_id)
+    try:
+        yield job
+    except Exception as e:
+        _update_job(job_id, status=StatementJob.STATUS_FAILED, error=str(e))
+        _discard_upload(job)
+        raise
+
+
+def _to_records(df):
+    # Round-trip through JSON so NaN becomes None in the task message
+    return json.loads(df.to_json(orient='records'))
+
+
+@shared_task
+def extract_text(job_id):
+    """
+    Returns {'records': [...]} when the table parser is confident enough
+    to skip the AI, otherwise an empty dict.
+    """
+    with _job_stage(job_id, StatementJob.STAGE_EXTRACTING, 10) as job:
+        df = pipeline.parse_statement(job.file_path)
+        if df is not None:
+            return {'records': _to_records(df)}
+        return {}
+
+
+@shared_task
+def structure_transactions(extracted, job_id):
+    with _job_stage(job_id, StatementJob.STAGE_STRUCTURING, 30) as job:
+        if 'records' in extracted:
+            return extracted['records']
+        pages = pipeline.iter_statement_pages(job.file_path)
+        df = pipeline.structure_statement_pages(pages)
+        return _to_records(df)
+
+
+@shared_task
+def save_transactions(records, job_id):
+    with _job_stage(job_id, StatementJob.STAGE_SAVING, 70) as job:
+        df = pd.DataFrame(records, columns=pipeline.EXPECTED_COLUMNS)
+        df, summary = pipeline.clean_transactions(df)
+        statement = pipeline.save_statement(job.business, df, summary, job.file_path, job.file_hash or None)
+        _update_job(job_id, statement=statement)
+        _discard_upload(job)
+        return str(statement.id)
+
+
+@shared_task
+def score_business(statement_id, job_id):
+    with _job_stage(job_id, StatementJob.STAGE_SCORING, 90) as job:
+        engine = get_scoring_engine(job.business)
+        score, risk_level, version = engine.calculate_score()
+        CreditScore.objects.update_or_create(
+            sme=job.business,
+            defaults={
+                'score': score,
+                'risk_level': risk_level,
+                'data_version': version
+            }
+        )
+        record_score(job.business_id, score, risk_level, version, requested_by='pipeline', statement_id=statement_id)
+        flush_audit_logs()
+        _update_job(
+            job_id,
+            status=StatementJob.STATUS_SUCCEEDED,
+            stage=StatementJob.STAGE_DONE,
+            progress=100
+        )
+        return statement_id
@@ -0,0 +1,540 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib import import_module
+from unittest import mock, skipIf, skipUnless
+
+import pandas as pd
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.migrations.state import ProjectState
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from business.models import Business
+from config.celery import app as celery_app
+from core.models import CreditScore
+from users.models import User
+from ingestion.models import BankStatement, BankTransaction, StatementJob
+from ingestion.utils.ai_cache import AIResultCache
+from ingestion.utils.ai_utility import SEAM_WINDOW, ask_ai_to_structure, ask_ai_to_structure_pages, merge_chunk_records
+from ingestion.pipeline import clean_transactions, parse_statement, save_statement
+from ingestion.utils.bulk_insert import bulk_insert_transactions
+from ingestion.utils.reconciliation import INFERRED_DESCRIPTION, reconcile_transactions
+from ingestion.utils.table_parser import parse_statement_tables
+
+LOCMEM_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'test-{alias}'}
+    for alias in settings.CACHES
+}
+
+
+def transactions_frame(first_row, last_row):
+    """Rows first_row..last_row of one account; frames of overlapping ranges share rows."""
+    return pd.DataFrame([
+        {
+            'date': date(2025, 1, 1) + timedelta(days=i),
+            'amount': 1000.0 + i,
+            'balance': 50000.0 + 1000.0 * i,
+            'description': f'POS PURCHASE {i}',
+            'transaction_type': 'credit',
+            'channel': 'POS',
+            'counterparty': None,
+        }
+        for i in range(first_row, last_row + 1)
+    ])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BusinessTestCase(TestCase):
+    """Gives each test a business, an API client logged in as its owner and empty upload directories."""
+
+    def setUp(self):
+        upload_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, upload_root, ignore_errors=True)
+        storages = {**settings.STORAGES, 'statements': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+            'OPTIONS': {'location': os.path.join(upload_root, 'statements')},
+        }}
+        upload_override = override_settings(STORAGES=storages, INGESTION_SPOOL_DIR=os.path.join(upload_root, 'spool'))
+        upload_override.enable()
+        self.addCleanup(upload_override.disable)
+
+        owner = User.objects.create_user('owner@example.com', 'password', first_name='Ada', last_name='Obi')
+        self.business = Business.objects.create(
+            name='Mama Put Ltd', registration_number='RC1', industry='Food', country='NG', city='Lagos', owner=owner
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+
+    def make_statement(self, reference):
+        return BankStatement.objects.create(
+            business=self.business, reference=reference, start_date=date(2025, 1, 1), end_date=date(2025, 12, 31),
+            total_income=0, total_expenditure=0,
+        )
+
+
+class StubOpenRouter:
+    """
+    Stands in for requests.Session (and requests.post): answers each
+    request with the reply registered for a marker found in its prompt.
+    A reply is a list of records, sent as JSON, or raw message content.
+    """
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.session = mock.MagicMock(spec=requests.Session)
+        self.session.post.side_effect = self.post
+        self.prompts = []
+
+    def post(self, url, **kwargs):
+        prompt = kwargs['json']['messages'][0]['content']
+        self.prompts.append(prompt)
+        reply = next(reply for marker, reply in self.replies.items() if marker in prompt.split('Bank statement text:')[1])
+        content = reply if isinstance(reply, str) else json.dumps(reply)
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {'choices': [{'message': {'content': content}}]}
+        return response
+
+
+def record(i):
+    return {
+        'date': f'2025-01-{i:02d}', 'amount': 1000 + i, 'balance': 50000 + 1000 * i,
+        'description': f'TRANSFER FROM CUSTOMER {i}', 'transaction_type': 'credit',
+        'channel': 'TRANSFER', 'counterparty': None,
+    }
+
+
+@override_settings(CACHES=LOCMEM_CACHES, OPENROUTER_API_KEY='test-key', AI_RETRY_BACKOFF=0)
+class AIStubTestCase(SimpleTestCase):
+    """Routes OpenRouter calls to a StubOpenRouter and gives each test an empty AI cache."""
+    replies = {}
+
+    def setUp(self):
+        caches[settings.AI_CACHE_ALIAS].clear()
+        self.cache = AIResultCache()
+        self.openrouter = StubOpenRouter(self.replies)
+        for target, stub in [
+            ('ingestion.utils.ai_utility.get_ai_cache', {'return_value': self.cache}),
+            ('ingestion.utils.ai_utility.requests.Session', {'return_value': self.openrouter.session}),
+            ('ingestion.utils.ai_utility.requests.post', {'side_effect': self.openrouter.post}),
+        ]:
+            patcher = mock.patch(target, **stub)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class BulkInsertTests(BusinessTestCase):
+    def test_overlapping_statement_skips_stored_rows(self):
+        first = bulk_insert_transactions(self.make_statement('first'), transactions_frame(0, 29))
+        second = bulk_insert_transactions(self.make_statement('second'), transactions_frame(20, 39))
+
+        self.assertEqual(len(first), 30)
+        self.assertEqual([tx.description for tx in second], [f'POS PURCHASE {i}' for i in range(30, 40)])
+        self.assertTrue(all(tx.pk for tx in second))
+        self.assertEqual(BankTransaction.objects.filter(business=self.business).count(), 40)
+
+    def test_rows_stored_concurrently_are_skipped(self):
+        bulk_insert_transactions(self.make_statement('first'), transactions_frame(0, 29))
+
+        # Another upload stored the overlap after this one looked for known fingerprints
+        with mock.patch('ingestion.utils.bulk_insert.drop_known_transactions', side_effect=lambda txs: txs):
+            second = bulk_insert_transactions(self.make_statement('second'), transactions_frame(20, 39))
+
+        self.assertEqual(len(second), 10)
+        self.assertEqual(BankTransaction.objects.filter(business=self.business).count(), 40)
+
+
+class AICacheTests(AIStubTestCase):
+    replies = {
+        'page one': [record(1), record(2)],
+        'page two': [record(3)],
+    }
+
+    def test_repeated_statement_is_served_from_cache(self):
+        pages = ['page one\nDate Description Amount Balance', 'page two']
+        first = ask_ai_to_structure_pages(pages, pages_per_chunk=1)
+        second = ask_ai_to_structure_pages(pages, pages_per_chunk=1)
+
+        self.assertEqual(len(self.openrouter.prompts), 2)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(len(first), 3)
+        stats = self.cache.stats()
+        self.assertEqual((stats['process_misses'], stats['process_hits']), (2, 2))
+        self.assertEqual((stats['misses'], stats['hits']), (2, 2))
+
+    def test_whitespace_differences_share_an_entry(self):
+        ask_ai_to_structure('page one\nDate   Amount')
+        ask_ai_to_structure('  page one Date\tAmount\n')
+
+        self.assertEqual(len(self.openrouter.prompts), 1)
+
+    def test_other_model_is_not_served_from_cache(self):
+        ask_ai_to_structure('page one')
+        with override_settings(OPENROUTER_MODEL='other/model'):
+            ask_ai_to_structure('page one')
+
+        self.assertEqual(len(self.openrouter.prompts), 2)
+
+
+class ChunkedStructuringTests(AIStubTestCase):
+    replies = {
+        'cover page': '[]',
+        'page one': [record(1), record(2), record(3)],
+        # The model repeats the last row of the previous chunk
+        'page two': [record(3), record(4)],
+        'totals page': ' [ ] ',
+        'garbled page': 'Sorry, I could not find a table.',
+    }
+
+    def test_rows_repeated_at_a_seam_are_dropped(self):
+        reworded = {**record(3), 'description': ' TRANSFER  FROM CUSTOMER 3 '}
+        merged = merge_chunk_records([[record(1), record(2), record(3)], [reworded, record(4)]])
+
+        self.assertEqual(merged, [record(1), record(2), record(3), record(4)])
+
+    def test_repeats_away_from_the_seam_are_kept(self):
+        second = [record(i) for i in range(4, 4 + SEAM_WINDOW)] + [record(3)]
+        merged = merge_chunk_records([[record(1), record(2), record(3)], second])
+
+        self.assertEqual(len(merged), 3 + len(second))
+
+    def test_chunks_are_merged_in_page_order(self):
+        df = ask_ai_to_structure_pages(
+            ['page one\nDate Description Amount Balance\n01/01 x 1,001.00 51,000.00', 'page two'],
+            pages_per_chunk=1,
+        )
+
+        self.assertEqual(list(df['description']), [f'TRANSFER FROM CUSTOMER {i}' for i in range(1, 5)])
+        self.assertIn('Table header: Date Description Amount Balance', self.openrouter.prompts[1])
+        self.assertIn('Balance carried forward: 51,000.00', self.openrouter.prompts[1])
+
+    def test_empty_array_is_zero_rows(self):
+        df = ask_ai_to_structure_pages(['cover page', 'page one', 'totals page'], pages_per_chunk=1)
+
+        self.assertEqual(len(df), 3)
+        self.assertEqual(len(self.openrouter.prompts), 3)
+        self.assertTrue(ask_ai_to_structure('cover page').empty)
+
+    @override_settings(AI_MAX_RETRIES=2)
+    def test_unparseable_reply_is_retried_then_raised(self):
+        with self.assertRaises(ValueError):
+            ask_ai_to_structure('garbled page')
+
+        self.assertEqual(len(self.openrouter.prompts), 3)
+
+
+def export_row(i):
+    return {
+        'date': (date(2025, 1, 1) + timedelta(days=i % 300)).isoformat(), 'amount': f'{100 + i}.50',
+        'balance': f'{20000 + i}.00', 'description': f'POS PURCHASE {i}', 'transaction_type': 'debit',
+        'reference': f'REF{i:05d}', 'channel': 'POS', 'counterparty': '',
+    }
+
+
+class ImportTransactionsTests(BusinessTestCase):
+    """A bad row in the middle of an export is reported; the rows around it are imported."""
+    rows = 300
+    bad_row = 150
+
+    def upload(self, name, content):
+        return self.client.post(
+            reverse('import-transactions', args=[self.business.id]),
+            {'file': SimpleUploadedFile(name, content.encode())},
+            format='multipart',
+        )
+
+    def json_records(self, bad_record):
+        return [
+            bad_record if i == self.bad_row else json.dumps(export_row(i)) for i in range(1, self.rows + 1)
+        ]
+
+    def assertBadRowSkipped(self, response, error):
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['rows_imported'], self.rows - 1)
+        self.assertEqual(response.data['rows_rejected'], 1)
+        self.assertEqual(len(response.data['errors']), 1)
+        self.assertEqual(response.data['errors'][0]['row'], self.bad_row)
+        self.assertIn(error, response.data['errors'][0]['error'])
+        self.assertEqual(BankTransaction.objects.filter(business=self.business).count(), self.rows - 1)
+
+    def test_csv(self):
+        fields = list(export_row(0))
+        lines = [','.join(fields)] + [
+            ','.join('not a number' if i == self.bad_row and field == 'amount' else export_row(i)[field]
+                     for field in fields)
+            for i in range(1, self.rows + 1)
+        ]
+        response = self.upload('export.csv', '\n'.join(lines))
+
+        self.assertBadRowSkipped(response, 'amount')
+
+    def test_json_lines(self):
+        response = self.upload('export.jsonl', '\n'.join(self.json_records('{"date": "2025-05-30", "amount": }')))
+
+        self.assertBadRowSkipped(response, 'invalid JSON')
+
+    def test_json_array(self):
+        records = self.json_records('{"date": "2025-05-30" "amount": [1, "]}"], "note": "a, \\"b\\""}')
+        # Small reads so that elements, good and bad, straddle buffer refills
+        with mock.patch('ingestion.utils.files_parser.JSON_READ_SIZE', 100):
+            response = self.upload('export.json', '[\n' + ',\n'.join(records) + '\n]')
+
+        self.assertBadRowSkipped(response, 'invalid JSON')
+
+    def test_broken_json_array_is_rejected(self):
+        truncated = '[' + ','.join(self.json_records(json.dumps(export_row(self.bad_row))))[:-10]
+        unterminated = '[' + ','.join(self.json_records('{"description": "' + 'x' * 5000))
+
+        with mock.patch('ingestion.utils.files_parser.JSON_MAX_ROW_SIZE', 1000):
+            for content in (truncated, unterminated):
+                with self.subTest(content=content[-20:]):
+                    response = self.upload('export.json', content)
+                    self.assertEqual(response.status_code, 400)
+
+        self.assertFalse(BankTransaction.objects.filter(business=self.business).exists())
+
+
+class StatementPipelineTests(BusinessTestCase):
+    """The upload → extract → structure → save → score chain, run inline by an eager Celery app."""
+
+    def setUp(self):
+        super().setUp()
+        # The app reads Django's CELERY_* settings once, so override its own copy
+        conf = {'CELERY_TASK_ALWAYS_EAGER': True, 'CELERY_TASK_EAGER_PROPAGATES': False}
+        self.addCleanup(celery_app.conf.update, {name: celery_app.conf.get(name) for name in conf})
+        celery_app.conf.update(conf)
+
+    def upload(self):
+        response = self.client.post(
+            reverse('upload-statement', args=[self.business.id]),
+            {'file': SimpleUploadedFile('statement.pdf', b'%PDF-1.4 statement')},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, 202, response.data)
+        return StatementJob.objects.get(id=response.data['job_id'])
+
+    def test_statement_is_saved_and_scored(self):
+        parsed = transactions_frame(0, 59).assign(
+            date=lambda df: df['date'].map(date.isoformat),
+            balance=lambda df: 50000.0 + df['amount'].cumsum(),
+        )
+        with mock.patch('ingestion.pipeline.parse_statement', return_value=parsed):
+            job = self.upload()
+
+        self.assertEqual((job.status, job.stage, job.progress), (StatementJob.STATUS_SUCCEEDED, StatementJob.STAGE_DONE, 100))
+        self.assertEqual(job.statement.transactions.count(), 60)
+        self.assertTrue(CreditScore.objects.filter(sme=self.business).exists())
+        self.assertFalse(os.path.exists(job.file_path))
+
+    def test_failed_step_fails_the_job(self):
+        with mock.patch('ingestion.pipeline.parse_statement', return_value=None), \
+                mock.patch('ingestion.pipeline.structure_statement_pages', side_effect=ValueError('AI reply was not JSON')):
+            job = self.upload()
+
+        self.assertEqual((job.status, job.stage), (StatementJob.STATUS_FAILED, StatementJob.STAGE_STRUCTURING))
+        self.assertEqual(job.error, 'AI reply was not JSON')
+        self.assertIsNone(job.statement)
+        self.assertFalse(CreditScore.objects.filter(sme=self.business).exists())
+        self.assertFalse(os.path.exists(job.file_path))
+
+
+GTBANK_HEADER = ['Trans. Date', 'Value Date', 'Reference', 'Debits', 'Credits', 'Balance', 'Remarks']
+GTBANK_ROWS = [
+    ['02-Jan-2025', '02-Jan-2025', 'FT001', '', '150,000.00', '250,000.00', 'NIP TRANSFER FROM ADA OBI'],
+    ['03-Jan-2025', '03-Jan-2025', 'FT002', '12,500.00', '', '237,500.00', 'POS PURCHASE SHOPRITE'],
+    ['', '', '', '', '', '', 'LEKKI BRANCH'],  # wrapped remarks
+    ['05-Jan-2025', '05-Jan-2025', 'FT003', '7,500.50', '', '229,999.50', 'ATM WITHDRAWAL'],
+    ['06-Jan-2025', '06-Jan-2025', 'FT004', '', '20,000.50', '250,000.00', 'USSD TRANSFER'],
+]
+
+
+class StubPDF:
+    """Stands in for pdfplumber.open(): pages with fixed text and tables, recording which were read."""
+
+    def __init__(self, pages):
+        self.pages = [mock.Mock(**{
+            'extract_text.return_value': text, 'extract_tables.return_value': tables,
+        }) for text, tables in pages]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+@override_settings(TABLE_PARSER_MIN_CONFIDENCE=0.9, TABLE_PARSER_PROBE_PAGES=2)
+class TableParserTests(SimpleTestCase):
+    def parse(self, pages):
+        self.pdf = StubPDF(pages)
+        with mock.patch('ingestion.utils.table_parser.pdfplumber.open', return_value=self.pdf):
+            return parse_statement_tables('statement.pdf'), parse_statement('statement.pdf')
+
+    def test_regular_statement_skips_the_ai(self):
+        (df, confidence, profile), parsed = self.parse([
+            ('Guaranty Trust Bank\nCustomer statement', [[GTBANK_HEADER] + GTBANK_ROWS[:3]]),
+            ('Page 2', [GTBANK_ROWS[3:]]),
+        ])
+
+        self.assertEqual((confidence, profile), (1.0, 'gtbank'))
+        pd.testing.assert_frame_equal(parsed, df)
+        self.assertEqual(list(df['amount']), [150000.0, -12500.0, -7500.5, 20000.5])
+        self.assertEqual(list(df['channel']), ['TRANSFER', 'POS', 'ATM', 'USSD'])
+        self.assertEqual(df['date'].iloc[0], '2025-01-02')
+
+    def test_unreconciled_statement_falls_back_to_the_ai(self):
+        # Balances misread on two of four rows
+        rows = [row[:] for row in GTBANK_ROWS]
+        rows[1][5], rows[4][5] = '237,800.00', '25,000.00'
+        (df, confidence, profile), parsed = self.parse([('GTBank statement', [[GTBANK_HEADER] + rows])])
+
+        self.assertEqual((len(df), profile), (4, 'gtbank'))
+        self.assertLess(confidence, 0.9)
+        self.assertIsNone(parsed)
+
+    def test_statement_without_a_table_header_is_not_read_past_the_probe(self):
+        (df, confidence, _), parsed = self.parse(
+            [('Zenith Bank', [[['Account summary', 'NGN']]])] * 2 + [('Page 3', [[GTBANK_HEADER] + GTBANK_ROWS])]
+        )
+
+        self.assertEqual((len(df), confidence), (0, 0.0))
+        self.assertIsNone(parsed)
+        self.pdf.pages[2].extract_tables.assert_not_called()
+
+
+def running_statement(amounts, opening=10000.0):
+    """A statement of `amounts`, a day apart, whose balances reconcile from `opening`."""
+    balances = opening + pd.Series(amounts, dtype=float).cumsum()
+    return pd.DataFrame({
+        'date': pd.date_range('2025-03-01', periods=len(amounts)),
+        'amount': [float(amount) for amount in amounts],
+        'balance': balances,
+        'description': [f'TRANSFER {i}' for i in range(len(amounts))],
+        'transaction_type': ['credit' if amount > 0 else 'debit' for amount in amounts],
+        'channel': 'TRANSFER',
+        'counterparty': None,
+    })
+
+
+class ReconciliationTests(BusinessTestCase):
+    amounts = [500, -200, 1200.5, -300.25, 800, -50]
+
+    def test_clean_statement(self):
+        df = running_statement(self.amounts)
+        reconciled, report = reconcile_transactions(df)
+
+        self.assertEqual(report, {
+            'score': 1.0, 'breaks': 0, 'sign_flips': 0, 'balance_fixes': 0, 'inferred_rows': 0, 'unresolved': 0,
+        })
+        pd.testing.assert_frame_equal(reconciled, df.assign(is_inferred=False))
+
+    def test_newest_first_statement_keeps_its_order(self):
+        df = running_statement(self.amounts).iloc[::-1].reset_index(drop=True)
+        reconciled, report = reconcile_transactions(df)
+
+        self.assertEqual((report['score'], report['breaks']), (1.0, 0))
+        pd.testing.assert_frame_equal(reconciled, df.assign(is_inferred=False))
+
+    def test_swapped_sign_and_misread_balance_are_repaired(self):
+        df = running_statement(self.amounts)
+        df.loc[1, 'amount'] = 200.0  # debit read as a credit
+        df.loc[3, 'balance'] = 99999.0
+        reconciled, report = reconcile_transactions(df)
+
+        self.assertEqual((report['sign_flips'], report['balance_fixes'], report['inferred_rows']), (1, 1, 0))
+        self.assertEqual(report['unresolved'], 0)
+        pd.testing.assert_frame_equal(reconciled, running_statement(self.amounts).assign(is_inferred=False))
+
+    def test_dropped_row_is_inferred(self):
+        df = running_statement(self.amounts).drop(index=2).reset_index(drop=True)
+        reconciled, report = reconcile_transactions(df)
+
+        self.assertEqual((report['breaks'], report['inferred_rows'], report['unresolved']), (1, 1, 0))
+        self.assertEqual(report['score'], 0.75)
+        self.assertEqual(len(reconciled), len(self.amounts))
+        inferred = reconciled.iloc[2]
+        self.assertTrue(inferred['is_inferred'])
+        self.assertEqual(
+            (inferred['amount'], inferred['balance'], inferred['transaction_type'], inferred['description']),
+            (1200.5, 11500.5, 'credit', INFERRED_DESCRIPTION),
+        )
+        self.assertEqual(list(reconciled['is_inferred']), [False, False, True, False, False, False])
+
+    def test_unreconcilable_statement(self):
+        df = running_statement(self.amounts).assign(balance=[5000.0, 12.0, 800.0, 77777.0, 3.5, 640.0])
+
+        measured, report = reconcile_transactions(df, repair=False)
+        self.assertEqual((report['score'], report['breaks'], report['unresolved']), (0.0, 5, 5))
+        pd.testing.assert_frame_equal(measured, df.assign(is_inferred=False))
+
+        # Repair keeps every extracted row and explains each break with an inferred one
+        repaired, report = reconcile_transactions(df)
+        self.assertEqual((report['score'], report['inferred_rows'], report['unresolved']), (0.0, 5, 0))
+        self.assertEqual(len(repaired), 11)
+        pd.testing.assert_frame_equal(
+            repaired[~repaired['is_inferred']].reset_index(drop=True), df.assign(is_inferred=False)
+        )
+
+    def test_inferred_rows_are_stored_but_not_scored(self):
+        df, summary = clean_transactions(running_statement(self.amounts).drop(index=2).reset_index(drop=True))
+        with tempfile.NamedTemporaryFile(suffix='.pdf') as pdf:
+            pdf.write(b'%PDF-1.4 reconciled')
+            pdf.flush()
+            statement = save_statement(self.business, df, summary, pdf.name)
+
+        self.assertEqual(
+            (statement.reconciliation_score, statement.reconciliation_breaks, statement.reconciliation_repairs),
+            (Decimal('0.75'), 1, 1),
+        )
+        self.assertEqual(statement.total_income, Decimal('1300.00'))
+        self.assertEqual(statement.transactions.count(), len(self.amounts))
+        self.assertEqual(BankTransaction.objects.scored().filter(statement=statement).count(), len(self.amounts) - 1)
+
+
+class PartitionMigrationTests(BusinessTestCase):
+    migration = import_module('ingestion.migrations.0002_partition_bank_transactions')
+
+    def run_partition_sql(self, vendor):
+        operation = self.migration.Migration.operations[-1]
+        editor = mock.Mock(connection=mock.Mock(vendor=vendor, alias=connection.alias))
+        state = ProjectState()
+        operation.database_forwards('ingestion', editor, state, state)
+        operation.database_backwards('ingestion', editor, state, state)
+        return [call.args[0] for call in editor.execute.call_args_list]
+
+    def test_partitioning_only_runs_on_postgresql(self):
+        self.assertEqual(self.run_partition_sql('sqlite'), [])
+        self.assertEqual(self.run_partition_sql('mysql'), [])
+        with mock.patch.object(self.migration.RunPostgreSQL, '_run_sql') as run_sql:
+            self.run_partition_sql('postgresql')
+        self.assertEqual(
+            [call.args[1] for call in run_sql.call_args_list], [self.migration.FORWARD_SQL, self.migration.REVERSE_SQL]
+        )
+
+    @skipIf(connection.vendor == 'postgresql', 'the table is partitioned on PostgreSQL')
+    def test_plain_table_on_other_backends(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, BankTransaction._meta.db_table)
+        self.assertEqual(constraints['unique_bank_transaction_fingerprint']['columns'], ['fingerprint', 'date'])
+        self.assertEqual([c['columns'] for c in constraints.values() if c['primary_key']], [['id']])
+
+        bulk_insert_transactions(self.make_statement('partitioned'), transactions_frame(0, 2))
+        self.assertEqual(BankTransaction.objects.filter(business=self.business).count(), 3)
+
+    @skipUnless(connection.vendor == 'postgresql', 'partitions need PostgreSQL')
+    def test_partitioned_by_month_on_postgresql(self):
+        table = BankTransaction._meta.db_table
+        bulk_insert_transactions(self.make_statement('partitioned'), transactions_frame(0, 2).assign(date=date.today()))
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT partstrat FROM pg_partitioned_table WHERE partrelid = %s::regclass", [table])
+            self.assertEqual(cursor.fetchall(), [('r',)])
+            cursor.execute(f"SELECT DISTINCT tableoid::regclass::text FROM {table} WHERE business_id = %s", [self.business.id])
+            self.assertEqual(cursor.fetchall(), [(f"{table}_{date.today():%Y_%m}",)])
@@ -1,6 +1,9 @@
 from django.urls import path
 
-from ingestion.views import UploadBankStatementView, DownloadBankStatementView
+from ingestion.views import (
+    UploadBankStatementView, DownloadBankStatementView, StatementJobView, ImportTransactionsView,
+    BusinessTransactionsView
+)
 
 urlpatterns = [
       path('upload-statement/<int:business_id>/', UploadBankStatementView.as_view(), name='upload-statement'),
@@ -9,4 +12,10 @@ urlpatterns = [
         'download-statement/<uuid:statement_id>/',
         DownloadBankStatementView.as_view(),
         name='download-statement'),
+
+      path('jobs/<uuid:job_id>/', StatementJobView.as_view(), name='statement-job'),
+
+      path('import-transactions/<int:business_id>/', ImportTransactionsView.as_view(), name='import-transactions'),
+
+      path('businesses/<int:business_id>/transactions/', BusinessTransactionsView.as_view(), name='business-transactions'),
 ]
@@ -0,0 +1,98 @@
+import hashlib
+import logging
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'ai-structure'
+
+
+def normalize_text(text):
+    """Collapse whitespace so re-extractions of the same PDF share a cache key."""
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+class AIResultCache:
+    """
+    Cache of AI structuring results keyed by a SHA-256 of
+    (normalized text, model name, prompt version).
+
+    Storage, TTL and size-based eviction come from the Django cache
+    alias named by AI_CACHE_ALIAS (local memory, file-based or Redis;
+    see TIMEOUT and OPTIONS['MAX_ENTRIES'] in CACHES). Hits and misses
+    are counted per process and in the cache itself so all workers
+    share the totals.
+    """
+
+    def __init__(self, alias=None, timeout=None):
+        self.alias = alias or getattr(settings, 'AI_CACHE_ALIAS', 'ai_structuring')
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def make_key(text, model, prompt_version):
+        digest = hashlib.sha256(
+            f"{model}\x00{prompt_version}\x00{normalize_text(text)}".encode()
+        ).hexdigest()
+        return f"{KEY_PREFIX}:{digest}"
+
+    def get(self, key):
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            self._count('misses')
+        else:
+            self.hits += 1
+            self._count('hits')
+        logger.debug("AI cache %s for %s", 'miss' if value is None else 'hit', key)
+        return value
+
+    def set(self, key, value):
+        if self.timeout is None:
+            self.backend.set(key, value)
+        else:
+            self.backend.set(key, value, timeout=self.timeout)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def stats(self):
+        """Hit/miss counts for this process and across all processes."""
+        shared = self.backend.get_many([f"{KEY_PREFIX}:stats:hits", f"{KEY_PREFIX}:stats:misses"])
+        return {
+            'process_hits': self.hits,
+            'process_misses': self.misses,
+            'hits': shared.get(f"{KEY_PREFIX}:stats:hits", 0),
+            'misses': shared.get(f"{KEY_PREFIX}:stats:misses", 0),
+        }
+
+    def _count(self, name):
+        key = f"{KEY_PREFIX}:stats:{name}"
+        try:
+            self.backend.add(key, 0, timeout=None)
+            self.backend.incr(key)
+        except ValueError:
+            # Evicted between add() and incr(); the counter is best effort.
+            pass
+
+
+_cache = None
+
+
+def get_ai_cache():
+    global _cache
+    if _cache is None:
+        _cache = AIResultCache()
+    return _cache
@@ -1,13 +1,38 @@
-import os
 import re
 import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
 import pandas as pd
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .ai_cache import get_ai_cache
+
+DEFAULT_OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+DEFAULT_MODEL = "tngtech/deepseek-r1t2-chimera:free"
+# Bump whenever the prompt changes so cached results of the old prompt are not reused.
+PROMPT_VERSION = "1"
+
+HEADER_PATTERN = re.compile(r"\bdate\b.*\b(balance|amount|debit|credit)\b", re.IGNORECASE)
+AMOUNT_PATTERN = re.compile(r"-?\d[\d,]*\.\d{2}")
+# The JSON array in a response; an empty one means the text holds no transactions
+JSON_ARRAY_PATTERN = re.compile(r"\[\s*(?:{.*?}\s*)?\]", re.DOTALL)
+# Rows at each side of a chunk boundary compared when removing duplicates
+SEAM_WINDOW = 5
 
-# Load API key from Django settings or environment
-OPENROUTER_API_KEY = getattr(settings, "OPENROUTER_API_KEY", None)
-OPENROUTER_URL = getattr(settings, "OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+
+class OpenRouterError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self):
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
 
 
 def ask_ai_to_structure(text):
@@ -24,6 +49,9 @@ def ask_ai_to_structure(text):
     - channel: e.g., POS, TRANSFER, USSD, ATM
     - counterparty: if available
 
+    Results are cached by (normalized text, model, prompt version),
+    so identical statements skip the HTTP call.
+
     Parameters:
     - text (str): Raw bank statement text extracted from PDF
 
@@ -33,8 +61,180 @@ def ask_ai_to_structure(text):
     Raises:
     - Exception: If OpenRouter API call fails or returns invalid format
     """
-    if not OPENROUTER_API_KEY:
-        raise Exception("OpenRouter API key not set in settings.")
+    return pd.DataFrame(_structure_chunk(text))
+
+
+def ask_ai_to_structure_pages(pages, pages_per_chunk=None, max_workers=None):
+    """
+    Structure a multi-page statement by sending page-aligned chunks
+    to OpenRouter concurrently and merging the results in page order.
+
+    Every chunk after the first is prefixed with the table header and the
+    last balance seen before it, so the model can read it on its own.
+    Rows repeated on both sides of a chunk boundary are dropped.
+
+    `pages` may be a generator: each chunk is sent as soon as its pages
+    have been extracted, while later pages are still being read.
+
+    Parameters:
+    - pages (iterable[str]): Text of each page, in order.
+    - pages_per_chunk (int): Pages per request (AI_CHUNK_PAGES by default).
+    - max_workers (int): Concurrent requests (AI_MAX_CONCURRENCY by default).
+
+    Returns:
+    - pd.DataFrame: A DataFrame containing structured transaction data
+    """
+    pages_per_chunk = pages_per_chunk or getattr(settings, "AI_CHUNK_PAGES", 5)
+    max_workers = max_workers or getattr(settings, "AI_MAX_CONCURRENCY", 4)
+    chunks = iter_chunks(pages, pages_per_chunk)
+    first = next(chunks)
+    second = next(chunks, None)
+
+    if second is None:
+        return pd.DataFrame(_structure_chunk(*first))
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_structure_chunk, text, context, session=session)
+            for text, context in chain([first, second], chunks)
+        ]
+        results = [future.result() for future in futures]
+
+    return pd.DataFrame(merge_chunk_records(results))
+
+
+def iter_chunks(pages, pages_per_chunk):
+    """
+    Group pages into chunks of `pages_per_chunk`, consuming `pages` lazily.
+
+    Yields:
+    - tuple[str, str]: (text, context) per chunk; context carries the
+      table header and running balance from the preceding pages.
+      At least one (possibly empty) chunk is always yielded.
+    """
+    header = None
+    last_balance = None
+    chunk_pages = []
+    yielded = False
+
+    def make_chunk():
+        context_lines = []
+        if yielded and header:
+            context_lines.append(f"Table header: {header}")
+        if yielded and last_balance:
+            context_lines.append(f"Balance carried forward: {last_balance}")
+        return "\n".join(chunk_pages), "\n".join(context_lines)
+
+    for page in pages:
+        chunk_pages.append(page)
+        if len(chunk_pages) == pages_per_chunk:
+            header = header or _find_header(chunk_pages)
+            yield make_chunk()
+            yielded = True
+            last_balance = _last_amount(chunk_pages) or last_balance
+            chunk_pages = []
+
+    if chunk_pages or not yielded:
+        yield make_chunk()
+
+
+def merge_chunk_records(results):
+    """Concatenate per-chunk records, dropping rows duplicated across a chunk boundary."""
+    merged = []
+    for records in results:
+        if merged:
+            tail = {_record_key(r) for r in merged[-SEAM_WINDOW:]}
+            head = records[:SEAM_WINDOW]
+            records = [r for r in head if _record_key(r) not in tail] + records[SEAM_WINDOW:]
+        merged.extend(records)
+    return merged
+
+
+def _record_key(record):
+    return (
+        str(record.get("date")),
+        str(record.get("amount")),
+        str(record.get("balance")),
+        " ".join(str(record.get("description") or "").split()),
+    )
+
+
+def _find_header(pages):
+    for page in pages[:2]:
+        for line in page.splitlines():
+            if HEADER_PATTERN.search(line):
+                return line.strip()
+    return None
+
+
+def _last_amount(pages):
+    for page in reversed(pages):
+        for line in reversed(page.splitlines()):
+            amounts = AMOUNT_PATTERN.findall(line)
+            if amounts:
+                return amounts[-1]
+    return None
+
+
+def _structure_chunk(text, context="", session=None):
+    model = getattr(settings, "OPENROUTER_MODEL", DEFAULT_MODEL)
+    cache = get_ai_cache()
+    key = cache.make_key(f"{context}\n{text}" if context else text, model, PROMPT_VERSION)
+    return cache.get_or_compute(
+        key,
+        lambda: _with_retries(lambda: request_transactions(text, model, context=context, session=session))
+    )
+
+
+def _with_retries(call):
+    # Retried: connection errors, 429/5xx responses and responses without a
+    # parseable JSON array. A valid empty array is a result, not a failure.
+    attempts = getattr(settings, "AI_MAX_RETRIES", 3)
+    backoff = getattr(settings, "AI_RETRY_BACKOFF", 1.0)
+    for attempt in range(attempts + 1):
+        try:
+            return call()
+        except (OpenRouterError, requests.RequestException, ValueError) as e:
+            if attempt == attempts or (isinstance(e, OpenRouterError) and not e.retryable):
+                raise
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random() / 2))
+
+
+def request_transactions(text, model=DEFAULT_MODEL, context="", session=None):
+    """
+    Call OpenRouter and parse the JSON array of transactions it returns.
+
+    Parameters:
+    - text (str): Statement text to structure.
+    - model (str): OpenRouter model name.
+    - context (str): Lines from earlier pages to read but not extract.
+    - session (requests.Session): Shared session for pooled connections.
+
+    Returns:
+    - list[dict]: One dict per transaction; empty when the text has none
+      (e.g. a cover page or a page of totals).
+
+    Raises:
+    - OpenRouterError: If the API call fails.
+    - ValueError: If the response holds no parseable JSON array.
+    """
+    api_key = getattr(settings, "OPENROUTER_API_KEY", None)
+    url = getattr(settings, "OPENROUTER_API_URL", DEFAULT_OPENROUTER_URL)
+    timeout = getattr(settings, "AI_REQUEST_TIMEOUT", 300)
+    if not api_key:
+        raise OpenRouterError("OpenRouter API key not set in settings.", status_code=401)
+
+    context_block = ""
+    if context:
+        context_block = f"""
+Context from earlier pages (use it to read the columns, do not return it as rows):
+{context}
+"""
 
     prompt = f"""
 Extract the bank statement table from the following text. Each row must contain:
@@ -47,43 +247,42 @@ Extract the bank statement table from the following text. Each row must contain:
 - counterparty (if available)
 
 Return only a **valid JSON array of objects** — no explanation, no markdown, no headings.
-
+{context_block}
 Bank statement text:
 {text}
 """.strip()
 
     headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
         "HTTP-Referer": "http://localhost:8000",
         "X-Title": "BankStatementExtractor"
     }
 
     payload = {
-        "model": "tngtech/deepseek-r1t2-chimera:free",
+        "model": model,
         "messages": [{"role": "user", "content": prompt}],
         "temperature": 0.2
     }
 
-    response = requests.post(OPENROUTER_URL, headers=headers, json=payload)
+    response = (session or requests).post(url, headers=headers, json=payload, timeout=timeout)
 
     if response.status_code != 200:
         try:
             error = response.json()
         except Exception:
             error = response.text
-        raise Exception(f"OpenRouter API Error: {error}")
+        raise OpenRouterError(f"OpenRouter API Error: {error}", status_code=response.status_code)
 
     try:
         content = response.json()['choices'][0]['message']['content']
         # Extract only the JSON array from the content
-        match = re.search(r"\[\s*{.*?}\s*\]", content, re.DOTALL)
+        match = JSON_ARRAY_PATTERN.search(content)
         if not match:
             raise ValueError("No JSON array found in AI response.")
 
         json_data = match.group(0)
-        data = json.loads(json_data)
-        return pd.DataFrame(data)
+        return json.loads(json_data)
 
     except Exception as e:
         raise ValueError(f"Failed to convert AI response to DataFrame: {e}")
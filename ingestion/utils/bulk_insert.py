@@ -0,0 +1,135 @@
+import hashlib
+from decimal import Decimal
+
+import pandas as pd
+from django.conf import settings
+
+from ingestion.models import BankTransaction
+from ingestion.signals import transactions_saved
+
+FINGERPRINT_LOOKUP_SIZE = 1000
+
+
+def transaction_fingerprint(business_id, date, amount, balance, description):
+    """
+    Identify a transaction of a business independently of the statement
+    it arrived in, so overlapping statements do not store it twice.
+    """
+    key = f"{business_id}|{date.isoformat()}|{amount:.2f}|{balance:.2f}|{description.strip()}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def frame_to_transactions(statement, df):
+    """
+    Convert a structured statement DataFrame into unsaved BankTransaction
+    objects, converting whole columns at once instead of row by row.
+
+    Parameters:
+    - statement (BankStatement): Statement the transactions belong to.
+    - df (pd.DataFrame): Frame with date, amount, balance, description,
+      transaction_type, channel and counterparty columns, and optionally
+      is_inferred (see reconcile_transactions).
+
+    Returns:
+    - list[BankTransaction]: Unsaved model instances, fingerprinted.
+    """
+    dates = pd.to_datetime(df['date']).dt.date
+    amounts = df['amount'].astype(float).round(2).map('{:.2f}'.format).map(Decimal)
+    balances = df['balance'].astype(float).round(2).map('{:.2f}'.format).map(Decimal)
+    descriptions = _text_column(df, 'description', '')
+    types = _text_column(df, 'transaction_type', 'credit')
+    channels = _text_column(df, 'channel', '')
+    counterparties = _text_column(df, 'counterparty', '')
+    inferred = df['is_inferred'].fillna(False).astype(bool) if 'is_inferred' in df else [False] * len(df)
+
+    return [
+        BankTransaction(
+            statement=statement,
+            business_id=statement.business_id,
+            date=date,
+            amount=amount,
+            balance=balance,
+            description=description,
+            transaction_type=transaction_type,
+            channel=channel,
+            counterparty=counterparty,
+            is_inferred=is_inferred,
+            fingerprint=transaction_fingerprint(statement.business_id, date, amount, balance, description),
+        )
+        for date, amount, balance, description, transaction_type, channel, counterparty, is_inferred in zip(
+            dates, amounts, balances, descriptions, types, channels, counterparties, inferred
+        )
+    ]
+
+
+def bulk_insert_transactions(statement, df, batch_size=None):
+    """
+    Insert the rows of `df` as BankTransactions of `statement`
+    using bulk_create in batches of `batch_size` rows. Rows the business
+    already has (same fingerprint) are skipped, including rows a concurrent
+    upload of an overlapping statement stores in the meantime.
+
+    Call inside transaction.atomic() together with the statement save
+    so a failed insert never leaves a partial upload behind.
+    Sends transactions_saved once the rows are inserted.
+
+    Returns:
+    - list[BankTransaction]: The transactions actually written, with their ids.
+    """
+    batch_size = batch_size or getattr(settings, 'TRANSACTION_BULK_BATCH_SIZE', 1000)
+    transactions = drop_known_transactions(frame_to_transactions(statement, df))
+    # The lookup above does not lock anything: another upload can store the same
+    # fingerprints before this one commits. Skip those rows instead of failing.
+    BankTransaction.objects.bulk_create(transactions, batch_size=batch_size, ignore_conflicts=True)
+    created = written_transactions(statement, transactions)
+    if created:
+        transactions_saved.send(
+            sender=BankTransaction,
+            business_id=statement.business_id,
+            statement=statement,
+            transactions=created,
+        )
+    return created
+
+
+def drop_known_transactions(transactions):
+    """
+    Remove transactions whose fingerprint is repeated within the list
+    or already stored.
+    """
+    unique = {}
+    for tx in transactions:
+        unique.setdefault(tx.fingerprint, tx)
+
+    fingerprints = list(unique)
+    for start in range(0, len(fingerprints), FINGERPRINT_LOOKUP_SIZE):
+        known = BankTransaction.objects.filter(
+            fingerprint__in=fingerprints[start:start + FINGERPRINT_LOOKUP_SIZE]
+        ).values_list('fingerprint', flat=True)
+        for fingerprint in known:
+            del unique[fingerprint]
+
+    return list(unique.values())
+
+
+def written_transactions(statement, transactions):
+    """
+    The transactions that bulk_create(ignore_conflicts=True) stored under
+    `statement`, with their ids set. That call neither sets ids nor reports
+    which rows it skipped, so they are read back by fingerprint.
+    """
+    by_fingerprint = {tx.fingerprint: tx for tx in transactions}
+    fingerprints = list(by_fingerprint)
+    for start in range(0, len(fingerprints), FINGERPRINT_LOOKUP_SIZE):
+        rows = BankTransaction.objects.filter(
+            statement=statement,
+            fingerprint__in=fingerprints[start:start + FINGERPRINT_LOOKUP_SIZE],
+        ).values_list('fingerprint', 'id')
+        for fingerprint, pk in rows:
+            by_fingerprint[fingerprint].pk = pk
+
+    return [tx for tx in transactions if tx.pk is not None]
+
+
+def _text_column(df, column, default):
+    return df[column].astype(object).fillna(default).astype(str).replace('', default)
@@ -1,10 +1,20 @@
-import pdfplumber
-from decimal import Decimal
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pypdfium2 as pdfium
+from django.conf import settings
+
+from core.money import to_kobo, to_naira
+
+logger = logging.getLogger(__name__)
 
 
 def extract_text_from_pdf(file_path):
     """
-    Extract all text content from a PDF file using pdfplumber.
+    Extract all text content from a PDF file.
 
     Parameters:
     - file_path (str): Path to the PDF file.
@@ -13,11 +23,105 @@ def extract_text_from_pdf(file_path):
     - str: A single string containing the concatenated text from all pages.
            Returns an empty string for pages without extractable text.
     """
-    with pdfplumber.open(file_path) as pdf:
-        return "\n".join([
-            page.extract_text() or ""
-            for page in pdf.pages
-        ])
+    return "\n".join(iter_pdf_pages(file_path))
+
+
+def extract_pages_from_pdf(file_path):
+    """
+    Extract the text of each page of a PDF file.
+
+    Parameters:
+    - file_path (str): Path to the PDF file.
+
+    Returns:
+    - list[str]: One string per page, empty for pages without extractable text.
+    """
+    return list(iter_pdf_pages(file_path))
+
+
+def iter_pdf_pages(file_path, workers=None, pages_per_task=None):
+    """
+    Yield the text of each page of a PDF file, in page order.
+
+    Pages are extracted with pypdfium2. Large documents are split into
+    page ranges extracted in parallel by a process pool; pages are yielded
+    as soon as their range is done, so callers can start on the first
+    pages while later ones are still being extracted. Inside a daemonic
+    process (a Celery prefork worker), which cannot have children, the
+    ranges are extracted one after another instead.
+
+    Parameters:
+    - file_path (str): Path to the PDF file.
+    - workers (int): Worker processes (PDF_EXTRACT_WORKERS by default,
+      0 for the CPU count).
+    - pages_per_task (int): Pages handed to a worker at a time
+      (PDF_EXTRACT_PAGES_PER_TASK by default).
+
+    Yields:
+    - str: Page text, empty for pages without extractable text.
+    """
+    if workers is None:
+        workers = getattr(settings, 'PDF_EXTRACT_WORKERS', 1)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and multiprocessing.current_process().daemon:
+        workers = 1
+    pages_per_task = pages_per_task or getattr(settings, 'PDF_EXTRACT_PAGES_PER_TASK', 10)
+
+    started = time.perf_counter()
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        page_count = len(pdf)
+    finally:
+        pdf.close()
+
+    ranges = [
+        (file_path, start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ]
+
+    if workers <= 1 or len(ranges) <= 1:
+        results = map(_extract_page_range, ranges)
+        yield from _log_pages(results, file_path)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            yield from _log_pages(pool.map(_extract_page_range, ranges), file_path)
+
+    logger.info(
+        "Extracted %s pages from %s in %.3fs",
+        page_count, file_path, time.perf_counter() - started
+    )
+
+
+def _log_pages(results, file_path):
+    for page_range in results:
+        for page_number, text, seconds in page_range:
+            logger.debug("Page %s of %s extracted in %.4fs", page_number + 1, file_path, seconds)
+            yield text
+
+
+def _extract_page_range(task):
+    """
+    Extract pages [start, end) of a PDF. Runs in a worker process,
+    so the document is opened here rather than passed in.
+
+    Returns:
+    - list[tuple[int, str, float]]: (page number, text, seconds) per page.
+    """
+    file_path, start, end = task
+    pdf = pdfium.PdfDocument(file_path)
+    pages = []
+    try:
+        for page_number in range(start, end):
+            page_started = time.perf_counter()
+            page = pdf[page_number]
+            textpage = page.get_textpage()
+            text = (textpage.get_text_bounded() or "").replace("\r\n", "\n")
+            textpage.close()
+            page.close()
+            pages.append((page_number, text, time.perf_counter() - page_started))
+    finally:
+        pdf.close()
+    return pages
 
 
 def safe_decimal(value):
@@ -36,4 +140,4 @@ def safe_decimal(value):
     - ValueError: If the input value cannot be converted to float.
     - decimal.InvalidOperation: If the value is invalid for Decimal.
     """
-    return Decimal(str(abs(float(value)))).quantize(Decimal('0.01'))
+    return to_naira(abs(to_kobo(float(value))))
@@ -1,10 +1,23 @@
 import csv
 import io
 import json
+import re
+from typing import NamedTuple
+
 from rest_framework.exceptions import ValidationError
 
 from .validators import validate_transaction_payload
 
+JSON_READ_SIZE = 64 * 1024
+# Largest array element that is buffered while looking for its end
+JSON_MAX_ROW_SIZE = 1024 * 1024
+JSON_STRUCTURE = re.compile(r'["\\{}\[\],]')
+
+
+class InvalidRow(NamedTuple):
+    """Stands in for a record that could not be decoded, so it can be reported as a row error."""
+    error: str
+
 
 def normalize_row(row):
     row['amount'] = float(row['amount'])
@@ -13,10 +26,117 @@ def normalize_row(row):
     return row
 
 
+def text_stream(file):
+    """Wrap an uploaded (binary) file so it can be read as UTF-8 text line by line."""
+    return io.TextIOWrapper(getattr(file, 'file', file), encoding='utf-8', newline='')
+
+
+def iter_csv_rows(file):
+    """Yield each CSV row as a dict without reading the whole file into memory."""
+    yield from csv.DictReader(text_stream(file))
+
+
+def iter_json_rows(file):
+    """
+    Yield transaction objects from a JSON array or a JSON-lines file,
+    decoding one object at a time. A record that is not valid JSON is
+    yielded as an InvalidRow and reading goes on with the next one.
+
+    Raises:
+    - ValueError: If the array itself is broken (unterminated, or an
+      element runs past JSON_MAX_ROW_SIZE).
+    """
+    stream = text_stream(file)
+    first = ''
+    while not first:
+        char = stream.read(1)
+        if not char:
+            return
+        first = char.strip()
+
+    if first == '[':
+        yield from _iter_json_array(stream)
+        return
+
+    line = first + stream.readline()
+    while line:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield InvalidRow(f'invalid JSON: {e.msg}')
+        line = stream.readline()
+
+
+def _iter_json_array(stream):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    while True:
+        # Skip separators, refilling the buffer as needed
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("Invalid JSON file")
+            buffer, pos = stream.read(JSON_READ_SIZE), 0
+            eof = not buffer
+            continue
+        if buffer[pos] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            end = _element_end(buffer, pos)
+            if end is None:
+                # The element goes on past the buffer: read more of it
+                if len(buffer) - pos > JSON_MAX_ROW_SIZE:
+                    raise ValueError("Invalid JSON file")
+                more = stream.read(JSON_READ_SIZE)
+                if not more:
+                    raise ValueError("Invalid JSON file")
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            item = InvalidRow(f'invalid JSON: {e.msg}')
+
+        yield item
+        pos = end
+
+
+def _element_end(buffer, pos):
+    """
+    Index just past the array element starting at buffer[pos], found by
+    matching brackets outside strings, or None if the buffer ends first.
+    """
+    depth = 0
+    in_string = False
+    while True:
+        match = JSON_STRUCTURE.search(buffer, pos)
+        if match is None:
+            return None
+        char, pos = match.group(), match.end()
+        if in_string:
+            if char == '\\':
+                pos += 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]' and depth:
+            depth -= 1
+            if not depth:
+                return pos
+        elif char in ',]' and not depth:
+            return match.start()
+
+
 def parse_csv(file):
-    decoded = file.read().decode('utf-8')
-    io_string = io.StringIO(decoded)
-    reader = csv.DictReader(io_string)
+    reader = iter_csv_rows(file)
     transactions = []
     errors = []
 
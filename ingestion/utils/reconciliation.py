@@ -0,0 +1,122 @@
+"""
+Running-balance reconciliation of structured statements.
+
+Every row of a statement should satisfy
+balance[i-1] + amount[i] == balance[i]. Rows where that chain breaks
+point at extraction mistakes: a credit read as a debit, a misread
+balance, or rows that were dropped. reconcile_transactions() finds the
+breaks with whole-array NumPy operations, repairs the ones it can
+explain and reports how well the statement reconciled.
+"""
+import numpy as np
+import pandas as pd
+
+TOLERANCE = 0.01
+INFERRED_DESCRIPTION = 'Inferred missing transaction'
+
+
+def chain_breaks(amounts, balances, tolerance=TOLERANCE):
+    """
+    Returns:
+    - np.ndarray: True where a row does not follow from the previous one.
+      The first row has no opening balance and is never a break.
+    """
+    breaks = np.zeros(len(amounts), dtype=bool)
+    breaks[1:] = np.abs(balances[:-1] + amounts[1:] - balances[1:]) > tolerance
+    return breaks
+
+
+def reconcile_transactions(df, repair=True, tolerance=TOLERANCE):
+    """
+    Check and repair the running balance of a statement.
+
+    Statements listed newest first are reconciled in reverse and returned
+    in their original order. Repairs, in this order:
+    - sign flips: the balance moved by -amount (credit/debit swapped);
+    - balance fixes: one misread balance breaks two consecutive rows that
+      reconcile when it is skipped;
+    - inferred rows: any other gap is filled with a row whose amount is
+      the unexplained balance movement, so no money goes missing. These
+      rows have is_inferred set (False on every other row) and are kept
+      out of scoring.
+
+    Parameters:
+    - df (pd.DataFrame): Cleaned transactions with numeric amount and balance.
+    - repair (bool): Apply the repairs, or only measure the breaks.
+
+    Returns:
+    - tuple: (df, report). report holds score (share of rows that
+      reconciled as extracted), breaks, sign_flips, balance_fixes,
+      inferred_rows and unresolved (breaks left after repair).
+    """
+    df = df.reset_index(drop=True).assign(is_inferred=False)
+    amounts = df['amount'].to_numpy(dtype=float, copy=True)
+    balances = df['balance'].to_numpy(dtype=float, copy=True)
+
+    breaks = chain_breaks(amounts, balances, tolerance)
+    reverse = len(df) > 1 and chain_breaks(amounts[::-1], balances[::-1], tolerance).sum() < breaks.sum()
+    if reverse:
+        df = df.iloc[::-1].reset_index(drop=True)
+        amounts, balances = amounts[::-1].copy(), balances[::-1].copy()
+        breaks = chain_breaks(amounts, balances, tolerance)
+
+    report = {
+        'score': float(1.0 - breaks[1:].mean()) if len(df) > 1 else 1.0,
+        'breaks': int(breaks.sum()),
+        'sign_flips': 0,
+        'balance_fixes': 0,
+        'inferred_rows': 0,
+        'unresolved': int(breaks.sum()),
+    }
+    if not repair or not breaks.any():
+        return (df.iloc[::-1].reset_index(drop=True) if reverse else df), report
+
+    # Sign flips
+    flips = np.zeros(len(df), dtype=bool)
+    flips[1:] = breaks[1:] & (np.abs(balances[:-1] - amounts[1:] - balances[1:]) <= tolerance)
+    amounts[flips] = -amounts[flips]
+    report['sign_flips'] = int(flips.sum())
+
+    # A misread balance at row i breaks rows i and i+1
+    breaks = chain_breaks(amounts, balances, tolerance)
+    fixes = np.zeros(len(df), dtype=bool)
+    if len(df) > 2:
+        fixes[1:-1] = (
+            breaks[1:-1] & breaks[2:]
+            & (np.abs(balances[:-2] + amounts[1:-1] + amounts[2:] - balances[2:]) <= tolerance)
+        )
+        # Fixing row i also repairs row i+1, so within a run of consecutive
+        # candidates only every other one is a fix; the count restarts at
+        # each row that is not a candidate.
+        positions = np.arange(len(df))
+        run_start = np.maximum.accumulate(np.where(fixes & ~np.r_[False, fixes[:-1]], positions, 0))
+        fixes &= (positions - run_start) % 2 == 0
+    balances[fixes] = balances[np.flatnonzero(fixes) - 1] + amounts[fixes]
+    report['balance_fixes'] = int(fixes.sum())
+
+    df['amount'] = amounts
+    df['balance'] = balances
+    df.loc[flips, 'transaction_type'] = np.where(amounts[flips] > 0, 'credit', 'debit')
+
+    # Whatever is left is balance movement without a row: infer one
+    gaps = np.flatnonzero(chain_breaks(amounts, balances, tolerance))
+    if len(gaps):
+        missing = balances[gaps] - amounts[gaps] - balances[gaps - 1]
+        inferred = pd.DataFrame({
+            'date': df['date'].to_numpy()[gaps - 1],
+            'amount': missing,
+            'balance': balances[gaps - 1] + missing,
+            'description': INFERRED_DESCRIPTION,
+            'transaction_type': np.where(missing > 0, 'credit', 'debit'),
+            'channel': None,
+            'counterparty': None,
+            'is_inferred': True,
+        }, index=gaps - 0.5)
+        df = pd.concat([df.set_axis(np.arange(len(df), dtype=float)), inferred]).sort_index(kind='stable')
+        df = df.reset_index(drop=True)
+        report['inferred_rows'] = len(gaps)
+
+    report['unresolved'] = int(chain_breaks(
+        df['amount'].to_numpy(dtype=float), df['balance'].to_numpy(dtype=float), tolerance
+    ).sum())
+    return (df.iloc[::-1].reset_index(drop=True) if reverse else df), report
@@ -0,0 +1,271 @@
+"""
+Rule-based extraction of transactions from statements with a regular
+table layout, so common banks do not need the AI structuring step.
+
+Each bank profile lists the words that identify the bank, the header
+names of its columns and its date formats. parse_statement_tables()
+returns a DataFrame shaped like the AI output plus a confidence score.
+Only the first pages are read until a known table header is found, so
+statements that go to the AI anyway are not parsed twice.
+"""
+import re
+from datetime import datetime
+
+import pandas as pd
+import pdfplumber
+from django.conf import settings
+
+BANK_PROFILES = {
+    'gtbank': {
+        'markers': ['guaranty trust', 'gtbank', 'gtco'],
+        'columns': {
+            'date': ['trans. date', 'trans date', 'transaction date', 'date'],
+            'description': ['remarks', 'narration', 'description'],
+            'debit': ['debits', 'debit'],
+            'credit': ['credits', 'credit'],
+            'balance': ['balance'],
+        },
+        'date_formats': ['%d-%b-%Y', '%d-%b-%y', '%d/%m/%Y'],
+    },
+    'access': {
+        'markers': ['access bank'],
+        'columns': {
+            'date': ['posted date', 'trans date', 'date'],
+            'description': ['description', 'narration', 'remarks'],
+            'debit': ['debit', 'withdrawals'],
+            'credit': ['credit', 'lodgements', 'deposits'],
+            'balance': ['balance'],
+        },
+        'date_formats': ['%d-%b-%y', '%d-%b-%Y', '%d-%m-%Y', '%d/%m/%Y'],
+    },
+    'zenith': {
+        'markers': ['zenith bank', 'zenithbank'],
+        'columns': {
+            'date': ['date posted', 'trans date', 'date'],
+            'description': ['description', 'narration'],
+            'debit': ['debit', 'dr'],
+            'credit': ['credit', 'cr'],
+            'balance': ['balance'],
+        },
+        'date_formats': ['%d/%m/%Y', '%d-%m-%Y', '%d-%b-%Y'],
+    },
+    'generic': {
+        'markers': [],
+        'columns': {
+            'date': ['transaction date', 'trans date', 'posted date', 'value date', 'date'],
+            'description': ['description', 'narration', 'remarks', 'details', 'particulars'],
+            'amount': ['amount'],
+            'debit': ['debit', 'debits', 'withdrawal', 'withdrawals', 'dr'],
+            'credit': ['credit', 'credits', 'deposit', 'deposits', 'lodgement', 'cr'],
+            'balance': ['balance', 'running balance', 'closing balance'],
+        },
+        'date_formats': ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d-%b-%Y', '%d-%b-%y', '%d %b %Y'],
+    },
+}
+
+CHANNEL_KEYWORDS = [
+    ('POS', ['pos ', 'pos/', 'web pos']),
+    ('USSD', ['ussd']),
+    ('ATM', ['atm']),
+    ('TRANSFER', ['trf', 'transfer', 'nip', 'nibss', 'mobile']),
+    ('CASH', ['cash', 'cheque', 'chq']),
+]
+
+AMOUNT_CLEAN = re.compile(r"[^\d.\-]")
+
+
+def detect_profile(first_page_text):
+    text = (first_page_text or '').lower()
+    for name, profile in BANK_PROFILES.items():
+        if any(marker in text for marker in profile['markers']):
+            return name
+    return 'generic'
+
+
+def parse_amount(value):
+    """
+    Parse '1,234.50', '(1,234.50)', '1,234.50 DR', '₦1,234.50' and '-' style cells.
+    Returns None for blank cells, raises ValueError for unparseable ones.
+    """
+    if value is None:
+        return None
+    text = str(value).strip()
+    if text in ('', '-', '--'):
+        return None
+    negative = (text.startswith('(') and text.endswith(')')) or text.upper().endswith('DR')
+    number = AMOUNT_CLEAN.sub('', text)
+    if number in ('', '-', '.'):
+        raise ValueError(f"Invalid amount: {value!r}")
+    amount = float(number)
+    return -abs(amount) if negative else amount
+
+
+def parse_date(value, formats):
+    text = ' '.join(str(value or '').split())
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {value!r}")
+
+
+def infer_channel(description):
+    text = f"{(description or '').lower()} "
+    for channel, keywords in CHANNEL_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return channel
+    return None
+
+
+def match_header(row, columns):
+    """
+    Map column names to cell positions when `row` looks like a header.
+    Returns None unless date, balance and amount (or debit/credit) are found.
+    """
+    cells = [' '.join(str(cell or '').lower().split()) for cell in row]
+    mapping = {}
+    for field, names in columns.items():
+        for name in names:
+            if name in cells and cells.index(name) not in mapping.values():
+                mapping[field] = cells.index(name)
+                break
+    has_amount = 'amount' in mapping or ('debit' in mapping and 'credit' in mapping)
+    if 'date' in mapping and 'balance' in mapping and has_amount:
+        return mapping
+    return None
+
+
+def parse_rows(tables, profile):
+    """
+    Turn table rows into transaction dicts.
+
+    Returns:
+    - tuple: (records, candidate_rows) where candidate_rows counts the rows
+      below a header that looked like data, parsed or not.
+    """
+    columns = profile['columns']
+    formats = profile['date_formats']
+    mapping = None
+    records = []
+    candidates = 0
+
+    for table in tables:
+        for row in table:
+            header = match_header(row, columns)
+            if header:
+                mapping = header
+                continue
+            if mapping is None or not any(row) or len(row) <= max(mapping.values()):
+                continue
+            if not str(row[mapping['date']] or '').strip():
+                continue  # wrapped description line or opening balance row
+
+            candidates += 1
+            try:
+                record = _parse_row(row, mapping, formats)
+            except (ValueError, TypeError):
+                continue
+            if record:
+                records.append(record)
+
+    return records, candidates
+
+
+def _parse_row(row, mapping, formats):
+    date = parse_date(row[mapping['date']], formats)
+    balance = parse_amount(row[mapping['balance']])
+    if balance is None:
+        return None
+
+    if 'amount' in mapping:
+        amount = parse_amount(row[mapping['amount']])
+    else:
+        debit = parse_amount(row[mapping['debit']])
+        credit = parse_amount(row[mapping['credit']])
+        if bool(debit) == bool(credit):
+            return None
+        amount = credit if credit else -abs(debit)
+    if not amount:
+        return None
+
+    description = ''
+    if 'description' in mapping:
+        description = ' '.join(str(row[mapping['description']] or '').split())
+
+    return {
+        'date': date.isoformat(),
+        'amount': amount,
+        'balance': balance,
+        'description': description,
+        'transaction_type': 'credit' if amount > 0 else 'debit',
+        'channel': infer_channel(description),
+        'counterparty': None,
+    }
+
+
+def confidence_score(records, candidates):
+    """
+    Share of candidate rows that parsed, weighted by the share of
+    consecutive rows whose balances reconcile (prev + amount == balance).
+    Statements listed newest first are reconciled in reverse.
+    """
+    if not records or not candidates:
+        return 0.0
+    parsed = len(records) / candidates
+    if len(records) < 2:
+        return parsed * 0.5
+
+    pairs = list(zip(records, records[1:]))
+    forward = sum(1 for prev, curr in pairs if abs(prev['balance'] + curr['amount'] - curr['balance']) < 0.01)
+    backward = sum(1 for prev, curr in pairs if abs(curr['balance'] + prev['amount'] - prev['balance']) < 0.01)
+    return parsed * max(forward, backward) / len(pairs)
+
+
+def header_profile(tables, profile_name):
+    """
+    The profile, `profile_name` or else 'generic', whose header appears in
+    `tables`; None when neither does.
+    """
+    for name in dict.fromkeys([profile_name, 'generic']):
+        columns = BANK_PROFILES[name]['columns']
+        if any(match_header(row, columns) for table in tables for row in table):
+            return name
+    return None
+
+
+def parse_statement_tables(file_path, probe_pages=None):
+    """
+    Extract transactions from the tables of a PDF statement.
+
+    The first `probe_pages` pages are searched for a table header of the
+    bank's profile (or the generic one). Without one the statement is not
+    a regular table and the remaining pages are not read.
+
+    Parameters:
+    - file_path (str): Path to the PDF file.
+    - probe_pages (int): Pages searched for a header
+      (TABLE_PARSER_PROBE_PAGES by default).
+
+    Returns:
+    - tuple: (df, confidence, profile_name). df has the same columns as the
+      AI structuring output; confidence is between 0 and 1.
+    """
+    probe_pages = probe_pages or getattr(settings, 'TABLE_PARSER_PROBE_PAGES', 3)
+    with pdfplumber.open(file_path) as pdf:
+        if not pdf.pages:
+            return pd.DataFrame(), 0.0, 'generic'
+        profile_name = detect_profile(pdf.pages[0].extract_text())
+        tables = [table for page in pdf.pages[:probe_pages] for table in page.extract_tables()]
+        matched = header_profile(tables, profile_name)
+        if matched is None:
+            return pd.DataFrame(), 0.0, profile_name
+        profile_name = matched
+        tables += [table for page in pdf.pages[probe_pages:] for table in page.extract_tables()]
+
+    records, candidates = parse_rows(tables, BANK_PROFILES[profile_name])
+    if not records and profile_name != 'generic':
+        profile_name = 'generic'
+        records, candidates = parse_rows(tables, BANK_PROFILES[profile_name])
+
+    return pd.DataFrame(records), confidence_score(records, candidates), profile_name
@@ -1,5 +1,7 @@
 from rest_framework.exceptions import ValidationError
-from datetime import datetime
+from datetime import date, datetime
+
+import pandas as pd
 
 REQUIRED_FIELDS = ['date',
                    'description',
@@ -7,17 +9,17 @@ REQUIRED_FIELDS = ['date',
                    'transaction_type',
                    'reference']
 
+TRANSACTION_TYPES = ['credit', 'debit']
+
 
 def validate_transaction_payload(data):
     for field in REQUIRED_FIELDS:
         if field not in data or data[field] in [None, '']:
             raise ValidationError(f"'{field}' is required")
 
-    transaction_types = ['credit', 'debit']
-
-    if data['transaction_type'].lower() not in transaction_types:
+    if data['transaction_type'].lower() not in TRANSACTION_TYPES:
         raise ValidationError(
-            f"transaction_type must be one of: {', '.join(transaction_types)}"
+            f"transaction_type must be one of: {', '.join(TRANSACTION_TYPES)}"
         )
 
     try:
@@ -38,3 +40,73 @@ def validate_transaction_payload(data):
         raise ValidationError(
             "reference must not exceed 100 characters"
         )
+
+
+def validate_transaction_frame(df, require_balance=False, today=None):
+    """
+    Validate and normalize a whole batch of transactions at once.
+
+    Applies the checks of validate_transaction_payload column by column,
+    plus the future-date and debit-vs-balance rules of core.validators,
+    so large imports do not pay for a Python call per row.
+
+    Parameters:
+    - df (pd.DataFrame): Raw rows; the index is used as the row number.
+    - require_balance (bool): Whether 'balance' is required.
+    - today (date): Latest allowed transaction date (today by default).
+
+    Returns:
+    - tuple: (valid, errors). valid holds the rows that passed with
+      date parsed, amount and balance numeric, transaction_type lower-cased
+      and description stripped; errors is a list of {'row', 'error'} dicts,
+      the first failed check of each invalid row, in row order.
+    """
+    df = df.copy()
+    required = REQUIRED_FIELDS + (['balance'] if require_balance else [])
+    for field in required + ['balance']:
+        if field not in df.columns:
+            df[field] = None
+
+    error = pd.Series(None, index=df.index, dtype=object)
+
+    def flag(mask, message):
+        error[mask & error.isna()] = message
+
+    for field in required:
+        flag(df[field].isna() | (df[field] == ''), f"'{field}' is required")
+
+    transaction_type = df['transaction_type'].astype('string').str.lower()
+    flag(~transaction_type.isin(TRANSACTION_TYPES),
+         f"transaction_type must be one of: {', '.join(TRANSACTION_TYPES)}")
+
+    amount = pd.to_numeric(df['amount'], errors='coerce')
+    flag(amount.isna(), "amount must be a valid number")
+
+    today = today or date.today()
+    dates = pd.to_datetime(df['date'], format='%Y-%m-%d', errors='coerce')
+    # Years past pandas' Timestamp range do not parse; compare those as ISO strings
+    unparsed = df.loc[dates.isna(), 'date'].astype('string')
+    beyond_range = unparsed.str.fullmatch(r'\d{4}-\d{2}-\d{2}').fillna(False) & (unparsed > today.isoformat())
+    future = (dates > pd.Timestamp(today)) | beyond_range.reindex(df.index, fill_value=False)
+    flag(future, "Transaction date cannot be in the future.")
+    flag(dates.isna(), "date must be in YYYY-MM-DD format")
+
+    flag(df['reference'].astype('string').str.len() > 100, "reference must not exceed 100 characters")
+
+    has_balance = df['balance'].notna() & (df['balance'] != '')
+    balance = pd.to_numeric(df['balance'].where(has_balance), errors='coerce')
+    flag(has_balance & balance.isna(), "balance must be a valid number")
+
+    flag((transaction_type == 'debit') & (amount.abs() > balance),
+         "Debit amount cannot exceed resulting balance.")
+
+    valid = error.isna()
+    df = df[valid].assign(
+        date=dates[valid],
+        amount=amount[valid].astype(float),
+        balance=balance[valid].astype(float),
+        transaction_type=transaction_type[valid].astype(object),
+        description=df.loc[valid, 'description'].astype('string').str.strip().astype(object),
+    )
+    errors = [{'row': row, 'error': message} for row, message in error.dropna().items()]
+    return df, errors
@@ -1,10 +1,15 @@
 import base64
+import binascii
+import csv
+import json
 import os
-import tempfile
-import pandas as pd
 
-from django.http import HttpResponse
-from django.utils.timezone import now
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.urls import reverse
 
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser
@@ -12,18 +17,23 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from business.models import Business
-from .models import BankStatement, BankTransaction
-from .utils.ai_utility import ask_ai_to_structure
-from .utils.data_extract import extract_text_from_pdf, safe_decimal
-from .serializers import BankStatementSerializer
+from .blob_store import get_blob_store, hash_file
+from .importer import TransactionImport
+from .models import BankStatement, BankTransaction, StatementJob
+from .serializers import BankStatementSerializer, StatementJobSerializer
+from .tasks import start_statement_job
+from .utils.files_parser import iter_csv_rows, iter_json_rows
 
 
 class UploadBankStatementView(APIView):
     """
     POST: Upload a PDF bank statement.
-    Extracts + structures transactions via AI,
-    stores summary in BankStatement,
-    stores all entries in BankTransaction.
+    Queues extraction, AI structuring, transaction storage and
+    scoring as a background job and returns its id immediately.
+    Poll GET /api/jobs/<job_id>/ for progress.
+
+    A PDF this business already uploaded (same SHA-256) is not processed
+    again: the existing statement, or the job still processing it, is returned.
     """
     parser_classes = [MultiPartParser]
 
@@ -44,100 +54,134 @@ class UploadBankStatementView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        today_str = now().strftime('%Y%m%d%H%M%S')
-        reference = f"ref-{business.id}_{today_str}"
+        file_hash = hash_file(file)
+
+        existing = BankStatement.objects.filter(business=business, file_hash=file_hash).only('id').first()
+        if existing:
+            return Response({
+                'message': 'Bank statement already uploaded',
+                'statement_id': str(existing.id),
+                'duplicate': True,
+            }, status=status.HTTP_200_OK)
+
+        in_flight = StatementJob.objects.filter(
+            business=business,
+            file_hash=file_hash,
+            status__in=[StatementJob.STATUS_PENDING, StatementJob.STATUS_RUNNING]
+        ).first()
+        if in_flight:
+            return self._accepted(request, in_flight, duplicate=True)
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
+        job = StatementJob(business=business, file_hash=file_hash)
+        spool_dir = settings.INGESTION_SPOOL_DIR
+        os.makedirs(spool_dir, exist_ok=True)
+        job.file_path = os.path.join(spool_dir, f"{job.id}.pdf")
+
+        with open(job.file_path, 'wb') as spooled:
             for chunk in file.chunks():
-                tmp.write(chunk)
-            tmp_path = tmp.name
+                spooled.write(chunk)
 
+        job.save()
         try:
-            raw_text = extract_text_from_pdf(tmp_path)
-            df = ask_ai_to_structure(raw_text)
+            start_statement_job(job)
+        except Exception as e:
+            # Broker unavailable, or an eager run failed (already recorded on the job)
+            StatementJob.objects.filter(id=job.id, status=StatementJob.STATUS_PENDING).update(
+                status=StatementJob.STATUS_FAILED,
+                error=f'Could not queue statement processing: {str(e)}'
+            )
 
-            # Ensure expected columns
-            expected_cols = ['date', 'amount', 'balance', 'description', 'transaction_type', 'channel', 'counterparty']
-            for col in expected_cols:
-                if col not in df.columns:
-                    df[col] = None
+        return self._accepted(request, job)
 
-        except Exception as e:
-            os.unlink(tmp_path)
-            return Response({'error': f'AI extraction failed: {str(e)}'}, status=400)
+    def _accepted(self, request, job, duplicate=False):
+        return Response({
+            'message': 'Bank statement accepted for processing',
+            'job_id': str(job.id),
+            'status_url': request.build_absolute_uri(reverse('statement-job', args=[job.id])),
+            'duplicate': duplicate,
+        }, status=status.HTTP_202_ACCEPTED)
 
-        os.unlink(tmp_path)
 
-        try:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
-            df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
-            df['balance'] = pd.to_numeric(df['balance'], errors='coerce')
-            df.dropna(subset=['date', 'amount', 'balance'], inplace=True)
-            
-            start_date = pd.to_datetime(df['date'].min(), errors='coerce').date()
-            end_date = pd.to_datetime(df['date'].max(), errors='coerce').date()
+class ImportTransactionsView(APIView):
+    """
+    POST: Import transactions from a CSV, JSON array or JSON-lines file.
+    The file is read and stored in batches, so large exports do not have
+    to fit in memory. Invalid rows are skipped and reported by row number.
 
-            total_income = safe_decimal(df[df['amount'] > 0]['amount'].sum())
-            total_expenditure = safe_decimal(df[df['amount'] < 0]['amount'].sum())
+    The file type comes from the optional `file_type` form field
+    (csv, json or jsonl), otherwise from the file name.
+    """
+    parser_classes = [MultiPartParser]
+    row_readers = {
+        'csv': iter_csv_rows,
+        'json': iter_json_rows,
+        'jsonl': iter_json_rows,
+    }
 
-        except Exception as e:
-            return Response({'error': f'DataFrame processing failed: {str(e)}'}, status=400)
+    def post(self, request, business_id):
+        file = request.FILES.get('file')
+        if not file:
+            return Response(
+                {'error': 'Transactions file is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        file_type = request.data.get('file_type') or os.path.splitext(file.name)[1].lstrip('.')
+        reader = self.row_readers.get(file_type.lower())
+        if reader is None:
+            return Response(
+                {'error': 'Unsupported file type. Use csv, json or jsonl'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
         try:
-            file.seek(0)
-            encoded_pdf = base64.b64encode(file.read()).decode()
-            encoded_data = df.to_json(orient='records')
-        except Exception as e:
-            return Response({'error': f'Encoding failed: {str(e)}'}, status=400)
+            business = Business.objects.get(id=business_id)
+        except Business.DoesNotExist:
+            return Response(
+                {'error': 'Business not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
+        importer = TransactionImport(business)
         try:
-            serializer = BankStatementSerializer(data={
-                'business': business.id,
-                'reference': reference,
-                'statement_file': encoded_pdf,
-                'encoded_data': encoded_data,
-                'start_date': start_date,
-                'end_date': end_date,
-                'total_income': total_income,
-                'total_expenditure': total_expenditure,
-            })
-
-            if serializer.is_valid():
-                statement = serializer.save()
-
-                # Save transactions
-                for _, row in df.iterrows():
-                    BankTransaction.objects.create(
-                        statement=statement,
-                        date=row['date'],
-                        amount=row['amount'],
-                        balance=row['balance'],
-                        description=row.get('description') or '',
-                        transaction_type=row.get('transaction_type') or 'credit',
-                        channel=row.get('channel') or '',
-                        counterparty=row.get('counterparty') or ''
-                    )
-
-                return Response({
-                    'message': 'Bank statement uploaded successfully',
-                    'statement_id': str(statement.id),
-                    'start_date': str(start_date),
-                    'end_date': str(end_date),
-                    'income': float(total_income),
-                    'expenditure': float(total_expenditure),
-                }, status=201)
-            else:
-                return Response(serializer.errors, status=400)
+            statement = importer.run(reader(file))
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        except Exception as e:
-            return Response({'error': f'Database save failed: {str(e)}'}, status=500)
+        if statement is None:
+            return Response({
+                'error': 'No new transactions were imported',
+                **importer.summary(),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'message': 'Transactions imported',
+            **importer.summary(),
+        }, status=status.HTTP_201_CREATED)
+
+
+class StatementJobView(APIView):
+    """
+    GET: Processing status of an uploaded statement
+    (status, current stage, progress and the resulting statement id).
+    """
+
+    def get(self, request, job_id):
+        try:
+            job = StatementJob.objects.get(pk=job_id)
+        except StatementJob.DoesNotExist:
+            return Response({'error': 'Job not found'}, status=404)
+
+        serializer = StatementJobSerializer(job)
+        return Response(serializer.data, status=200)
 
 
 class DownloadBankStatementView(APIView):
     """
     GET: Download bank statement PDF or metadata.
     - ?meta=true returns metadata.
-    - otherwise returns base64-decoded PDF file.
+    - otherwise streams the PDF from the blob store
+      (or decodes it from the legacy base64 column).
     """
 
     def get(self, request, statement_id):
@@ -150,11 +194,149 @@ class DownloadBankStatementView(APIView):
             serializer = BankStatementSerializer(stmt)
             return Response(serializer.data, status=200)
 
+        filename = f"{stmt.reference}.pdf"
+        if stmt.file_hash:
+            try:
+                pdf_file = get_blob_store().open(stmt.file_hash)
+            except FileNotFoundError:
+                return Response({'error': 'Statement file is missing'}, status=500)
+            return FileResponse(pdf_file, as_attachment=True, filename=filename, content_type='application/pdf')
+
         try:
             pdf_data = base64.b64decode(stmt.statement_file)
         except Exception:
             return Response({'error': 'Invalid PDF encoding'}, status=500)
 
         response = HttpResponse(pdf_data, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{stmt.reference}.pdf"'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+TRANSACTION_FIELDS = [
+    'id', 'statement_id', 'date', 'amount', 'balance',
+    'description', 'transaction_type', 'channel', 'counterparty', 'is_inferred',
+]
+
+
+def encode_transaction_cursor(row):
+    return base64.urlsafe_b64encode(f"{row['date'].isoformat()}|{row['id']}".encode()).decode()
+
+
+def decode_transaction_cursor(cursor):
+    """
+    Returns:
+    - tuple: (date, id) of the last row of the previous page.
+
+    Raises:
+    - ValueError: If the cursor is malformed.
+    """
+    try:
+        day, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        day = parse_date(day)
+        transaction_id = int(transaction_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if day is None:
+        raise ValueError('Invalid cursor')
+    return day, transaction_id
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+class BusinessTransactionsView(APIView):
+    """
+    GET: Transactions of a business, oldest first.
+    - ?start_date= / ?end_date= (YYYY-MM-DD, inclusive) and ?transaction_type=
+      filter through the (business, date) and (business, transaction_type, date) indexes.
+    - ?fields=date,amount,... selects the returned columns.
+    - ?limit= and ?cursor= (next_cursor of the previous page) page by keyset
+      on (date, id), so deep pages cost the same as the first.
+    - ?export=csv or ?export=ndjson streams every matching row instead,
+      reading them with a server-side cursor so memory use stays constant.
+    """
+
+    def get(self, request, business_id):
+        if not Business.objects.filter(id=business_id).exists():
+            return Response({'error': 'Business not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        params = request.query_params
+        fields = [f.strip() for f in params.get('fields', '').split(',') if f.strip()] or TRANSACTION_FIELDS
+        unknown = [f for f in fields if f not in TRANSACTION_FIELDS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(TRANSACTION_FIELDS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        transactions = BankTransaction.objects.filter(business_id=business_id)
+        try:
+            if params.get('start_date'):
+                transactions = transactions.filter(date__gte=self.parse_day(params['start_date']))
+            if params.get('end_date'):
+                transactions = transactions.filter(date__lte=self.parse_day(params['end_date']))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if params.get('transaction_type'):
+            transactions = transactions.filter(transaction_type=params['transaction_type'].lower())
+        transactions = transactions.order_by('date', 'id')
+
+        export = params.get('export')
+        if export:
+            return self.export(transactions, fields, export, business_id)
+
+        max_limit = getattr(settings, 'TRANSACTION_PAGE_MAX_LIMIT', 1000)
+        try:
+            limit = min(int(params.get('limit', 100)), max_limit)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if params.get('cursor'):
+            try:
+                day, transaction_id = decode_transaction_cursor(params['cursor'])
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            transactions = transactions.filter(Q(date__gt=day) | Q(date=day, id__gt=transaction_id))
+
+        rows = list(transactions.values(*dict.fromkeys(fields + ['date', 'id']))[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return Response({
+            'results': [{field: row[field] for field in fields} for row in rows],
+            'next_cursor': encode_transaction_cursor(rows[-1]) if has_more else None,
+        }, status=status.HTTP_200_OK)
+
+    def export(self, transactions, fields, export, business_id):
+        rows = transactions.values_list(*fields).iterator(chunk_size=2000)
+        if export == 'csv':
+            writer = csv.writer(_Echo())
+            lines = (writer.writerow(row) for row in self.with_header(fields, rows))
+            content_type = 'text/csv'
+        elif export == 'ndjson':
+            lines = (json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + '\n' for row in rows)
+            content_type = 'application/x-ndjson'
+        else:
+            return Response({'error': 'export must be csv or ndjson'}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="transactions-{business_id}.{export}"'
         return response
+
+    @staticmethod
+    def with_header(fields, rows):
+        yield fields
+        yield from rows
+
+    @staticmethod
+    def parse_day(value):
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}. Use YYYY-MM-DD')
+        return day
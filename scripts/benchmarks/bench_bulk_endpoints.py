@@ -0,0 +1,90 @@
+"""
+Businesses per second served by one GET /api/risk/<id>/ per business
+against POST /api/risk/bulk/ and /api/scores/bulk/ with up to
+BULK_SCORING_MAX_IDS ids per request, through the Django test client.
+Measured with stored scores (score cache emptied before each run) and
+with no scores, where every business is scored by the request.
+
+    python scripts/benchmarks/bench_bulk_endpoints.py --businesses 200 --rows 500
+"""
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test.utils import setup_test_environment
+
+from common import benchmark_database, create_business, measure, ms, parser, report, seed_transactions
+
+# Imported after common, which configures Django: it reads the settings on import
+from rest_framework.test import APIClient
+
+from core.models import CreditScore
+
+
+def empty_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+def drop_scores():
+    CreditScore.objects.all().delete()
+    empty_caches()
+
+
+def single(client, business_ids):
+    for business_id in business_ids:
+        response = client.get(f'/api/risk/{business_id}/')
+        assert response.status_code == 200, response.content
+    return len(business_ids)
+
+
+def bulk(path):
+    max_ids = getattr(settings, 'BULK_SCORING_MAX_IDS', 500)
+
+    def post(client, business_ids):
+        answered = 0
+        for start in range(0, len(business_ids), max_ids):
+            response = client.post(path, {'business_ids': business_ids[start:start + max_ids]}, format='json')
+            assert response.status_code == 200
+            for line in b''.join(response.streaming_content).splitlines():
+                assert 'error' not in json.loads(line), line
+                answered += 1
+        return answered
+    return post
+
+
+def main():
+    arguments = parser(__doc__.split('\n\n')[0])
+    arguments.add_argument('--businesses', type=int, default=200)
+    arguments.add_argument('--rows', type=int, default=500, help='transactions per business (default 500)')
+    options = arguments.parse_args()
+
+    setup_test_environment()
+    endpoints = [
+        ('GET /api/risk/<id>/', single),
+        ('POST /api/risk/bulk/', bulk('/api/risk/bulk/')),
+        ('POST /api/scores/bulk/', bulk('/api/scores/bulk/')),
+    ]
+    results = []
+    with benchmark_database():
+        business_ids = []
+        for _ in range(options.businesses):
+            business = create_business()
+            seed_transactions(business, options.rows)
+            business_ids.append(business.id)
+        client = APIClient()
+        client.force_authenticate(user=business.owner)
+
+        # Score every business once; the 'none' runs drop the scores again
+        bulk('/api/scores/bulk/')(client, business_ids)
+        for scores, setup in [('stored', empty_caches), ('none', drop_scores)]:
+            for name, request in endpoints:
+                seconds, _, answered = measure(lambda: request(client, business_ids), options.repeat, setup)
+                assert answered == len(business_ids)
+                results.append((scores, name, ms(seconds), f'{answered / seconds:,.0f}'))
+
+    report(['scores', 'endpoint', 'time', 'businesses/sec'], results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Rows per second of storing an extracted statement: one
+BankTransaction.objects.create() per df.iterrows() row, as the upload
+view did, against bulk_insert_transactions() in one transaction.
+
+    python scripts/benchmarks/bench_bulk_insert.py --rows 5000
+"""
+from datetime import date, timedelta
+
+import pandas as pd
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from common import (
+    benchmark_database, create_business, measure, ms, parser, report, row_counts, rows_per_day, transaction_values,
+)
+
+from core.signals import transaction_saved
+from ingestion.models import BankStatement, BankTransaction
+from ingestion.utils.bulk_insert import bulk_insert_transactions
+
+
+def statement_frame(rows):
+    start = date.today() - timedelta(days=rows // rows_per_day(rows) + 1)
+    records = []
+    for i in range(rows):
+        day, amount, balance = transaction_values(i, rows_per_day(rows))
+        records.append({
+            'date': pd.Timestamp(start + timedelta(days=day)), 'amount': float(amount), 'balance': float(balance),
+            'description': f'TRANSFER {i}', 'transaction_type': 'credit' if amount > 0 else 'debit',
+            'channel': 'TRANSFER', 'counterparty': None,
+        })
+    return pd.DataFrame(records)
+
+
+def new_statement():
+    business = create_business()
+    return BankStatement.objects.create(
+        business=business, reference=f'benchmark-{business.id}', start_date=date.today(), end_date=date.today(),
+        total_income=0, total_expenditure=0,
+    )
+
+
+def row_by_row(df):
+    statement = new_statement()
+    # The per-row cache invalidation came later; leave it out of the old path
+    post_save.disconnect(transaction_saved, sender=BankTransaction)
+    try:
+        _create_rows(statement, df)
+    finally:
+        post_save.connect(transaction_saved, sender=BankTransaction)
+
+
+def _create_rows(statement, df):
+    for _, row in df.iterrows():
+        BankTransaction.objects.create(
+            statement=statement,
+            date=row['date'],
+            amount=row['amount'],
+            balance=row['balance'],
+            description=row.get('description') or '',
+            transaction_type=row.get('transaction_type') or 'credit',
+            channel=row.get('channel') or '',
+            counterparty=row.get('counterparty') or ''
+        )
+
+
+def bulk(df):
+    with transaction.atomic():
+        bulk_insert_transactions(new_statement(), df)
+
+
+def main():
+    arguments = parser(__doc__.split('\n\n')[0])
+    arguments.add_argument('--rows', type=row_counts, default=[5000])
+    options = arguments.parse_args()
+
+    results = []
+    with benchmark_database():
+        for count in options.rows:
+            df = statement_frame(count)
+            for name, insert in [('row by row', row_by_row), ('bulk', bulk)]:
+                seconds, _, _ = measure(lambda: insert(df), options.repeat)
+                results.append((count, name, ms(seconds), f'{count / seconds:,.0f}'))
+
+    report(['rows', 'path', 'time', 'rows/sec'], results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Per-business latency of compute_features() with ingestion_banktransaction
+as a plain table (migration ingestion 0001) and partitioned by month
+(0002), and how long 0002 takes to convert the table each way.
+PostgreSQL only.
+
+Every business gets --statements statements of 18 months, loaded in
+random statement order as years of uploads would leave them, so a
+business's rows are spread over the whole table. Pass --restart-command
+to restart PostgreSQL and drop the OS page cache before each engine's
+first pass; without it every pass runs on a warm cache.
+
+    python scripts/benchmarks/bench_partitioning.py --businesses 5000 --restart-command 'pg_ctl -D "$PGDATA" restart -w && sync && echo 3 > /proc/sys/vm/drop_caches'
+"""
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+from django.core.management import call_command
+from django.db import connection
+
+from common import benchmark_database, ms, parser, report
+
+from business.models import Business
+from core.score_engine import get_scoring_engine
+from ingestion.models import BankStatement, BankTransaction
+from users.models import User
+
+ENGINES = ['python', 'aggregate']
+STATEMENT_DAYS = 547
+TABLE = BankTransaction._meta.db_table
+
+LOAD_SQL = f"""
+INSERT INTO {TABLE} (date, amount, balance, description, transaction_type, channel, counterparty,
+                     fingerprint, is_inferred, business_id, statement_id)
+SELECT s.start_date + (g * {STATEMENT_DAYS} / %(rows)s), round((random() * 500000)::numeric, 2),
+       round((random() * 5000000)::numeric, 2), 'POS PURCHASE ' || g,
+       CASE WHEN g %% 3 = 0 THEN 'credit' ELSE 'debit' END, 'POS', NULL, md5(s.id::text || g), false,
+       s.business_id, s.id
+FROM (SELECT id, business_id, start_date FROM {BankStatement._meta.db_table} ORDER BY random()) s
+CROSS JOIN LATERAL generate_series(0, %(rows)s - 1) g
+"""
+
+
+def seed(businesses, statements, rows):
+    """Load the transactions with the secondary indexes dropped, as a bulk restore would."""
+    owner, _ = User.objects.get_or_create(email='benchmark@example.com')
+    Business.objects.bulk_create(
+        Business(name=f'Partitioned {i}', registration_number=f'BP{i}', industry='Retail', country='NG', city='Lagos',
+                 owner=owner)
+        for i in range(businesses)
+    )
+    first_day = date.today() - timedelta(days=statements * STATEMENT_DAYS)
+    BankStatement.objects.bulk_create(
+        BankStatement(
+            business=business, reference=f'benchmark-{business.id}-{k}',
+            start_date=first_day + timedelta(days=k * STATEMENT_DAYS),
+            end_date=first_day + timedelta(days=(k + 1) * STATEMENT_DAYS - 1), total_income=0, total_expenditure=0,
+        )
+        for business in Business.objects.filter(name__startswith='Partitioned ')
+        for k in range(statements)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = %s::regclass AND NOT i.indisprimary", [TABLE]
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+        cursor.execute(LOAD_SQL, {'rows': rows})
+        for _, definition in indexes:
+            cursor.execute(definition)
+
+
+def analyze():
+    with connection.cursor() as cursor:
+        cursor.execute(f'VACUUM ANALYZE {TABLE}')
+
+
+def timed_passes(business_ids, engine, restart_command, repeat):
+    """
+    compute_features() of every business, once and then `repeat` more times.
+
+    Returns:
+    - tuple: (median seconds of the first pass, median seconds of the later passes)
+    """
+    if restart_command:
+        connection.close()
+        subprocess.run(restart_command, shell=True, check=True)
+    businesses = [Business.objects.get(id=business_id) for business_id in business_ids]
+    timings = []
+    for _ in range(1 + repeat):
+        for business in businesses:
+            started = time.perf_counter()
+            get_scoring_engine(business, engine).compute_features()
+            timings.append(time.perf_counter() - started)
+    first = len(businesses)
+    return statistics.median(timings[:first]), statistics.median(timings[first:])
+
+
+def timed_migration(target):
+    started = time.perf_counter()
+    call_command('migrate', 'ingestion', target, verbosity=0)
+    return time.perf_counter() - started
+
+
+def main():
+    arguments = parser(__doc__.split('\n\n')[0])
+    arguments.add_argument('--businesses', type=int, default=1000)
+    arguments.add_argument('--statements', type=int, default=4, help='statements per business (default 4)')
+    arguments.add_argument('--rows', type=int, default=2500, help='transactions per statement (default 2500)')
+    arguments.add_argument('--sample', type=int, default=20, help='businesses timed (default 20)')
+    arguments.add_argument('--restart-command', help='shell command run before each first pass')
+    options = arguments.parse_args()
+    if connection.vendor != 'postgresql':
+        sys.exit('bench_partitioning.py needs PostgreSQL: partitioning is skipped on other databases')
+
+    results = []
+    with benchmark_database():
+        call_command('migrate', 'ingestion', '0001', verbosity=0)
+        started = time.perf_counter()
+        seed(options.businesses, options.statements, options.rows)
+        analyze()
+        print(f'Loaded {BankTransaction.objects.count():,} rows in {time.perf_counter() - started:.0f} s')
+        sample = random.Random(19).sample(
+            list(Business.objects.filter(name__startswith='Partitioned ').values_list('id', flat=True)), options.sample
+        )
+
+        migrations = []
+        for stage, target in [('plain', None), ('partitioned', '0002')]:
+            if target:
+                migrations.append((f'0001 -> {target}', timed_migration(target)))
+                analyze()
+            for engine in ENGINES:
+                first, second = timed_passes(sample, engine, options.restart_command, options.repeat)
+                results.append((stage, engine, ms(first), ms(second)))
+        migrations.append(('0002 -> 0001', timed_migration('0001')))
+
+    report(['table', 'engine', 'first pass', 'later passes'], results)
+    print()
+    report(['migration', 'time'], [(name, f'{seconds:,.1f} s') for name, seconds in migrations])
+
+
+if __name__ == '__main__':
+    main()
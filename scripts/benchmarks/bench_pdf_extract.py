@@ -0,0 +1,108 @@
+"""
+PDF text extraction over a synthetic multi-hundred-page statement:
+pdfplumber page by page, as extract_text_from_pdf() did, against
+iter_pdf_pages() with pypdfium2, serial and with a process pool. Also
+reports how soon the first page is available to the next stage.
+
+    python scripts/benchmarks/bench_pdf_extract.py --pages 200,500 --workers 4
+"""
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pdfplumber
+
+from common import measure, ms, parser, report, row_counts, transaction_values
+
+from ingestion.utils.data_extract import iter_pdf_pages
+
+LINES_PER_PAGE = 60
+
+
+def write_statement_pdf(path, pages):
+    """Write a `pages`-page PDF of statement lines in Helvetica, without any PDF library."""
+    first_day = date(2024, 1, 1)
+
+    def page_content(page):
+        lines = ['BT /F1 8 Tf 30 810 Td 13 TL', f'(Customer statement, page {page + 1}) Tj T*']
+        for i in range(page * LINES_PER_PAGE, (page + 1) * LINES_PER_PAGE):
+            day, amount, balance = transaction_values(i)
+            lines.append(
+                f'({(first_day + timedelta(days=day)):%d-%b-%Y}  NIP TRANSFER REF{i:08d}  '
+                f'{amount:>14,.2f}  {balance:>14,.2f}) Tj T*'
+            )
+        lines.append('ET')
+        return '\n'.join(lines).encode()
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % (5 + 2 * page) for page in range(pages)), pages
+        ),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    for page in range(pages):
+        content = page_content(page)
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content))
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % (4 + 2 * page)
+        )
+
+    with open(path, 'wb') as pdf:
+        pdf.write(b'%PDF-1.4\n')
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(pdf.tell())
+            pdf.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+        xref = pdf.tell()
+        pdf.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+        pdf.write(b''.join(b'%010d 00000 n \n' % offset for offset in offsets))
+        pdf.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+
+
+def pdfplumber_pages(path):
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            yield page.extract_text() or ''
+
+
+def first_page_and_total(pages):
+    """Consume the `pages` generator; returns (seconds to the first page, page count)."""
+    started = time.perf_counter()
+    first = None
+    count = 0
+    for _ in pages:
+        count += 1
+        if first is None:
+            first = time.perf_counter() - started
+    return first, count
+
+
+def main():
+    arguments = parser(__doc__.split('\n\n')[0])
+    arguments.add_argument('--pages', type=row_counts, default=[200, 500])
+    arguments.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    options = arguments.parse_args()
+
+    extractors = [
+        ('pdfplumber', pdfplumber_pages),
+        ('pypdfium2', lambda path: iter_pdf_pages(path, workers=1)),
+        (f'pypdfium2 x{options.workers}', lambda path: iter_pdf_pages(path, workers=options.workers)),
+    ]
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in options.pages:
+            path = os.path.join(directory, f'statement-{pages}.pdf')
+            write_statement_pdf(path, pages)
+            for name, extract in extractors:
+                seconds, _, (first, count) = measure(lambda: first_page_and_total(extract(path)), options.repeat)
+                assert count == pages
+                results.append((pages, name, ms(seconds), ms(first), f'{pages / seconds:,.0f}'))
+
+    report(['pages', 'extractor', 'total', 'first page', 'pages/sec'], results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Per-business latency of CreditScoringEngine.compute_features(): the
+Python engine, which reads the transactions, against the aggregated
+engine, which computes the features in one SQL query.
+
+    python scripts/benchmarks/bench_scoring_engines.py --rows 1000,100000,1000000
+"""
+from common import benchmark_database, create_business, measure, ms, parser, report, row_counts, seed_transactions
+
+from core.score_engine import get_scoring_engine
+from core.scoring_models import get_model
+
+ENGINES = ['python', 'aggregate']
+
+
+def main():
+    arguments = parser(__doc__.split('\n\n')[0])
+    arguments.add_argument('--rows', type=row_counts, default=[1000, 100_000, 1_000_000])
+    options = arguments.parse_args()
+
+    results = []
+    with benchmark_database():
+        for count in options.rows:
+            business = create_business(f'{count} rows')
+            seed_transactions(business, count)
+            timings = {}
+            scores = set()
+            for mode in ENGINES:
+                timings[mode], _, features = measure(get_scoring_engine(business, mode).compute_features, options.repeat)
+                scores.add(get_model().predict(features))
+            assert len(scores) == 1, f'engines disagree at {count} rows: {scores}'
+            results.append((count, *(ms(timings[mode]) for mode in ENGINES), f"{timings['python'] / timings['aggregate']:.1f}x"))
+
+    report(['rows', *ENGINES, 'speedup'], results)
+
+
+if __name__ == '__main__':
+    main()
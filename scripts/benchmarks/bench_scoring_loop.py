@@ -0,0 +1,71 @@
+"""
+Microbenchmark of the per-business scoring loop: monthly credit totals
+and balance statistics over one business's rows, computed the way the
+engine did with Decimal (statistics on float balances) and the way it
+does now in integer kobo. Works on in-memory rows, no database needed.
+
+    python scripts/benchmarks/bench_scoring_loop.py --rows 1000,10000,100000
+"""
+import statistics
+from collections import defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+
+from common import measure, ms, parser, report, row_counts, transaction_values
+
+from core.feature_store import average_growth
+from core.money import to_kobo
+from core.score_engine import balance_statistics
+
+
+def decimal_loop(rows):
+    """The engine's loop before integer kobo."""
+    monthly_credits = defaultdict(int)
+    for day, transaction_type, amount, balance in rows:
+        if transaction_type == 'credit':
+            monthly_credits[day.strftime('%Y-%m')] += amount
+    totals = [monthly_credits[m] for m in sorted(monthly_credits)]
+    growth_rates = [float((curr - prev) / prev) for prev, curr in zip(totals, totals[1:]) if prev > 0]
+    growth = sum(growth_rates) / len(growth_rates) if growth_rates else 0
+    balances = [float(balance) for _, _, _, balance in rows]
+    return len(totals), growth, statistics.mean(balances), statistics.stdev(balances)
+
+
+def kobo_loop(rows):
+    """The engine's loop now: the database hands back kobo (see core.money.db_kobo)."""
+    monthly_credits = defaultdict(int)
+    for day, transaction_type, amount, _ in rows:
+        if transaction_type == 'credit':
+            monthly_credits[day.year, day.month] += amount
+    months = sorted(monthly_credits)
+    growth = average_growth([monthly_credits[m] for m in months])
+    balances = np.fromiter((balance for _, _, _, balance in rows), dtype=np.int64, count=len(rows))
+    _, mean, stdev = balance_statistics(balances)
+    return len(months), growth, mean, stdev
+
+
+def main():
+    arguments = parser(__doc__.split('\n\n')[0])
+    arguments.add_argument('--rows', type=row_counts, default=[1000, 10_000, 100_000])
+    options = arguments.parse_args()
+
+    results = []
+    for count in options.rows:
+        start = date(2020, 1, 1)
+        naira_rows = []
+        for i in range(count):
+            day, amount, balance = transaction_values(i)
+            naira_rows.append((start + timedelta(days=day), 'credit' if amount > 0 else 'debit', amount, balance))
+        kobo_rows = [(day, kind, to_kobo(amount), to_kobo(balance)) for day, kind, amount, balance in naira_rows]
+
+        decimal_time, _, expected = measure(lambda: decimal_loop(naira_rows), options.repeat)
+        kobo_time, _, features = measure(lambda: kobo_loop(kobo_rows), options.repeat)
+        assert features[0] == expected[0] and np.allclose(features[1:], expected[1:], rtol=1e-9, atol=0)
+        results.append((count, ms(decimal_time), ms(kobo_time), f'{decimal_time / kobo_time:.1f}x'))
+
+    report(['rows', 'Decimal', 'kobo', 'speedup'], results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Size, write and load time of a statement's transactions as the legacy
+encoded_data JSON (df.to_json(orient='records'), read back with
+pd.read_json()) against the columnar .npz snapshot (save_snapshot() and
+load_snapshot() on local storage, reading every column). The JSON also
+carries the descriptions, which the snapshot leaves out. No database
+needed.
+
+    python scripts/benchmarks/bench_snapshots.py --rows 10000,100000
+"""
+import io
+import os
+import tempfile
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from django.core.files.storage import FileSystemStorage
+
+from common import measure, ms, parser, report, row_counts, rows_per_day, transaction_values
+
+from ingestion.blob_store import BlobStore
+from ingestion.models import BankTransaction
+from ingestion.snapshot import load_snapshot, save_snapshot
+
+CHANNELS = ['TRANSFER', 'POS', 'USSD', 'ATM', '']
+
+
+def statement_transactions(rows):
+    start = date(2024, 1, 1)
+    per_day = rows_per_day(rows)
+    transactions = []
+    for i in range(rows):
+        day, amount, balance = transaction_values(i, per_day)
+        transactions.append(BankTransaction(
+            date=start + timedelta(days=day), amount=amount, balance=balance, description=f'NIP TRANSFER REF{i:08d}',
+            transaction_type='credit' if amount > 0 else 'debit', channel=CHANNELS[i % len(CHANNELS)],
+            counterparty=f'COUNTERPARTY {i % 200}',
+        ))
+    return transactions
+
+
+def statement_frame(transactions):
+    """The DataFrame the upload view encoded, one column per extracted field."""
+    return pd.DataFrame({
+        'date': pd.to_datetime([tx.date for tx in transactions]),
+        'description': [tx.description for tx in transactions],
+        'amount': [float(tx.amount) for tx in transactions],
+        'balance': [float(tx.balance) for tx in transactions],
+        'transaction_type': [tx.transaction_type for tx in transactions],
+        'channel': [tx.channel for tx in transactions],
+        'counterparty': [tx.counterparty for tx in transactions],
+    })
+
+
+def read_snapshot(key, store):
+    snapshot = load_snapshot(key, store)
+    # Memory-mapped arrays are read on access; touch every page
+    return sum(int(np.asarray(column).view(np.uint8).sum()) for column in snapshot if column.dtype.kind != 'U')
+
+
+def main():
+    arguments = parser(__doc__.split('\n\n')[0])
+    arguments.add_argument('--rows', type=row_counts, default=[10_000, 100_000, 1_000_000])
+    options = arguments.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        store = BlobStore(FileSystemStorage(location=directory))
+        for count in options.rows:
+            transactions = statement_transactions(count)
+            df = statement_frame(transactions)
+
+            json_write, _, encoded_data = measure(lambda: df.to_json(orient='records'), options.repeat)
+            json_read, _, _ = measure(lambda: pd.read_json(io.StringIO(encoded_data)), options.repeat)
+            json_size = len(encoded_data.encode())
+
+            key = save_snapshot(transactions, store)
+            # The store keeps one copy per content hash; delete it so every run writes
+            npz_write, _, _ = measure(lambda: save_snapshot(transactions, store), options.repeat, lambda: store.delete(key))
+            npz_read, _, _ = measure(lambda: read_snapshot(key, store), options.repeat)
+            npz_size = os.path.getsize(store.path(key))
+
+            results.append((count, 'JSON', f'{json_size / 2**20:,.1f} MiB', ms(json_write), ms(json_read)))
+            results.append((count, 'npz', f'{npz_size / 2**20:,.1f} MiB', ms(npz_write), ms(npz_read)))
+
+    report(['rows', 'format', 'size', 'write', 'load'], results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Validation of imported transaction rows: validate_transaction_payload()
+and normalize_row() called per row, against validate_transaction_frame()
+on batches of rows (IMPORT_BATCH_SIZE is what the import endpoint uses)
+and on one frame of all rows. One row in a hundred is invalid. No
+database needed.
+
+    python scripts/benchmarks/bench_validation.py --rows 1000000
+"""
+from datetime import date, timedelta
+
+import pandas as pd
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+
+from common import measure, ms, parser, report, row_counts, transaction_values
+
+from ingestion.utils.files_parser import normalize_row
+from ingestion.utils.validators import validate_transaction_frame, validate_transaction_payload
+
+INVALID = [
+    ('amount', 'N/A'), ('date', '31/12/2024'), ('transaction_type', 'refund'), ('reference', ''),
+]
+
+
+def import_rows(count):
+    """Rows as the CSV reader yields them: every value a string."""
+    start = date(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        day, amount, balance = transaction_values(i)
+        row = {
+            'date': (start + timedelta(days=day % 600)).isoformat(), 'description': f' POS PURCHASE {i} ',
+            'amount': str(abs(amount)), 'balance': str(balance), 'transaction_type': 'Credit' if amount > 0 else 'Debit',
+            'reference': f'REF{i:08d}', 'channel': 'POS', 'counterparty': '',
+        }
+        if i % 100 == 99:
+            field, value = INVALID[i // 100 % len(INVALID)]
+            row[field] = value
+        rows.append(row)
+    return rows
+
+
+def row_by_row(rows):
+    valid, errors = [], []
+    for index, row in enumerate(rows, start=1):
+        try:
+            validate_transaction_payload(row)
+            valid.append(normalize_row(dict(row)))
+        except ValidationError as e:
+            errors.append({'row': index, 'error': str(e.detail)})
+    return len(valid), len(errors)
+
+
+def in_batches(rows, batch_size):
+    valid = errors = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        df, batch_errors = validate_transaction_frame(
+            pd.DataFrame(batch, index=range(start + 1, start + len(batch) + 1))
+        )
+        valid += len(df)
+        errors += len(batch_errors)
+    return valid, errors
+
+
+def main():
+    arguments = parser(__doc__.split('\n\n')[0])
+    arguments.add_argument('--rows', type=row_counts, default=[1_000_000])
+    options = arguments.parse_args()
+    batch_size = getattr(settings, 'IMPORT_BATCH_SIZE', 10000)
+
+    validators = [
+        ('row by row', row_by_row),
+        ('frame, batches of 1000', lambda rows: in_batches(rows, 1000)),
+        (f'frame, batches of {batch_size}', lambda rows: in_batches(rows, batch_size)),
+        ('frame, all rows', lambda rows: in_batches(rows, len(rows))),
+    ]
+    results = []
+    for count in options.rows:
+        rows = import_rows(count)
+        for name, validate in validators:
+            seconds, _, (valid, errors) = measure(lambda: validate(rows), options.repeat)
+            results.append((count, name, ms(seconds), f'{count / seconds:,.0f}', valid, errors))
+
+    report(['rows', 'validator', 'time', 'rows/sec', 'valid', 'invalid'], results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Shared setup of the benchmark scripts in this directory.
+
+Importing this module configures Django (DJANGO_SETTINGS_MODULE, by
+default config.settings). Scripts that need data create it inside
+benchmark_database(): a throwaway test database next to the configured
+one, dropped at the end, so a benchmark never touches real data. Timings
+of database work are only meaningful on PostgreSQL.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import caches  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from business.models import Business  # noqa: E402
+from ingestion.models import BankStatement, BankTransaction  # noqa: E402
+from users.models import User  # noqa: E402
+
+SEED_BATCH_SIZE = 10_000
+# Seeded rows span at most this many days, at ten or more rows a day
+SEED_MAX_DAYS = 3 * 365
+
+
+def parser(description):
+    """Argument parser with the options every benchmark takes."""
+    arguments = argparse.ArgumentParser(description=description)
+    arguments.add_argument('--repeat', type=int, default=5, help='timed runs per case (default 5)')
+    return arguments
+
+
+def row_counts(value):
+    """argparse type for a comma-separated list of row counts, e.g. 1000,100000."""
+    return [int(count) for count in value.split(',')]
+
+
+@contextmanager
+def benchmark_database():
+    """Run the block against a freshly migrated test database and empty caches."""
+    name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    for cache in caches.all():
+        cache.clear()
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(name, verbosity=0)
+
+
+def measure(function, repeat, setup=None):
+    """
+    Call `function` `repeat` times, each after an untimed call of `setup`
+    when given.
+
+    Returns:
+    - tuple: (median seconds, fastest seconds, result of the last call)
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), min(timings), result
+
+
+def report(headers, rows):
+    """Print `rows` (tuples) as a left-aligned table under `headers`."""
+    table = [tuple(headers)] + [tuple(str(cell) for cell in row) for row in rows]
+    widths = [max(len(row[column]) for row in table) for column in range(len(headers))]
+    for row in table:
+        print('  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+
+def ms(seconds):
+    return f'{seconds * 1000:.1f} ms'
+
+
+def rows_per_day(rows):
+    return max(10, -(-rows // SEED_MAX_DAYS))
+
+
+def transaction_values(i, per_day=10):
+    """Deterministic (day offset, amount, balance) of the i-th seeded row, in naira."""
+    amount = Decimal((i * 7919) % 250_000 - 100_000 + i % 97) / 100
+    balance = Decimal(5_000_000 + (i * 104_729) % 2_000_000) / 100
+    return i // per_day, amount, balance
+
+
+def create_business(name=None):
+    owner, _ = User.objects.get_or_create(
+        email='benchmark@example.com', defaults={'first_name': 'Bench', 'last_name': 'Mark'}
+    )
+    number = Business.objects.count() + 1
+    return Business.objects.create(
+        name=name or f'Benchmark {number}', registration_number=f'BM{number}', industry='Retail',
+        country='NG', city='Lagos', owner=owner,
+    )
+
+
+def seed_transactions(business, rows, statements=1, end=None):
+    """
+    Store `rows` transactions of `business`, ending `end` (yesterday by
+    default) and split over `statements` statements. Rows are
+    bulk-created, so no signal or feature store update runs.
+    """
+    per_day = rows_per_day(rows)
+    end = end or date.today() - timedelta(days=1)
+    start = end - timedelta(days=(rows - 1) // per_day)
+    per_statement = -(-rows // statements)
+    for first in range(0, rows, per_statement):
+        last = min(first + per_statement, rows)
+        statement = BankStatement.objects.create(
+            business=business, reference=f'benchmark-{business.id}-{first}',
+            start_date=start + timedelta(days=first // per_day), end_date=start + timedelta(days=(last - 1) // per_day),
+            total_income=0, total_expenditure=0,
+        )
+        for batch_start in range(first, last, SEED_BATCH_SIZE):
+            batch = []
+            for i in range(batch_start, min(batch_start + SEED_BATCH_SIZE, last)):
+                day, amount, balance = transaction_values(i, per_day)
+                batch.append(BankTransaction(
+                    statement=statement, business=business, date=start + timedelta(days=day),
+                    amount=amount, balance=balance, description=f'TRANSFER {i}',
+                    transaction_type='credit' if amount > 0 else 'debit', channel='TRANSFER',
+                ))
+            BankTransaction.objects.bulk_create(batch)